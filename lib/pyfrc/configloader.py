@@ -49,19 +49,22 @@ _field_defaults["default"]["game_specific_messages"] = _field_defaults[
 ].get("game_specific_messages")
 
 
-def _load_config(robot_path):
+def _load_config(robot_path, config_obj=None):
     """
         Used internally by pyfrc, don't call this directly.
         
         Loads a json file from sim/config.json and makes the information available
         to simulation/testing code.
         
-        
+        :param config_obj: Dictionary to load the configuration into, defaults
+                           to :data:`pyfrc.config.config_obj`
+        :returns: the configuration
     """
 
     from . import config
 
-    config_obj = config.config_obj
+    if config_obj is None:
+        config_obj = config.config_obj
 
     sim_path = join(robot_path, "sim")
     config_file = join(sim_path, "config.json")
@@ -120,6 +123,7 @@ def _load_config(robot_path):
         field["px_per_ft"] = defaults["px_per_ft"]
 
     config_obj["pyfrc"]["field"].setdefault("objects", [])
+    config_obj["pyfrc"]["field"].setdefault("collisions", False)
     config_obj["pyfrc"]["field"].setdefault("w", defaults["w"])
     config_obj["pyfrc"]["field"].setdefault("h", defaults["h"])
     config_obj["pyfrc"]["field"].setdefault("px_per_ft", defaults["px_per_ft"])
@@ -139,6 +143,28 @@ def _load_config(robot_path):
     if img and not isabs(config_obj["pyfrc"]["field"]["image"]):
         config_obj["pyfrc"]["field"]["image"] = abspath(join(sim_path, img))
 
+    # How often the simulator UI refreshes the side panels and the field (in
+    # seconds), and the fraction of a CPU core it can use doing so. If the
+    # refresh takes too long, it is done less often.
+    config_obj["pyfrc"].setdefault("ui", {})
+    config_obj["pyfrc"]["ui"].setdefault("panel_period", 0.100)
+    config_obj["pyfrc"]["ui"].setdefault("field_period", 0.050)
+    config_obj["pyfrc"]["ui"].setdefault("cpu_budget", 0.10)
+
+    # Physics steps per second of simulation time, or None to update the
+    # physics whenever the robot code waits. See pyfrc.physics.core
+    config_obj["pyfrc"].setdefault("physics", {})
+    config_obj["pyfrc"]["physics"].setdefault("rate", None)
+    config_obj["pyfrc"]["physics"].setdefault("batch", False)
+
+    # With a fixed rate, only run the steps due in this many seconds of
+    # simulation time, or None to run every step that is due
+    config_obj["pyfrc"]["physics"].setdefault("max_catchup", 0.1)
+
+    # Warn when update_sim takes longer than this fraction of the time it
+    # simulates, or None to never warn
+    config_obj["pyfrc"]["physics"].setdefault("cost_warning", 0.5)
+
     config_obj["pyfrc"].setdefault("analog", {})
     config_obj["pyfrc"].setdefault("CAN", {})
     config_obj["pyfrc"].setdefault("dio", {})
@@ -154,3 +180,5 @@ def _load_config(robot_path):
 
         config_obj["pyfrc"]["joysticks"][str(i)]["buttons"].setdefault("1", "Trigger")
         config_obj["pyfrc"]["joysticks"][str(i)]["buttons"].setdefault("2", "Top")
+
+    return config_obj
@@ -0,0 +1,65 @@
+"""
+    Packs the files to deploy into a single compressed tar archive, so they
+    can be uploaded in one transfer instead of one at a time. Most robot
+    projects are many small files, and over the field network the time
+    taken per file is much larger than the time taken per byte.
+"""
+
+import io
+import os
+import tarfile
+from os.path import join
+
+#: Name of the archive when it is uploaded to the robot
+archive_name = "py_new.tar.gz"
+
+
+def build_archive(robot_path, files, extra=None):
+    """
+        :param robot_path: Directory containing robot.py
+        :param files:      Paths of the files to add, relative to `robot_path`
+                           and using ``/`` as the separator
+        :param extra:      Dictionary of additional files to add, mapping
+                           their path to their content (str or bytes)
+        :returns: the archive (bytes)
+    """
+
+    buf = io.BytesIO()
+    write_archive(buf, robot_path, files, extra)
+    return buf.getvalue()
+
+
+def write_archive(fileobj, robot_path, files, extra=None):
+    """
+        Same as :func:`build_archive`, but writes the archive to a file
+        object as it is built, so it is never held in memory
+
+        :param fileobj: Binary file object to write the archive to
+    """
+
+    with tarfile.open(fileobj=fileobj, mode="w:gz") as tar:
+        for path in files:
+            tarinfo = tar.gettarinfo(join(robot_path, *path.split("/")), path)
+            _clear_owner(tarinfo)
+            with open(join(robot_path, *path.split("/")), "rb") as fp:
+                tar.addfile(tarinfo, fp)
+
+        for path, content in sorted((extra or {}).items()):
+            data = content.encode("utf-8") if isinstance(content, str) else content
+            tarinfo = tarfile.TarInfo(path)
+            tarinfo.size = len(data)
+            tarinfo.mode = 0o644
+            tar.addfile(tarinfo, io.BytesIO(data))
+
+
+def _clear_owner(tarinfo):
+    # the files are owned by whoever extracts them on the robot
+    tarinfo.uid = tarinfo.gid = 0
+    tarinfo.uname = tarinfo.gname = ""
+
+
+def files_size(robot_path, files):
+    """
+        :returns: the total size of the files (in bytes)
+    """
+    return sum(os.path.getsize(join(robot_path, *path.split("/"))) for path in files)
@@ -0,0 +1,137 @@
+"""
+    Compiles the robot code to bytecode on the computer that is deploying
+    it, so that the roboRIO's slow CPU doesn't need to compile it before
+    the robot code can start.
+
+    Bytecode depends on the Python version, so this only works when the
+    computer runs the same version of Python as the robot. Hash based .pyc
+    files (see PEP 552) are used, so they stay valid when uploading the
+    source changes its modification time.
+
+    Compiled files are cached by the content of their source, so only the
+    files that changed are compiled again. The cache is kept in the user's
+    cache directory (see :func:`cache_dir`), not in the robot project, so
+    that it doesn't end up in the project's version control.
+"""
+
+import hashlib
+import os
+import posixpath
+import py_compile
+import sys
+from os.path import abspath, expanduser, join, splitext
+
+
+def cache_dir(robot_path, optimize):
+    """
+        :param robot_path: Directory containing robot.py
+        :param optimize:   Optimization level the robot code runs at
+        :returns: the directory to cache the robot's bytecode in, inside
+                  the user's cache directory
+    """
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or expanduser("~")
+    elif sys.platform == "darwin":
+        base = expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or expanduser("~/.cache")
+
+    project = hashlib.sha256(abspath(robot_path).encode("utf-8")).hexdigest()[:16]
+    return join(base, "pyfrc", "bytecode", project, "opt-%d" % optimize)
+
+
+def can_precompile(cache_tag):
+    """
+        :param cache_tag: ``sys.implementation.cache_tag`` of the robot's
+                          Python
+        :returns: True if this Python can create bytecode for the robot
+    """
+    return sys.version_info >= (3, 7) and sys.implementation.cache_tag == cache_tag
+
+
+class BytecodeCache:
+    """
+        Compiles source files to .pyc files stored in a cache directory
+    """
+
+    def __init__(self, cache_dir, optimize):
+        """
+            :param cache_dir: Directory to store the compiled files in
+            :param optimize:  Optimization level the robot code runs at
+        """
+        self.cache_dir = cache_dir
+        self.optimize = optimize
+
+    def pyc_path(self, path):
+        """
+            :param path: Path of a source file, using ``/`` as the separator
+            :returns: the path that Python loads its bytecode from
+        """
+        head, tail = posixpath.split(path)
+        name = splitext(tail)[0] + "." + sys.implementation.cache_tag
+        if self.optimize:
+            name += ".opt-%d" % self.optimize
+
+        return posixpath.join(head, "__pycache__", name + ".pyc")
+
+    def _key(self, path, source_hash):
+        # the path is compiled into the code object, used for tracebacks
+        key = "%s\0%s\0%s\0%s" % (
+            path,
+            source_hash,
+            sys.implementation.cache_tag,
+            self.optimize,
+        )
+        return hashlib.sha256(key.encode("utf-8")).hexdigest() + ".pyc"
+
+    def compile(self, robot_path, path, source_hash, deployed_path):
+        """
+            Compiles a source file, unless it is already in the cache
+
+            :param robot_path:    Directory containing robot.py
+            :param path:          Path of the source file relative to
+                                  `robot_path`, using ``/`` as the separator
+            :param source_hash:   Hash of the source file, from the manifest
+            :param deployed_path: Where the source file is on the robot
+            :returns: the compiled bytecode (bytes)
+
+            :raises: :class:`py_compile.PyCompileError` if the file has an
+                     error
+        """
+
+        cfile = join(self.cache_dir, self._key(path, source_hash))
+
+        if not os.path.exists(cfile):
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmpfile = cfile + ".tmp"
+            py_compile.compile(
+                join(robot_path, *path.split("/")),
+                cfile=tmpfile,
+                dfile=deployed_path,
+                doraise=True,
+                optimize=self.optimize,
+                invalidation_mode=py_compile.PycInvalidationMode.CHECKED_HASH,
+            )
+            os.replace(tmpfile, cfile)
+
+        with open(cfile, "rb") as fp:
+            return fp.read()
+
+    def prune(self, local_manifest):
+        """
+            Removes the compiled files of sources that no longer exist
+
+            :param local_manifest: Manifest of the files being deployed
+        """
+        if not os.path.isdir(self.cache_dir):
+            return
+
+        keep = set(
+            self._key(path, source_hash)
+            for path, source_hash in local_manifest.items()
+            if path.endswith(".py")
+        )
+
+        for name in os.listdir(self.cache_dir):
+            if name not in keep:
+                os.unlink(join(self.cache_dir, name))
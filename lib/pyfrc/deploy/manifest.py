@@ -0,0 +1,201 @@
+"""
+    Keeps track of the content of the files that were deployed to the
+    robot, so that the next deploy only needs to upload the files that
+    changed.
+
+    The manifest is a JSON object that maps the path of each deployed file
+    (relative to the robot code directory, using ``/``) to the SHA-256 hash
+    of its content. It is uploaded along with the code, and read back from
+    the robot at the start of the next deploy.
+"""
+
+import hashlib
+import json
+import os
+import posixpath
+from fnmatch import fnmatchcase
+from os.path import join, splitext
+
+#: Name of the manifest file in the deployed code directory
+manifest_name = ".deploy_manifest"
+
+#: Key of the manifest that records the optimization level that the
+#: deployed bytecode was compiled for. Hidden files are never deployed, so
+#: it can't be the path of a file.
+optimize_key = ".optimize"
+
+#: Name of the file listing the files that didn't change, which the robot
+#: keeps from the currently deployed code
+unchanged_name = ".deploy_unchanged"
+
+#: Name of the file in the robot code directory that lists patterns of
+#: files that shouldn't be deployed
+ignore_name = ".deployignore"
+
+
+def deploy_files(robot_path):
+    """
+        :param robot_path: Directory containing robot.py
+        :returns: the paths of the files that are deployed, relative to
+                  `robot_path` and using ``/`` as the separator
+    """
+
+    patterns = load_ignore(robot_path)
+    files = []
+
+    for root, dirs, filenames in os.walk(robot_path):
+        prefix = root[len(robot_path) + 1 :].replace(os.sep, "/")
+
+        # skip .svn, .git, .hg, etc directories
+        dirs[:] = sorted(
+            d
+            for d in dirs
+            if not d.startswith(".")
+            and d != "__pycache__"
+            and not is_ignored(posixpath.join(prefix, d), True, patterns)
+        )
+
+        # skip .pyc files and hidden files
+        for filename in sorted(filenames):
+            r, ext = splitext(filename)
+            if ext == ".pyc" or r.startswith("."):
+                continue
+
+            path = posixpath.join(prefix, filename)
+            if not is_ignored(path, False, patterns):
+                files.append(path)
+
+    return files
+
+
+def load_ignore(robot_path):
+    """
+        Reads the patterns from the .deployignore file. Each line is a
+        pattern that uses shell wildcards; blank lines and lines starting
+        with ``#`` are skipped.
+
+        A pattern without a ``/`` is matched against the name of each file
+        and directory. Otherwise it is matched against the whole path,
+        relative to the robot code directory. A pattern that ends with
+        ``/`` only matches directories, and everything in an ignored
+        directory is ignored.
+
+        :param robot_path: Directory containing robot.py
+        :returns: the patterns, or an empty list if there is no
+                  .deployignore file
+    """
+    try:
+        with open(join(robot_path, ignore_name), "r") as fp:
+            lines = fp.read().splitlines()
+    except FileNotFoundError:
+        return []
+
+    patterns = []
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            patterns.append(line)
+
+    return patterns
+
+
+def is_ignored(path, is_dir, patterns):
+    """
+        :param path:     Path relative to the robot code directory, using
+                         ``/`` as the separator
+        :param is_dir:   True if `path` is a directory
+        :param patterns: Patterns returned by :func:`load_ignore`
+        :returns: True if `path` matches one of the patterns
+    """
+    name = posixpath.basename(path)
+
+    for pattern in patterns:
+        if pattern.endswith("/"):
+            if not is_dir:
+                continue
+            pattern = pattern.rstrip("/")
+
+        if "/" in pattern:
+            if fnmatchcase(path, pattern.lstrip("/")):
+                return True
+        elif fnmatchcase(name, pattern):
+            return True
+
+    return False
+
+
+def hash_files(robot_path, files):
+    """
+        :param robot_path: Directory containing robot.py
+        :param files:      Paths returned by :func:`deploy_files`
+        :returns: a manifest of the files
+    """
+
+    manifest = {}
+
+    for path in files:
+        h = hashlib.sha256()
+        with open(join(robot_path, *path.split("/")), "rb") as fp:
+            for chunk in iter(lambda: fp.read(65536), b""):
+                h.update(chunk)
+        manifest[path] = h.hexdigest()
+
+    return manifest
+
+
+def stat_files(robot_path, files):
+    """
+        :param robot_path: Directory containing robot.py
+        :param files:      Paths returned by :func:`deploy_files`
+        :returns: a dictionary mapping each path to the modification time
+                  and size of the file, which is much cheaper to check for
+                  changes than the hashes
+    """
+
+    stats = {}
+
+    for path in files:
+        try:
+            st = os.stat(join(robot_path, *path.split("/")))
+        except FileNotFoundError:
+            # deleted since the files were listed
+            continue
+        stats[path] = (st.st_mtime_ns, st.st_size)
+
+    return stats
+
+
+def dumps(manifest):
+    """
+        :returns: the manifest as a single line of JSON
+    """
+    return json.dumps(manifest, sort_keys=True, separators=(",", ":"))
+
+
+def loads(s):
+    """
+        :returns: the manifest, or None if `s` isn't a valid manifest
+    """
+    try:
+        manifest = json.loads(s)
+    except ValueError:
+        return None
+
+    if not isinstance(manifest, dict) or not all(
+        isinstance(v, str) for v in manifest.values()
+    ):
+        return None
+
+    return manifest
+
+
+def diff(local, remote):
+    """
+        :param local:  Manifest of the files to deploy
+        :param remote: Manifest of the files on the robot
+        :returns: (changed, removed): the files that must be uploaded, and
+                  the files that must be deleted from the robot
+    """
+    changed = [path for path, h in sorted(local.items()) if remote.get(path) != h]
+    removed = sorted(path for path in remote if path not in local)
+    return changed, removed
@@ -0,0 +1,387 @@
+"""
+    Runs the steps of a deploy over a single SSH connection.
+
+    The installer's ssh and sftp commands each open their own connection,
+    and the roboRIO is slow to set one up. When OpenSSH is available, a
+    master connection is opened once (see ControlMaster in ssh_config), and
+    every command of the deploy is multiplexed over it. On Windows, or if
+    the master connection can't be opened, each command connects on its
+    own as before.
+
+    The master connection goes away when the robot reboots, so it is opened
+    again by the next command that is run after it was lost.
+"""
+
+import logging
+import os
+import posixpath
+import shutil
+import signal
+import tempfile
+import threading
+import time
+from os.path import basename, isdir, join, relpath
+
+from . import staging
+
+logger = logging.getLogger("pyfrc.deploy")
+
+
+def sftp_batch(src, dst, mkdir=True):
+    """
+        :param src:   Local file or directory to upload
+        :param dst:   Remote directory to upload it to
+        :param mkdir: Create the remote directory first
+        :returns: the lines of an sftp batch file that uploads `src`
+    """
+
+    dst = str(dst)
+    lines = []
+
+    if isdir(src):
+        rdst = posixpath.join(dst, basename(src))
+        for d, dirs, files in os.walk(src):
+            dirs.sort()
+
+            if d == src:
+                rd = rdst
+                if mkdir:
+                    lines.append('mkdir "%s"' % rd)
+            else:
+                rd = posixpath.join(rdst, relpath(d, src).replace(os.sep, "/"))
+                # the directory may already exist when deploying in place
+                lines.append('-mkdir "%s"' % rd)
+
+            for f in sorted(files):
+                lines.append('put "%s" "%s"' % (join(d, f), posixpath.join(rd, f)))
+    else:
+        if mkdir:
+            lines.append('mkdir "%s"' % dst)
+        lines.append('put "%s" "%s"' % (src, posixpath.join(dst, basename(src))))
+
+    return lines
+
+
+def sftp_files_batch(sources, dst, mkdir=True):
+    """
+        :param sources: List of (local path, remote path) of the files to
+                        upload, where the remote path is relative to `dst`
+                        and uses ``/`` as the separator
+        :param dst:     Remote directory to upload the files to
+        :param mkdir:   Create the remote directory first
+        :returns: the lines of an sftp batch file that uploads the files
+    """
+
+    dst = str(dst)
+    lines = []
+    if mkdir:
+        lines.append('mkdir "%s"' % dst)
+
+    made = set()
+    for src, path in sources:
+        parts = path.split("/")[:-1]
+        for i in range(1, len(parts) + 1):
+            d = "/".join(parts[:i])
+            if d not in made:
+                made.add(d)
+                # the directory may already exist when deploying in place
+                lines.append('-mkdir "%s"' % posixpath.join(dst, d))
+
+        lines.append('put "%s" "%s"' % (src, posixpath.join(dst, path)))
+
+    return lines
+
+
+class DeploySession:
+    """
+        Wraps the installer's ``SshController``, and provides the same
+        ``ssh`` and ``sftp`` methods. The connection is shared while the
+        session is open, so use it as a context manager.
+    """
+
+    #: How long to wait for the robot to accept the connection (in seconds)
+    connect_timeout = 10
+
+    #: How much longer to wait for the shared connection to log in once the
+    #: robot accepted it (in seconds), before connecting for each step instead
+    login_timeout = 10
+
+    def __init__(self, controller, allow_mitm=False):
+        """
+            :param controller: ``SshController`` to connect with
+            :param allow_mitm: Same as the argument to ``ssh_from_cfg``
+        """
+        from robotpy_installer import installer
+
+        self._installer = installer
+        self.controller = controller
+        self.allow_mitm = allow_mitm
+
+        self.control_path = None
+        self._tmp_dir = None
+        self._master = None
+        self._master_pid_file = None
+        self._master_username = None
+
+        # set once the master connection was opened, until close()
+        self._reopen = False
+
+    @property
+    def hostname(self):
+        return self.controller.hostname
+
+    @property
+    def username(self):
+        return self.controller.username
+
+    @username.setter
+    def username(self, value):
+        self.controller.username = value
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def open(self):
+        """
+            Opens the master connection, if it is possible
+        """
+        self._reopen = self._open_master()
+
+    def close(self):
+        """
+            Closes the master connection
+        """
+        self._reopen = False
+        self._close_master()
+
+    def _open_master(self):
+        # returns True if the master connection was opened
+
+        ssh = shutil.which("ssh")
+        if self._installer.is_windows or ssh is None:
+            return False
+
+        # unix sockets have a short maximum path length, so don't put it
+        # in the robot directory
+        self._tmp_dir = tempfile.mkdtemp()
+        self.control_path = join(self._tmp_dir, "ssh")
+        self._master_username = self.username
+
+        # ssh_exec_pass doesn't say which process it started, so the shell
+        # writes its pid before it becomes ssh, which lets a master that
+        # never logs in be killed
+        self._master_pid_file = join(self._tmp_dir, "pid")
+        args = (
+            ["/bin/sh", "-c", 'echo $$ > "$0"; exec "$@"', self._master_pid_file]
+            + [
+                ssh,
+                "-N",
+                "-oControlMaster=yes",
+                "-oControlPath=" + self.control_path,
+                "-oConnectTimeout=%d" % self.connect_timeout,
+            ]
+            + self._mitm_args()
+            + [self._destination()]
+        )
+
+        logger.debug("Opening shared connection to %s", self.hostname)
+        self._master = threading.Thread(
+            target=self._run_master, args=(args,), name="SSH master", daemon=True
+        )
+        self._master.start()
+
+        # the socket is created once the connection is authenticated
+        deadline = time.monotonic() + self.connect_timeout + self.login_timeout
+        while not os.path.exists(self.control_path):
+            if not self._master.is_alive() or time.monotonic() > deadline:
+                logger.warning(
+                    "Could not open a shared SSH connection, connecting for each step instead"
+                )
+                self._kill_master()
+                self._close_master()
+                return False
+            time.sleep(0.05)
+
+        return True
+
+    def _kill_master(self):
+        # used when the master never logged in, so it can't be told to exit
+        try:
+            with open(self._master_pid_file) as fp:
+                os.kill(int(fp.read()), signal.SIGTERM)
+        except (OSError, ValueError):
+            # it already exited, or didn't get far enough to start ssh
+            pass
+
+        self._master.join(5.0)
+
+    def _close_master(self):
+        if self._master is not None:
+            if self._master.is_alive():
+                self._installer.ssh_exec_pass(
+                    self.controller.password,
+                    [
+                        shutil.which("ssh"),
+                        "-O",
+                        "exit",
+                        "-oControlPath=" + self.control_path,
+                        self._destination(self._master_username),
+                    ],
+                    True,
+                )
+                self._master.join(5.0)
+            self._master = None
+
+        if self._tmp_dir is not None:
+            shutil.rmtree(self._tmp_dir, ignore_errors=True)
+            self._tmp_dir = None
+
+    def _check_master(self):
+        # opens the master connection again if it was lost, such as when
+        # the robot rebooted. It only works for the user that opened it.
+        if (
+            self._reopen
+            and self.username == self._master_username
+            and not (self._master is not None and self._master.is_alive())
+        ):
+            logger.info("Shared connection to %s was lost, reconnecting", self.hostname)
+            self._close_master()
+
+            # if it can't be opened, don't wait for it again on each step
+            self._reopen = self._open_master()
+
+    def ssh(self, *args, get_output=False):
+        """
+            Same as ``SshController.ssh``
+        """
+        self._check_master()
+        if not self._is_shared():
+            return self.controller.ssh(*args, get_output=get_output)
+
+        ssh_args = (
+            [shutil.which("ssh")]
+            + self._client_args()
+            + [self._destination()]
+            + list(args)
+        )
+        return self._exec(ssh_args, get_output)
+
+    def sftp(self, src, dst, mkdir=True):
+        """
+            Same as ``SshController.sftp``, but `src` must be a single file
+            or a directory
+        """
+        self._check_master()
+        if not self._is_shared():
+            return self.controller.sftp(src, dst, mkdir=mkdir)
+
+        self._exec_batch(sftp_batch(src, dst, mkdir))
+
+    def sftp_files(self, robot_path, files, dst, extra=None, mkdir=True):
+        """
+            Uploads files from the robot code directory. With a shared
+            connection they are read from where they are, otherwise they
+            are staged for ``SshController.sftp`` (see
+            :mod:`pyfrc.deploy.staging`).
+
+            :param robot_path: Directory containing robot.py
+            :param files:      Paths of the files to upload, relative to
+                               `robot_path` and using ``/`` as the separator
+            :param dst:        Remote directory to upload the files to
+            :param extra:      Dictionary of additional files to upload,
+                               mapping their path to their content (str or
+                               bytes)
+            :param mkdir:      Create the remote directory first
+            :returns: the number of files that had to be copied before
+                      uploading them
+        """
+        self._check_master()
+        extra = extra or {}
+
+        if not self._is_shared():
+            dst = str(dst)
+            tmp_dir = staging.make_staging_dir(robot_path)
+            try:
+                py_tmp_dir = join(tmp_dir, posixpath.basename(dst))
+                copied = staging.stage_files(py_tmp_dir, robot_path, files, extra)
+                self.controller.sftp(py_tmp_dir, posixpath.dirname(dst), mkdir=mkdir)
+            finally:
+                shutil.rmtree(tmp_dir)
+            return copied
+
+        # only the files that don't exist yet are written out
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            extra_dir = join(tmp_dir, "extra")
+            staging.stage_files(extra_dir, tmp_dir, [], extra)
+
+            sources = [(join(robot_path, *path.split("/")), path) for path in files]
+            sources += [(join(extra_dir, *path.split("/")), path) for path in extra]
+            self._exec_batch(sftp_files_batch(sources, dst, mkdir))
+        finally:
+            shutil.rmtree(tmp_dir)
+
+        return 0
+
+    def _exec_batch(self, lines):
+        # runs an sftp batch over the shared connection
+        bfp, bfname = tempfile.mkstemp(text=True)
+        try:
+            with os.fdopen(bfp, "w") as fp:
+                for line in lines:
+                    fp.write(line + "\n")
+
+            sftp_args = (
+                [shutil.which("sftp"), "-oBatchMode=no"]
+                + self._client_args()
+                + ["-b", bfname, self._destination()]
+            )
+            self._exec(sftp_args, False)
+        finally:
+            os.unlink(bfname)
+
+    def _run_master(self, args):
+        retval, _ = self._installer.ssh_exec_pass(
+            self.controller.password, args, True, suppress_known_hosts=self.allow_mitm
+        )
+        logger.debug("Shared connection exited with status %s", retval)
+
+    def _is_shared(self):
+        # the master connection only works for the user that opened it, and
+        # goes away if the robot does
+        return (
+            self._master is not None
+            and self._master.is_alive()
+            and self.username == self._master_username
+        )
+
+    def _destination(self, username=None):
+        return "%s@%s" % (username or self.username, self.hostname)
+
+    def _mitm_args(self):
+        return list(self._installer.mitm_args) if self.allow_mitm else []
+
+    def _client_args(self):
+        return [
+            "-oControlMaster=no",
+            "-oControlPath=" + self.control_path,
+        ] + self._mitm_args()
+
+    def _exec(self, args, get_output):
+        retval, output = self._installer.ssh_exec_pass(
+            self.controller.password,
+            args,
+            get_output,
+            suppress_known_hosts=self.allow_mitm,
+        )
+        if retval != 0:
+            raise self._installer.SshExecError(
+                "Command %s returned non-zero error status %s"
+                % (" ".join(args), retval),
+                retval,
+            )
+        return output.decode("utf-8")
@@ -0,0 +1,84 @@
+"""
+    Lays out the files to upload in a directory, the way the installer's
+    sftp needs them. This is only needed when the deploy can't share a
+    connection (see :mod:`pyfrc.deploy.session`), otherwise the files are
+    uploaded straight from the source tree.
+
+    Copying the robot code there would double the disk I/O of a deploy,
+    which adds up for projects with large assets. Instead the directory is
+    filled with hard links to the files in the source tree, so sftp reads
+    them from where they are. The files are only copied when they can't be
+    linked, for example on filesystems that don't support hard links.
+
+    The directory is created in ``.deploy_cache`` in the robot project, and
+    removed after the upload. ``.deploy_cache`` contains a ``.gitignore``
+    that ignores everything in it, so a staging directory left behind by an
+    interrupted deploy isn't committed.
+"""
+
+import os
+import shutil
+import tempfile
+from os.path import join
+
+
+def make_staging_dir(robot_path):
+    """
+        Creates a temporary directory to stage the upload in. Hard links
+        can't cross filesystems, so it is created in the robot's
+        .deploy_cache directory when possible.
+
+        :param robot_path: Directory containing robot.py
+        :returns: the path of the directory, which the caller must remove
+    """
+    cache_dir = join(robot_path, ".deploy_cache")
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+
+        gitignore = join(cache_dir, ".gitignore")
+        if not os.path.exists(gitignore):
+            with open(gitignore, "w") as fp:
+                fp.write("# created by pyfrc's deploy\n*\n")
+
+        return tempfile.mkdtemp(prefix="staging-", dir=cache_dir)
+    except OSError:
+        return tempfile.mkdtemp()
+
+
+def stage_files(staging_dir, robot_path, files, extra=None):
+    """
+        :param staging_dir: Directory to create, containing the files
+        :param robot_path:  Directory containing robot.py
+        :param files:       Paths of the files to stage, relative to
+                            `robot_path` and using ``/`` as the separator
+        :param extra:       Dictionary of additional files to write, mapping
+                            their path to their content (str or bytes)
+        :returns: the number of files that had to be copied instead of
+                  linked
+    """
+
+    os.mkdir(staging_dir)
+    copied = 0
+
+    for path in files:
+        parts = path.split("/")
+        src = join(robot_path, *parts)
+        dst = join(staging_dir, *parts)
+
+        os.makedirs(join(staging_dir, *parts[:-1]), exist_ok=True)
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copy(src, dst)
+            copied += 1
+
+    for path, content in (extra or {}).items():
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+
+        parts = path.split("/")
+        os.makedirs(join(staging_dir, *parts[:-1]), exist_ok=True)
+        with open(join(staging_dir, *parts), "wb") as fp:
+            fp.write(content)
+
+    return copied
@@ -1,16 +1,20 @@
 import argparse
+import collections
 import inspect
 import os
+import py_compile
 import sys
 import re
 
 import shutil
 import tempfile
 import threading
+import time
 
-from os.path import abspath, basename, dirname, exists, join, splitext
+from os.path import abspath, basename, dirname, exists, join
 from pathlib import PurePosixPath
 
+from ..deploy import archive, bytecode, manifest, session
 from ..util import print_err, yesno
 
 import wpilib
@@ -27,11 +31,88 @@ def relpath(path):
     )
 
 
+# The output of the housekeeping command is shown as it runs, so it is sent
+# to stderr, which isn't captured. Only the values it reports are written
+# to stdout (fd 3), see _echo_value and _parse_housekeeping
+_housekeeping_redirect = "exec 3>&1 1>&2"
+
+
+# The commands and paths of a deploy, which don't change between deploys
+# with --watch
+_DeployCommands = collections.namedtuple(
+    "_DeployCommands",
+    [
+        "housekeeping_cmd",
+        "bash_cmd",
+        "replace_cmd",
+        "compileall_flags",
+        "deploy_dir",
+        "py_deploy_dir",
+        "py_new_deploy_dir",
+        "py_new_deploy_subdir",
+    ],
+)
+
+
+def _echo_value(name, cmd):
+    # shell command that reports the output of cmd to _parse_housekeeping
+    return 'echo "%s:$(%s)" >&3' % (name, cmd)
+
+
+def _incremental_replace_cmd(py_deploy_dir, py_new_deploy_dir, replace_cmd):
+    # Only the changed files are uploaded to py_new_deploy_dir: link the
+    # files that didn't change (and their bytecode) from the currently
+    # deployed code, before running replace_cmd to swap them. Anything else
+    # in the deployed code, such as removed files or files created on the
+    # robot, is left behind.
+    return (
+        "(new=$(cd %(py_new_deploy_dir)s && pwd); cd %(py_deploy_dir)s; "
+        + "while IFS= read -r f; do "
+        + 'for src in "$f" "$(dirname "$f")/__pycache__/$(basename "$f" .py)".*.pyc; do '
+        + '[ -e "$src" ] || continue; '
+        + 'mkdir -p "$new/$(dirname "$src")"; '
+        + 'cp -lf "$src" "$new/$src" 2>/dev/null || cp -pf "$src" "$new/$src"; '
+        + "done; "
+        + 'done < "$new/%(unchanged_name)s"; '
+        + 'rm -f "$new/%(unchanged_name)s"); '
+        + replace_cmd
+    ) % {
+        "py_deploy_dir": py_deploy_dir,
+        "py_new_deploy_dir": py_new_deploy_dir,
+        "unchanged_name": manifest.unchanged_name,
+    }
+
+
+def _load_remote_manifest(housekeeping, optimize):
+    # Returns the manifest of the code on the robot, or None if all of the
+    # files must be uploaded. The bytecode of the unchanged files is kept,
+    # so it can only be used if that bytecode is for the same optimization
+    # level.
+    if "MANIFEST" not in housekeeping:
+        return None
+
+    remote_manifest = manifest.loads(housekeeping["MANIFEST"])
+    if remote_manifest is None:
+        return None
+
+    if remote_manifest.pop(manifest.optimize_key, None) != str(optimize):
+        print(
+            "The code on the robot was compiled with different optimizations, "
+            + "uploading all files"
+        )
+        return None
+
+    return remote_manifest
+
+
 class PyFrcDeploy:
     """
         Uploads your robot code to the robot and executes it immediately
     """
 
+    #: How often the files are checked for changes with --watch (in seconds)
+    watch_period = 0.5
+
     def __init__(self, parser: argparse.ArgumentParser):
         parser.add_argument(
             "--builtin",
@@ -84,6 +165,37 @@ class PyFrcDeploy:
             help="Overwrite currently deployed code, don't delete anything, and don't restart running robot code.",
         )
 
+        parser.add_argument(
+            "--archive",
+            action="store_true",
+            default=False,
+            help="Upload the code as a single compressed archive instead of one file at a time",
+        )
+
+        parser.add_argument(
+            "--precompile",
+            action="store_true",
+            default=False,
+            help="Compile the code on this computer instead of on the robot "
+            + "(requires the same version of Python as the robot). The compiled "
+            + "files are cached in pyfrc/bytecode in your user cache directory",
+        )
+
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            default=False,
+            help="Upload all files, even the ones that haven't changed since the last deploy",
+        )
+
+        parser.add_argument(
+            "--watch",
+            action="store_true",
+            default=False,
+            help="After deploying, deploy again each time a file changes until Ctrl-C is pressed "
+            + "(tests are only run before the first deploy)",
+        )
+
         parser.add_argument(
             "-n",
             "--no-version-check",
@@ -218,10 +330,32 @@ class PyFrcDeploy:
 
         check_startup_dlls = '(if [ "$(grep ^StartupDLLs /etc/natinst/share/ni-rt.ini)" != "" ]; then exit 91; fi)'
 
+        # Only the files that changed since the last deploy are uploaded,
+        # so get the manifest of the code that is on the robot
+        incremental = not options.in_place and not options.full
+        if incremental:
+            get_manifest = _echo_value(
+                "MANIFEST",
+                "cat %s/%s 2>/dev/null" % (py_deploy_dir, manifest.manifest_name),
+            )
+        else:
+            get_manifest = ""
+
+        # bytecode can only be compiled for the same version of python
+        if options.precompile:
+            get_cache_tag = _echo_value(
+                "CACHE_TAG",
+                '/usr/local/bin/python3 -c "import sys; '
+                + 'print(sys.implementation.cache_tag)"',
+            )
+        else:
+            get_cache_tag = ""
+
         # This is a nasty bit of code now...
         sshcmd = inspect.cleandoc(
             """
-            %(bash_cmd)s '[ -x /usr/local/bin/python3 ] || exit 87
+            %(bash_cmd)s '%(redirect)s
+            [ -x /usr/local/bin/python3 ] || exit 87
             SITEPACKAGES=$(/usr/local/bin/python3 -c "import site; print(site.getsitepackages()[0])")
             [ -f $SITEPACKAGES/wpilib/version.py ] || exit 88
             %(check_version)s
@@ -229,15 +363,29 @@ class PyFrcDeploy:
             %(extra_cmd)s
             %(check_startup_dlls)s
             rm -rf %(py_new_deploy_dir)s
+            %(get_manifest)s
+            %(get_cache_tag)s
             '
         """
         )
 
+        redirect = _housekeeping_redirect
         sshcmd %= locals()
 
         sshcmd = re.sub("\n+", ";", sshcmd)
 
-        nc_thread = None
+        commands = _DeployCommands(
+            housekeeping_cmd=sshcmd,
+            bash_cmd=bash_cmd,
+            replace_cmd=replace_cmd,
+            compileall_flags=compileall_flags,
+            deploy_dir=deploy_dir,
+            py_deploy_dir=py_deploy_dir,
+            py_new_deploy_dir=py_new_deploy_dir,
+            py_new_deploy_subdir=py_new_deploy_subdir,
+        )
+
+        self.nc_thread = None
 
         hostname_or_team = options.robot
         if not hostname_or_team and options.team:
@@ -253,12 +401,250 @@ class PyFrcDeploy:
                 no_resolve=options.no_resolve,
             )
 
+            # All of the steps share a single connection to the robot
+            with session.DeploySession(controller, allow_mitm=True) as controller:
+                retval = self._deploy(controller, options, robot_path, commands)
+                if retval != 0:
+                    return retval
+
+                if options.watch:
+                    return self._watch(controller, options, robot_path, commands)
+
+        except installer.Error as e:
+            print_err("ERROR: %s" % e)
+            return 1
+
+        if self.nc_thread is not None:
+            self.nc_thread.join()
+
+        return 0
+
+    def _deploy(self, controller, options, robot_path, commands):
+        # Uploads the code and restarts it, returns 0 if successful
+
+        # Housekeeping first
+        housekeeping = self._housekeeping(controller, commands.housekeeping_cmd)
+        if housekeeping is None:
+            return 1
+
+        optimize = 0 if options.debug else 1
+        remote_manifest = _load_remote_manifest(housekeeping, optimize)
+
+        files = manifest.deploy_files(robot_path)
+        local_manifest = manifest.hash_files(robot_path, files)
+
+        replace_cmd = commands.replace_cmd
+
+        extra = {
+            manifest.manifest_name: manifest.dumps(
+                dict(local_manifest, **{manifest.optimize_key: str(optimize)})
+            )
+        }
+
+        if remote_manifest is not None:
+            files, removed = manifest.diff(local_manifest, remote_manifest)
+            print(
+                "Uploading %d changed files, removing %d files"
+                % (len(files), len(removed))
+            )
+
+            # the robot keeps only these from the deployed code
+            unchanged = [
+                path
+                for path, h in sorted(local_manifest.items())
+                if remote_manifest.get(path) == h
+            ]
+            extra[manifest.unchanged_name] = "".join(path + "\n" for path in unchanged)
+
+            replace_cmd = _incremental_replace_cmd(
+                commands.py_deploy_dir, commands.py_new_deploy_dir, replace_cmd
+            )
+
+        precompiled = False
+        if options.precompile:
+            cache_tag = housekeeping.get("CACHE_TAG")
+            if not cache_tag:
+                print_err(
+                    "WARNING: could not determine the robot's python version, "
+                    + "compiling on the robot instead"
+                )
+            elif bytecode.can_precompile(cache_tag):
+                try:
+                    extra.update(
+                        self._precompile(
+                            robot_path,
+                            files,
+                            local_manifest,
+                            commands.py_deploy_dir,
+                            optimize,
+                        )
+                    )
+                except py_compile.PyCompileError as e:
+                    print_err("ERROR: %s" % e.msg)
+                    return 1
+                precompiled = True
+            else:
+                print_err(
+                    "WARNING: the robot's python (%s) doesn't match this one (%s), "
+                    % (cache_tag, sys.implementation.cache_tag)
+                    + "compiling on the robot instead"
+                )
+
+        start = time.monotonic()
+        files_size = archive.files_size(robot_path, files)
+
+        if options.archive:
+            # A single file is uploaded, and unpacked on the robot
+            tmp_dir = tempfile.mkdtemp()
             try:
-                # Housekeeping first
+                archive_path = join(tmp_dir, archive.archive_name)
+                with open(archive_path, "wb") as fp:
+                    archive.write_archive(fp, robot_path, files, extra)
+
+                upload_size = os.path.getsize(archive_path)
+                controller.sftp(archive_path, commands.deploy_dir, mkdir=False)
+            finally:
+                shutil.rmtree(tmp_dir)
+        else:
+            # The files are uploaded from the source tree, without copying
+            # them first
+            upload_size = None
+            copied = controller.sftp_files(
+                robot_path,
+                files,
+                commands.py_new_deploy_dir,
+                extra,
+                mkdir=not options.in_place,
+            )
+            if copied:
+                logger.debug("Copied %d files that couldn't be linked", copied)
+
+        self._report_upload(
+            len(files), files_size, upload_size, time.monotonic() - start
+        )
+
+        if options.archive:
+            unpack_cmd = (
+                "mkdir -p %(py_new_deploy_dir)s; "
+                + "tar -xzf %(archive)s -C %(py_new_deploy_dir)s; "
+                + "rm -f %(archive)s"
+            ) % {
+                "py_new_deploy_dir": commands.py_new_deploy_dir,
+                "archive": commands.deploy_dir / archive.archive_name,
+            }
+
+            if options.in_place:
+                sshcmd = "%s '%s'" % (commands.bash_cmd, unpack_cmd)
                 logger.debug("SSH: %s", sshcmd)
                 controller.ssh(sshcmd)
+            else:
+                replace_cmd = unpack_cmd + "; " + replace_cmd
+
+        # start the netconsole listener now if requested, *before* we
+        # actually start the robot code, so we can see all messages
+        if (options.nc or options.nc_ds) and self.nc_thread is None:
+            from netconsole import run
+
+            nc_event = threading.Event()
+            self.nc_thread = threading.Thread(
+                target=run,
+                args=(controller.hostname,),
+                kwargs=dict(connect_event=nc_event, fakeds=options.nc_ds),
+                daemon=True,
+            )
+            self.nc_thread.start()
+            nc_event.wait(5)
+            logger.info("Netconsole is listening...")
+
+        if not options.in_place:
+            # the bytecode of the changed files was uploaded with them
+            if precompiled:
+                compile_cmd = ""
+            else:
+                compile_cmd = (
+                    "/usr/local/bin/python3 %s -m compileall -q -r 5 /home/lvuser/py;"
+                    % commands.compileall_flags
+                )
+
+            # Restart the robot code and we're done!
+            sshcmd = (
+                "%(bash_cmd)s '"
+                + "%(replace_cmd)s;"
+                + "%(compile_cmd)s"
+                + ". /etc/profile.d/natinst-path.sh; "
+                + "chown -R lvuser:ni %(py_deploy_dir)s; "
+                + "sync; "
+                + "/usr/local/frc/bin/frcKillRobot.sh -t -r || true"
+                + "'"
+            )
+
+            sshcmd %= {
+                "bash_cmd": commands.bash_cmd,
+                "compile_cmd": compile_cmd,
+                "py_deploy_dir": commands.py_deploy_dir,
+                "replace_cmd": replace_cmd,
+            }
+
+            logger.debug("SSH: %s", sshcmd)
+            controller.ssh(sshcmd)
+
+        print("\nSUCCESS: Deploy was successful!")
+        return 0
+
+    def _watch(self, controller, options, robot_path, commands):
+        # Deploys the code again each time it changes, until Ctrl-C
+
+        from robotpy_installer import installer
+
+        print()
+        print("Watching for changes, press Ctrl-C to stop...")
+
+        snapshot = manifest.stat_files(robot_path, manifest.deploy_files(robot_path))
+        pending = False
+
+        try:
+            while True:
+                time.sleep(self.watch_period)
+
+                current = manifest.stat_files(
+                    robot_path, manifest.deploy_files(robot_path)
+                )
+                if current != snapshot:
+                    # wait for the files to stop changing, editors often
+                    # save more than one file at a time
+                    snapshot = current
+                    pending = True
+                elif pending:
+                    pending = False
+                    print()
+                    try:
+                        self._deploy(controller, options, robot_path, commands)
+                    except installer.Error as e:
+                        print_err("ERROR: %s" % e)
+                    except OSError as e:
+                        # a file changed while it was being deployed, such
+                        # as when an editor replaces it to save it
+                        print_err("ERROR: %s, trying again" % e)
+                        pending = True
+        except KeyboardInterrupt:
+            pass
+
+        return 0
+
+    def _housekeeping(self, controller, sshcmd):
+        # Runs the housekeeping command, and returns the values it reported
+        # or None if the deploy can't continue
+
+        from robotpy_installer import installer
+
+        fixed_startup_dlls = False
+
+        while True:
+            try:
+                logger.debug("SSH: %s", sshcmd)
+                output = controller.ssh(sshcmd, get_output=True)
+                return self._parse_housekeeping(output)
             except installer.SshExecError as e:
-                doret = True
                 if e.retval == 87:
                     print_err(
                         "ERROR: python3 was not found on the roboRIO: have you installed robotpy?"
@@ -281,7 +667,7 @@ class PyFrcDeploy:
                     )
                 elif e.retval == 90:
                     print_err("ERROR: error running compileall")
-                elif e.retval == 91:
+                elif e.retval == 91 and not fixed_startup_dlls:
                     # Not an error; ssh in as admin and fix the startup dlls (Saves 24M of RAM)
                     # -> https://github.com/wpilibsuite/EclipsePlugins/pull/154
                     logger.info("Fixing StartupDLLs to save RAM...")
@@ -291,93 +677,56 @@ class PyFrcDeploy:
                     )
 
                     controller.username = "lvuser"
-                    doret = False
+
+                    # the command stopped before it reported anything, so
+                    # run the rest of it
+                    fixed_startup_dlls = True
+                    continue
                 else:
                     print_err("ERROR: %s" % e)
 
-                if doret:
-                    return 1
-
-            # Copy the files over, copy to a temporary directory first
-            # -> this is inefficient, but it's easier in sftp
-            tmp_dir = tempfile.mkdtemp()
-            try:
-                py_tmp_dir = join(tmp_dir, py_new_deploy_subdir)
-                self._copy_to_tmpdir(py_tmp_dir, robot_path)
-                controller.sftp(py_tmp_dir, deploy_dir, mkdir=not options.in_place)
-            finally:
-                shutil.rmtree(tmp_dir)
-
-            # start the netconsole listener now if requested, *before* we
-            # actually start the robot code, so we can see all messages
-            if options.nc or options.nc_ds:
-                from netconsole import run
-
-                nc_event = threading.Event()
-                nc_thread = threading.Thread(
-                    target=run,
-                    args=(controller.hostname,),
-                    kwargs=dict(connect_event=nc_event, fakeds=options.nc_ds),
-                    daemon=True,
-                )
-                nc_thread.start()
-                nc_event.wait(5)
-                logger.info("Netconsole is listening...")
-
-            if not options.in_place:
-                # Restart the robot code and we're done!
-                sshcmd = (
-                    "%(bash_cmd)s '"
-                    + "%(replace_cmd)s;"
-                    + "/usr/local/bin/python3 %(compileall_flags)s -m compileall -q -r 5 /home/lvuser/py;"
-                    + ". /etc/profile.d/natinst-path.sh; "
-                    + "chown -R lvuser:ni %(py_deploy_dir)s; "
-                    + "sync; "
-                    + "/usr/local/frc/bin/frcKillRobot.sh -t -r || true"
-                    + "'"
-                )
-
-                sshcmd %= {
-                    "bash_cmd": bash_cmd,
-                    "compileall_flags": compileall_flags,
-                    "py_deploy_dir": py_deploy_dir,
-                    "replace_cmd": replace_cmd,
-                }
-
-                logger.debug("SSH: %s", sshcmd)
-                controller.ssh(sshcmd)
-
-        except installer.Error as e:
-            print_err("ERROR: %s" % e)
-            return 1
-        else:
-            print("\nSUCCESS: Deploy was successful!")
+                return None
 
-        if nc_thread is not None:
-            nc_thread.join()
+    def _parse_housekeeping(self, output):
+        # Returns the values that the housekeeping command reported as
+        # NAME:value lines, and shows any other output
 
-        return 0
+        values = {}
 
-    def _copy_to_tmpdir(self, tmp_dir, robot_path):
+        for line in output.splitlines():
+            name, sep, value = line.partition(":")
+            if sep and name in ("MANIFEST", "CACHE_TAG"):
+                values[name] = value
+            else:
+                print(line)
 
-        upload_files = []
+        return values
 
-        for root, dirs, files in os.walk(robot_path):
-            prefix = root[len(robot_path) + 1 :]
-            os.mkdir(join(tmp_dir, prefix))
+    def _precompile(self, robot_path, files, local_manifest, py_deploy_dir, optimize):
+        # Returns the bytecode of the files to upload, by path
 
-            # skip .svn, .git, .hg, etc directories
-            for d in dirs[:]:
-                if d.startswith(".") or d == "__pycache__":
-                    dirs.remove(d)
-
-            # skip .pyc files
-            for filename in files:
+        cache = bytecode.BytecodeCache(
+            bytecode.cache_dir(robot_path, optimize), optimize
+        )
 
-                r, ext = splitext(filename)
-                if ext == "pyc" or r.startswith("."):
-                    continue
+        compiled = {}
+        for path in files:
+            if path.endswith(".py"):
+                compiled[cache.pyc_path(path)] = cache.compile(
+                    robot_path, path, local_manifest[path], str(py_deploy_dir / path)
+                )
 
-                shutil.copy(join(root, filename), join(tmp_dir, prefix, filename))
+        cache.prune(local_manifest)
+        return compiled
 
-        return upload_files
+    def _report_upload(self, count, files_size, upload_size, elapsed):
+        if upload_size is None:
+            print(
+                "Uploaded %d files (%.1f KiB) one at a time in %.1fs"
+                % (count, files_size / 1024.0, elapsed)
+            )
+        else:
+            print(
+                "Uploaded %d files (%.1f KiB) as a %.1f KiB archive in %.1fs"
+                % (count, files_size / 1024.0, upload_size / 1024.0, elapsed)
+            )
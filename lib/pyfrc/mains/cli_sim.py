@@ -1,4 +1,6 @@
+import argparse
 import inspect
+import os
 from os.path import abspath, dirname
 
 import hal_impl.functions
@@ -10,17 +12,108 @@ import logging
 logger = logging.getLogger("pyfrc.sim")
 
 
+def _time_scale(value):
+    if value == "max":
+        return None
+    scale = float(value)
+    if scale <= 0:
+        raise ValueError(value)
+    return scale
+
+
 class PyFrcSim:
     """
         Executes the robot code using the low fidelity simulator and shows
         a tk-based GUI to control the simulation
     """
 
+    # colors of the other robots on the field
+    robot_colors = ["blue", "orange", "purple", "cyan"]
+
     def __init__(self, parser):
-        pass
+        parser.add_argument(
+            "--speed",
+            type=_time_scale,
+            default=1.0,
+            help="Run the simulation this many times faster than real time, "
+            + "or 'max' to run it as fast as possible",
+        )
+        parser.add_argument(
+            "--lockstep",
+            action="store_true",
+            default=False,
+            help="Send DS packets and run physics on the robot thread at exact "
+            + "simulation times, so that every run behaves the same",
+        )
+        parser.add_argument(
+            "--robot",
+            nargs="+",
+            action="append",
+            default=[],
+            metavar=("ROBOT_PY", "START_POSITION"),
+            help="Simulate another robot at the same time, optionally at the "
+            + "named starting position. Can be specified more than once",
+        )
+        parser.add_argument(
+            "--nt-port",
+            type=int,
+            default=None,
+            help="Port for the NetworkTables server to listen on",
+        )
+        parser.add_argument(
+            "--headless",
+            action="store_true",
+            default=False,
+            help="Run the simulation without a GUI",
+        )
+        parser.add_argument(
+            "--script",
+            default=None,
+            help="Headless: file containing timed mode changes to run",
+        )
+        parser.add_argument(
+            "--port",
+            type=int,
+            default=None,
+            help="Headless: listen for mode changes on this localhost port",
+        )
+        # used by the other robots: their port is written to this file once
+        # they are listening, so that --port can be 0
+        parser.add_argument("--port-file", default=None, help=argparse.SUPPRESS)
+        parser.add_argument(
+            "--telemetry",
+            default=None,
+            help="Headless: write robot pose and HAL data to this file",
+        )
+        parser.add_argument(
+            "--telemetry-period",
+            type=float,
+            default=0.1,
+            help="Headless: simulation time between telemetry records",
+        )
+        parser.add_argument(
+            "--start-position",
+            default=None,
+            help="Headless: name of the starting position to use",
+        )
 
     def run(self, options, robot_class, **static_options):
 
+        for robot_args in options.robot:
+            if len(robot_args) > 2:
+                print(
+                    "Error: --robot takes a robot.py and an optional starting position"
+                )
+                return 1
+
+        if options.robot and (options.speed != 1.0 or options.lockstep):
+            print(
+                "Error: each robot runs in its own process with its own clock, "
+                + "so --robot can only be used in real time (without --speed "
+                + "or --lockstep)"
+            )
+            return 1
+
         import wpilib
 
         assert not hasattr(wpilib.DriverStation, "instance"), (
@@ -37,7 +130,17 @@ class PyFrcSim:
         # Load these late so tk isn't loaded each time we run a test
         from ..physics.core import PhysicsInitException
         from .. import sim
-        from ..sim.field.user_renderer import UserRenderer
+
+        if not options.headless:
+            try:
+                from ..sim.ui import configure_starting_position
+                from ..sim.field.user_renderer import UserRenderer
+            except ImportError as e:
+                if e.name in ("tkinter", "_tkinter"):
+                    print(
+                        "pyfrc robot simulation requires python tkinter support to be installed"
+                    )
+                raise
 
         # load the config json file
         robot_file = abspath(inspect.getfile(robot_class))
@@ -46,12 +149,33 @@ class PyFrcSim:
         _load_config(robot_path)
         config_obj = config.config_obj
 
-        sim.ui.configure_starting_position(config_obj)
+        if options.headless:
+            script = None
+            if options.script is not None:
+                with open(options.script) as fp:
+                    script = sim.headless.parse_script(fp)
+
+            sim.headless.configure_starting_position(config_obj, options.start_position)
+        else:
+            configure_starting_position(config_obj)
 
         fake_time = sim.FakeRealTime()
+        fake_time.set_time_scale(options.speed)
+
+        # this restarts the clock, so it must happen before the HAL records
+        # the program start time
+        if options.lockstep:
+            fake_time.set_lockstep()
+
         hal_impl.functions.hooks = pyfrc_fake_hooks.PyFrcFakeHooks(fake_time)
         hal_impl.functions.reset_hal()
 
+        if options.nt_port is not None:
+            # wpilib doesn't restart the server once it's running
+            from networktables import NetworkTables
+
+            NetworkTables.startServer(port=options.nt_port)
+
         sim_manager = sim.SimManager()
 
         try:
@@ -62,28 +186,93 @@ class PyFrcSim:
             return False
 
         robot_element = None
-        if controller.has_physics():
+        if controller.has_physics() and not options.headless:
             robot_element = sim.RobotElement(controller, config_obj)
 
         sim_manager.add_robot(controller)
 
-        controller.run()
-        controller.wait_for_robotinit()
-        if not controller.is_alive():
-            return 1
+        headless = None
+        telemetry = None
+
+        try:
+            if options.headless:
+                # created before the robot starts, so that a lockstep
+                # script is scheduled before any time passes
+                if options.telemetry is not None:
+                    telemetry = open(options.telemetry, "w")
+
+                headless = sim.HeadlessSim(
+                    sim_manager,
+                    fake_time,
+                    script=script,
+                    port=options.port,
+                    telemetry=telemetry,
+                    telemetry_period=options.telemetry_period,
+                )
+
+                if options.port_file is not None and headless.server is not None:
+                    tmp_file = options.port_file + ".tmp"
+                    with open(tmp_file, "w") as fp:
+                        fp.write(str(headless.server.server_address[1]))
+                    os.replace(tmp_file, options.port_file)
+
+            controller.run()
+            controller.wait_for_robotinit()
+            if not controller.is_alive():
+                return 1
+
+            # other robots each run in their own process
+            remotes = []
+            for robot_args in options.robot:
+                remote = sim.RemoteRobotController(
+                    robot_args[0], robot_args[1] if len(robot_args) > 1 else None
+                )
+                sim_manager.add_robot(remote)
+                remote.run()
+                remotes.append(remote)
+
+            # start them all before waiting for them, so they start together
+            other_elements = []
+            for i, remote in enumerate(remotes):
+                remote.wait_for_robotinit()
+
+                if not options.headless:
+                    element_config = {
+                        "pyfrc": {
+                            "field": config_obj["pyfrc"]["field"],
+                            "robot": remote.config_obj["pyfrc"]["robot"],
+                        }
+                    }
+                    color = self.robot_colors[i % len(self.robot_colors)]
+                    other_elements.append(
+                        sim.RobotElement(remote, element_config, color)
+                    )
+
+            if headless is not None:
+                return 0 if headless.run() else 1
+
+            ui = sim.SimUI(sim_manager, fake_time, config_obj)
+
+            if robot_element is not None:
+                ui.field.add_moving_element(robot_element)
+
+            for element in other_elements:
+                ui.field.add_moving_element(element)
 
-        ui = sim.SimUI(sim_manager, fake_time, config_obj)
+            UserRenderer._attach_ui(ui, robot_element)
 
-        if robot_element is not None:
-            ui.field.add_moving_element(robot_element)
+            ui.run()
 
-        UserRenderer._attach_ui(ui, robot_element)
+        finally:
+            # once it has finished, try to shut the robots down
+            # -> if it can't, then the user messed up
+            for robot in sim_manager.robots:
+                if not robot.stop():
+                    print("Error: could not stop the robot code! Check your code")
 
-        ui.run()
+            if telemetry is not None:
+                telemetry.close()
 
-        # once it has finished, try to shut the robot down
-        # -> if it can't, then the user messed up
-        if not controller.stop():
-            print("Error: could not stop the robot code! Check your code")
+            controller.physics_controller._log_timing()
 
         return 0
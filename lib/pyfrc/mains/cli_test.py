@@ -1,6 +1,10 @@
+import argparse
 import os
 import inspect
+import subprocess
 import sys
+import threading
+import time
 
 from os.path import abspath, dirname, exists, join
 
@@ -17,6 +21,47 @@ class _TryAgain(Exception):
     pass
 
 
+class _ShardPlugin:
+    """
+        Only runs every Nth test, used when running tests in parallel
+    """
+
+    def __init__(self, shard):
+        index, count = shard.split("/")
+        self.index = int(index)
+        self.count = int(count)
+
+    def pytest_collection_modifyitems(self, session, config, items):
+        selected = items[self.index :: self.count]
+        selected_ids = set(id(item) for item in selected)
+        deselected = [item for item in items if id(item) not in selected_ids]
+
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+            items[:] = selected
+
+
+def _stream_output(stream, prefix, lock):
+    for line in iter(stream.readline, b""):
+        with lock:
+            sys.stdout.write(prefix + line.decode("utf-8", "replace"))
+            sys.stdout.flush()
+    stream.close()
+
+
+def _merge_retvals(retvs):
+    # A job that didn't run any tests isn't an error unless all of them
+    # didn't run any tests. Jobs killed by a signal (including the ones that
+    # were stopped) have a negative retval, which sys.exit can't use, so
+    # they are counted as failed tests.
+    failed = [1 if retv < 0 else retv for retv in retvs if retv not in (0, 5)]
+    if failed:
+        return max(failed)
+    elif all(retv == 5 for retv in retvs):
+        return 5
+    return 0
+
+
 #
 # main test class
 #
@@ -26,6 +71,10 @@ class PyFrcTest:
     """
 
     def __init__(self, parser=None):
+        self.jobs = 1
+        self.shard = None
+        self.fork = False
+
         if parser:
             parser.add_argument(
                 "--builtin",
@@ -39,6 +88,21 @@ class PyFrcTest:
                 action="store_true",
                 help="This flag is passed when trying to determine coverage",
             )
+            parser.add_argument(
+                "-j",
+                "--jobs",
+                default=1,
+                type=int,
+                help="Run tests in this many processes in parallel (0 to use one process per CPU)",
+            )
+            parser.add_argument(
+                "--fork",
+                default=False,
+                action="store_true",
+                help="Initialize the robot and run robotInit once, and run each test "
+                + "in a forked copy of it",
+            )
+            parser.add_argument("--shard", default=None, help=argparse.SUPPRESS)
             parser.add_argument(
                 "pytest_args",
                 nargs="*",
@@ -53,6 +117,17 @@ class PyFrcTest:
         config.mode = "test"
         config.coverage_mode = options.coverage_mode
 
+        self.jobs = options.jobs
+        if self.jobs == 0:
+            self.jobs = os.cpu_count() or 1
+
+        if self.jobs > 1 and options.coverage_mode:
+            print("WARNING: --jobs is not supported with coverage, running serially")
+            self.jobs = 1
+
+        self.shard = options.shard
+        self.fork = options.fork
+
         return self.run_test(
             options.pytest_args, robot_class, options.builtin, **static_options
         )
@@ -65,6 +140,10 @@ class PyFrcTest:
 
     def _run_test(self, pytest_args, robot_class, use_builtin, **static_options):
 
+        jobs = self.jobs
+        shard = self.shard
+        original_args = list(pytest_args)
+
         # find test directory, change current directory so py.test can find the tests
         # -> assume that tests reside in tests or ../tests
 
@@ -111,13 +190,21 @@ class PyFrcTest:
 
             pytest_args.insert(0, abspath(inspect.getfile(basic)))
 
-        try:
-            retv = pytest.main(
-                pytest_args,
-                plugins=[
-                    pytest_plugin.PyFrcPlugin(robot_class, robot_file, robot_path)
-                ],
+        plugins = [
+            pytest_plugin.PyFrcPlugin(
+                robot_class, robot_file, robot_path, fork=self.fork
             )
+        ]
+        if shard is not None:
+            plugins.append(_ShardPlugin(shard))
+
+        try:
+            if jobs > 1:
+                retv = self._run_parallel(
+                    jobs, original_args, robot_file, use_builtin, curdir
+                )
+            else:
+                retv = pytest.main(pytest_args, plugins=plugins)
         finally:
             os.chdir(curdir)
 
@@ -129,6 +216,69 @@ class PyFrcTest:
 
         return retv
 
+    def _run_parallel(self, jobs, pytest_args, robot_file, use_builtin, curdir):
+        # Each job runs in its own process, because the HAL and wpilib
+        # have global state. The jobs each run every Nth test.
+
+        print("Running tests in %d parallel jobs" % jobs)
+
+        base_args = [sys.executable, robot_file, "test"]
+        if use_builtin:
+            base_args.append("--builtin")
+        if self.fork:
+            base_args.append("--fork")
+
+        procs = []
+        readers = []
+        lock = threading.Lock()
+
+        try:
+            for i in range(jobs):
+                args = base_args + ["--shard", "%d/%d" % (i, jobs), "--"] + pytest_args
+                proc = subprocess.Popen(
+                    args, cwd=curdir, stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+                )
+                procs.append(proc)
+
+                # output is shown as it happens, so a job that hangs can be
+                # found, and each line says which job it came from
+                reader = threading.Thread(
+                    target=_stream_output,
+                    args=(proc.stdout, "[job %d] " % (i + 1), lock),
+                    daemon=True,
+                )
+                reader.start()
+                readers.append(reader)
+
+            retvs = [None] * jobs
+            while None in retvs:
+                for i, proc in enumerate(procs):
+                    if retvs[i] is None:
+                        retvs[i] = proc.poll()
+
+                failed = [i for i, retv in enumerate(retvs) if retv not in (None, 0, 5)]
+                if failed:
+                    with lock:
+                        print(
+                            "Job %d failed, stopping the other jobs" % (failed[0] + 1)
+                        )
+                    break
+
+                time.sleep(0.05)
+
+        finally:
+            # don't leave the jobs running on failure or Ctrl-C
+            for proc in procs:
+                if proc.poll() is None:
+                    proc.terminate()
+
+            for proc in procs:
+                proc.wait()
+            for reader in readers:
+                reader.join()
+
+        return _merge_retvals([proc.returncode for proc in procs])
+
     def _no_tests(self, r=1):
         print()
         print("Looked for tests at:")
@@ -0,0 +1,213 @@
+"""
+    Collision detection between the robot and the objects on the field.
+
+    When ``collisions`` is set to true in the ``field`` section of your
+    sim/config.json, the objects in the field are treated as solid, and
+    :meth:`.PhysicsInterface.distance_drive` (and the other drive functions)
+    won't move the robot into them::
+
+        {
+          "pyfrc": {
+            "field": {
+              "collisions": true,
+              "objects": [
+                {"color": "grey", "rect": [0, 10, 27, 1]}
+              ]
+            }
+          }
+        }
+
+    The objects must be convex, split other shapes into multiple objects.
+    They are stored in a uniform grid, so each step only checks the objects
+    that are near the robot instead of all of them.
+"""
+
+import math
+
+
+def _bbox(pts):
+    xs = [p[0] for p in pts]
+    ys = [p[1] for p in pts]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _bbox_overlap(a, b):
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def _separated(a, b):
+    # True if one of the edges of a is a separating axis
+    for i in range(len(a)):
+        x1, y1 = a[i - 1]
+        x2, y2 = a[i]
+        nx = y1 - y2
+        ny = x2 - x1
+        if nx == 0 and ny == 0:
+            continue
+
+        pa = [x * nx + y * ny for x, y in a]
+        pb = [x * nx + y * ny for x, y in b]
+        if max(pa) <= min(pb) or max(pb) <= min(pa):
+            return True
+
+    return False
+
+
+def polygons_intersect(a, b):
+    """
+        :param a: list of (x,y) points of a convex polygon
+        :param b: list of (x,y) points of a convex polygon
+        :returns: True if the two polygons overlap. Polygons that only
+                  touch do not overlap.
+    """
+    return not (_separated(a, b) or _separated(b, a))
+
+
+def penetration(a, b):
+    """
+        :param a: list of (x,y) points of a convex polygon
+        :param b: list of (x,y) points of a convex polygon
+        :returns: How deep the polygons overlap: the shortest distance
+                  that one of them must move to separate them, or 0 if they
+                  don't overlap
+    """
+    depth = None
+
+    for poly in (a, b):
+        for i in range(len(poly)):
+            x1, y1 = poly[i - 1]
+            x2, y2 = poly[i]
+            nx = y1 - y2
+            ny = x2 - x1
+            n = math.hypot(nx, ny)
+            if n == 0:
+                continue
+
+            pa = [(x * nx + y * ny) / n for x, y in a]
+            pb = [(x * nx + y * ny) / n for x, y in b]
+            overlap = min(max(pa) - min(pb), max(pb) - min(pa))
+            if overlap <= 0:
+                return 0.0
+            if depth is None or overlap < depth:
+                depth = overlap
+
+    return depth or 0.0
+
+
+def robot_polygon(x, y, angle, w, l):
+    """
+        :param x:     Center of the robot (in feet)
+        :param y:     Center of the robot (in feet)
+        :param angle: Angle of the robot (in radians)
+        :param w:     Width of the robot (in feet), along its direction of travel
+        :param l:     Length of the robot (in feet)
+        :returns: The corners of the robot on the field
+    """
+    c = math.cos(angle)
+    s = math.sin(angle)
+    hw = w / 2.0
+    hl = l / 2.0
+    return [
+        (x + px * c - py * s, y + px * s + py * c)
+        for px, py in ((-hw, -hl), (hw, -hl), (hw, hl), (-hw, hl))
+    ]
+
+
+class CollisionGrid:
+    """
+        Stores a set of static polygons in a uniform grid, so that finding
+        the polygons that collide with an object only needs to look at the
+        polygons near it
+    """
+
+    def __init__(self, polygons, cell_size=2.0):
+        """
+            :param polygons:  list of polygons, each a list of (x,y) points
+            :param cell_size: Size of each grid cell (in feet)
+        """
+        self.cell_size = cell_size
+        self.polygons = [list(p) for p in polygons]
+        self.bboxes = [_bbox(p) for p in self.polygons]
+
+        # maps (col, row) to the index of every polygon whose bounding box
+        # overlaps that cell
+        self.cells = {}
+        for idx, bbox in enumerate(self.bboxes):
+            for cell in self._cells(bbox):
+                self.cells.setdefault(cell, []).append(idx)
+
+    @classmethod
+    def from_config(cls, config_obj, cell_size=2.0):
+        """
+            Creates a grid from the objects in ``config_obj["pyfrc"]["field"]``
+        """
+        polygons = []
+        for obj in config_obj["pyfrc"]["field"]["objects"]:
+            rect = obj.get("rect")
+            if rect:
+                x, y, w, h = rect
+                polygons.append([(x, y), (x + w, y), (x + w, y + h), (x, y + h)])
+            else:
+                polygons.append([tuple(pt) for pt in obj["points"]])
+
+        return cls(polygons, cell_size)
+
+    def _cells(self, bbox):
+        cs = self.cell_size
+        x0 = int(math.floor(bbox[0] / cs))
+        y0 = int(math.floor(bbox[1] / cs))
+        x1 = int(math.floor(bbox[2] / cs))
+        y1 = int(math.floor(bbox[3] / cs))
+        for i in range(x0, x1 + 1):
+            for j in range(y0, y1 + 1):
+                yield i, j
+
+    def candidates(self, pts):
+        """
+            :param pts: list of (x,y) points
+            :returns: indices of the polygons that are near the given points
+        """
+        found = set()
+        cells = self.cells
+        for cell in self._cells(_bbox(pts)):
+            found.update(cells.get(cell, ()))
+        return found
+
+    def collisions(self, pts):
+        """
+            :param pts: list of (x,y) points of a polygon
+            :returns: indices of the polygons that collide with it
+        """
+        bbox = _bbox(pts)
+        return [
+            idx
+            for idx in sorted(self.candidates(pts))
+            if _bbox_overlap(bbox, self.bboxes[idx])
+            and polygons_intersect(pts, self.polygons[idx])
+        ]
+
+    def penetration(self, pts):
+        """
+            :param pts: list of (x,y) points of a polygon
+            :returns: The sum of how deep it overlaps each of the polygons,
+                      see :func:`penetration`
+        """
+        bbox = _bbox(pts)
+        return sum(
+            penetration(pts, self.polygons[idx])
+            for idx in self.candidates(pts)
+            if _bbox_overlap(bbox, self.bboxes[idx])
+        )
+
+    def collides(self, pts):
+        """
+            :param pts: list of (x,y) points of a polygon
+            :returns: True if it collides with any of the polygons
+        """
+        bbox = _bbox(pts)
+        for idx in self.candidates(pts):
+            if _bbox_overlap(bbox, self.bboxes[idx]) and polygons_intersect(
+                pts, self.polygons[idx]
+            ):
+                return True
+        return False
@@ -47,6 +47,40 @@
             }
           }
         }
+
+    Physics update rate
+    -------------------
+
+    By default, ``update_sim`` is called whenever the robot code waits, but
+    not more than 100 times per second, so ``tm_diff`` depends on what your
+    robot code is doing. To make the cost and accuracy of the physics
+    predictable, you can instead set a fixed rate (in updates per second of
+    simulation time) in the ``physics`` section of sim/config.json::
+
+        {
+          "pyfrc": {
+            "physics": {
+              "rate": 200,
+              "batch": false
+            }
+          }
+        }
+
+    Every step that is due is run with ``tm_diff`` set to ``1 / rate``. If
+    your model can integrate several steps itself, set ``batch`` to true and
+    ``update_sim`` will be called once per robot loop instead, with
+    ``tm_diff`` set to a whole number of steps.
+
+    When the robot code stalls (in a debugger, or behind a slow call), a lot
+    of steps become due at once. Only the steps in the last ``max_catchup``
+    seconds (0.1 by default) are run, and the older ones are dropped, so
+    that the physics doesn't fall further behind trying to catch up. Set it
+    to None to always run every step.
+
+    The time taken by each call to ``update_sim`` is recorded, and printed
+    when the simulator exits. A warning is logged when a call takes longer
+    than ``cost_warning`` (0.5 by default) times the ``tm_diff`` it
+    simulated, since the simulation can't keep up with real time then.
     
 """
 
@@ -54,6 +88,7 @@ import imp
 import math
 from os.path import exists, join
 import threading
+import time
 
 import logging
 
@@ -61,6 +96,9 @@ logger = logging.getLogger("pyfrc.physics")
 
 from hal_impl.data import hal_data
 
+from .collision import CollisionGrid, robot_polygon
+from .histogram import TimingHistogram
+
 
 class PhysicsInitException(Exception):
     pass
@@ -136,6 +174,35 @@ class PhysicsInterface:
         self.robot_w = config_obj["pyfrc"]["robot"]["w"]
         self.robot_l = config_obj["pyfrc"]["robot"]["l"]
 
+        # field objects that the robot can't drive through
+        self.collision_grid = None
+        if config_obj["pyfrc"]["field"].get("collisions"):
+            self.collision_grid = CollisionGrid.from_config(config_obj)
+
+        # fixed rate physics steps, if configured
+        physics_config = config_obj["pyfrc"].get("physics", {})
+        rate = physics_config.get("rate")
+        if rate is not None and rate <= 0:
+            logger.error("Physics rate must be positive, not %s", rate)
+            raise PhysicsInitException()
+
+        self.physics_step = 1.0 / rate if rate else None
+        self.physics_batch = physics_config.get("batch", False)
+        self._step_start = None
+        self._step_count = 0
+
+        # steps that are too far behind are dropped instead of run
+        max_catchup = physics_config.get("max_catchup", 0.1)
+        self.max_steps = None
+        if self.physics_step is not None and max_catchup is not None:
+            self.max_steps = max(1, int(max_catchup / self.physics_step + 1e-6))
+        self.dropped_steps = 0
+
+        # how long update_sim takes
+        self.update_timing = TimingHistogram()
+        self.cost_warning = physics_config.get("cost_warning", 0.5)
+        self.slow_updates = 0
+
         # HACK: Used for drawing
         self.vx = 0
         self.vy = 0
@@ -194,6 +261,9 @@ class PhysicsInterface:
 
         if last_tm is None:
             self.last_tm = now
+            self._step_start = now
+        elif self.physics_step is not None:
+            self._run_steps(now)
         else:
 
             # When using time, always do it based on a differential! You may
@@ -202,14 +272,74 @@ class PhysicsInterface:
 
             # Don't run physics calculations more than 100hz
             if tm_diff > 0.010:
-                try:
-                    self.engine.update_sim(self.hal_data, now, tm_diff)
-                except Exception as e:
-                    raise Exception(
-                        "User physics code raised an exception (see above)"
-                    ) from e
+                self._update_sim(now, tm_diff)
                 self.last_tm = now
 
+    def _run_steps(self, now):
+
+        step = self.physics_step
+
+        # step times are computed from the step count instead of adding up
+        # the steps, so rounding errors don't change the number of steps
+        due = int((now - self._step_start) / step + 1e-6) - self._step_count
+        if due <= 0:
+            return
+
+        if self.max_steps is not None and due > self.max_steps:
+            dropped = due - self.max_steps
+            if not self.dropped_steps:
+                logger.warning(
+                    "Physics fell %.3fs behind, dropping the steps before the "
+                    + "last %.3fs",
+                    due * step,
+                    self.max_steps * step,
+                )
+            self.dropped_steps += dropped
+            self._step_count += dropped
+            due = self.max_steps
+
+        for count in [due] if self.physics_batch else [1] * due:
+            self._step_count += count
+            self.last_tm = self._step_start + self._step_count * step
+            self._update_sim(self.last_tm, count * step)
+
+    def _update_sim(self, now, tm_diff):
+        start = time.perf_counter()
+        try:
+            self.engine.update_sim(self.hal_data, now, tm_diff)
+        except Exception as e:
+            raise Exception("User physics code raised an exception (see above)") from e
+
+        elapsed = time.perf_counter() - start
+        self.update_timing.add(elapsed)
+
+        if self.cost_warning is not None and elapsed > self.cost_warning * tm_diff:
+            if not self.slow_updates:
+                logger.warning(
+                    "update_sim took %.3fms to simulate %.3fms, the physics "
+                    + "model may be too slow for the simulator to keep up",
+                    elapsed * 1000,
+                    tm_diff * 1000,
+                )
+            self.slow_updates += 1
+
+    def _log_timing(self):
+        if self.engine is None:
+            return
+
+        logger.info("update_sim timing: %s", self.update_timing.summary())
+        if self.slow_updates:
+            logger.warning(
+                "%d of %d calls to update_sim were too slow",
+                self.slow_updates,
+                self.update_timing.count,
+            )
+        if self.dropped_steps:
+            logger.warning(
+                "%d physics steps were dropped because the simulation fell behind",
+                self.dropped_steps,
+            )
+
     def _set_robot_enabled(self, enabled):
         self.robot_enabled = enabled
 
@@ -300,25 +430,55 @@ class PhysicsInterface:
            Will update the robot's position on the simulation field.
            
            This moves the robot some relative distance and angle from
-           its current position.
+           its current position. If collisions are enabled and the robot
+           would hit an object on the field, it only turns, or doesn't move
+           at all if turning would hit the object too.
            
            :param x:     Feet to move the robot in the x direction
            :param y:     Feet to move the robot in the y direction
            :param angle: Radians to turn the robot
         """
         with self._lock:
-            self.vx += x
-            self.vy += y
-            self.angle += angle
+            new_angle = self.angle + angle
+
+            c = math.cos(new_angle)
+            s = math.sin(new_angle)
 
-            c = math.cos(self.angle)
-            s = math.sin(self.angle)
+            new_x = self.x + x * c - y * s
+            new_y = self.y + x * s + y * c
 
-            self.x += x * c - y * s
-            self.y += x * s + y * c
+            if self.collision_grid is not None:
+                if not self._can_move(new_x, new_y, new_angle):
+                    # it may still be able to turn, to get away from a wall
+                    if not self._can_move(self.x, self.y, new_angle):
+                        return
+
+                    new_x = self.x
+                    new_y = self.y
+                    x = y = 0
+
+            self.vx += x
+            self.vy += y
+            self.angle = new_angle
+            self.x = new_x
+            self.y = new_y
 
             self._update_gyros(angle)
 
+    def _can_move(self, new_x, new_y, new_angle):
+        # Moves that don't collide are allowed. If the robot is already
+        # overlapping an object (it was started there, or got there by
+        # rounding), moves that don't make the overlap worse are allowed too,
+        # so it doesn't get stuck.
+        grid = self.collision_grid
+        new_pts = robot_polygon(new_x, new_y, new_angle, self.robot_w, self.robot_l)
+        if not grid.collides(new_pts):
+            return True
+
+        pts = robot_polygon(self.x, self.y, self.angle, self.robot_w, self.robot_l)
+        current = grid.penetration(pts)
+        return current > 0 and grid.penetration(new_pts) <= current + 1e-9
+
     def _update_gyros(self, angle):
 
         angle = math.degrees(angle)
@@ -0,0 +1,82 @@
+"""
+    A histogram of durations that is cheap enough to update on every
+    physics step. Durations are counted in buckets that are 1/8 of a power
+    of two wide, so percentiles are accurate to within about 12%.
+"""
+
+import math
+
+# bucket for durations of zero, sorts before all others
+_zero = float("-inf")
+
+
+class TimingHistogram:
+    """
+        Records durations (in seconds), and reports percentiles of them
+    """
+
+    #: Number of buckets per power of two
+    sub_buckets = 8
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, secs):
+        """
+            :param secs: Duration to record
+        """
+        self.count += 1
+        self.total += secs
+        if secs > self.max:
+            self.max = secs
+
+        if secs > 0:
+            # secs = m * 2**e, where 0.5 <= m < 1
+            m, e = math.frexp(secs)
+            key = e * self.sub_buckets + int((m - 0.5) * 2 * self.sub_buckets)
+        else:
+            # too fast for the clock to notice
+            key = _zero
+
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+
+    def percentile(self, pct):
+        """
+            :param pct: Percentile to compute, 0-100
+            :returns: an upper bound of the duration that `pct` percent of
+                      the recorded durations are less than, or None if
+                      nothing was recorded
+        """
+        if not self.count:
+            return None
+
+        needed = self.count * pct / 100.0
+        seen = 0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen >= needed:
+                break
+
+        if key == _zero:
+            return 0.0
+
+        e, sub = divmod(key + 1, self.sub_buckets)
+        upper = math.ldexp(0.5 + sub / (2.0 * self.sub_buckets), e)
+        return min(upper, self.max)
+
+    def summary(self):
+        """
+            :returns: a one line description of the recorded durations
+        """
+        if not self.count:
+            return "no samples"
+
+        return "%d samples, p50 %.3fms, p99 %.3fms, max %.3fms" % (
+            self.count,
+            self.percentile(50) * 1000,
+            self.percentile(99) * 1000,
+            self.max * 1000,
+        )
@@ -0,0 +1,180 @@
+"""
+    Normally the physics models are driven by the simulator or the test
+    runner as your robot code runs. The rollout functions in this module
+    instead drive a model directly from a sequence of motor commands, without
+    starting wpilib or a robot. This is useful for quickly evaluating many
+    different command sequences, such as when tuning autonomous paths.
+
+    Each element of ``commands`` holds the arguments that would be passed to
+    the model's ``get_distance`` or ``get_vector`` method at that step. The
+    commands can be a list, a generator, or a 2D NumPy array with one row per
+    step::
+
+        from pyfrc.physics import rollout, tankmodel
+
+        drivetrain = tankmodel.TankModel.theory(...)
+
+        # drive forward for two seconds, then turn for one second
+        commands = [(-1.0, 1.0)] * 100 + [(-1.0, 0.5)] * 50
+
+        trajectory = rollout.rollout(drivetrain, commands, tm_diff=0.02)
+        print(trajectory.x[-1], trajectory.y[-1], trajectory.angle[-1])
+
+    If the model is a :class:`.BatchTankModel`, all drivetrains in the batch
+    are rolled out at once. Each command is a pair of arrays (or scalars),
+    and the trajectory holds 2D arrays with one row per step and one column
+    per drivetrain.
+
+    The pose is updated the same way as :meth:`.PhysicsInterface.distance_drive`,
+    so a rollout produces the same motion as the simulator would (assuming the
+    robot is enabled).
+"""
+
+import collections
+import math
+import typing
+
+from .drivetrains import FourMotorDrivetrain, MecanumDrivetrain, TwoMotorDrivetrain
+from .tankmodel import BatchTankModel
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+Trajectory = collections.namedtuple("Trajectory", ["time", "x", "y", "angle"])
+Trajectory.__doc__ = """
+    Robot pose at each step of a rollout. Each attribute is a list with one
+    element per step, starting with the initial pose at time zero. For
+    a :class:`.BatchTankModel` they are 2D arrays instead.
+"""
+Trajectory.time.__doc__ = "Time of each step (in seconds)"
+Trajectory.x.__doc__ = "X position of the robot (in feet)"
+Trajectory.y.__doc__ = "Y position of the robot (in feet)"
+Trajectory.angle.__doc__ = "Angle of the robot (in radians)"
+
+
+def _get_step_fn(model):
+    # Returns a function that takes a command and tm_diff, and returns the
+    # distance the robot moved relative to itself, same as TankModel.get_distance
+
+    if isinstance(model, (TwoMotorDrivetrain, FourMotorDrivetrain)):
+
+        def _step(command, tm_diff):
+            # same as PhysicsInterface.drive
+            speed, rotation_speed = model.get_vector(*command)
+            distance = speed * tm_diff
+            angle = rotation_speed * tm_diff
+            return distance * math.cos(angle), distance * math.sin(angle), angle
+
+    elif isinstance(model, MecanumDrivetrain):
+
+        def _step(command, tm_diff):
+            # same as PhysicsInterface.vector_drive
+            vx, vy, vw = model.get_vector(*command)
+            angle = vw * tm_diff
+            vx = vx * tm_diff
+            vy = vy * tm_diff
+            x = vx * math.sin(angle) + vy * math.cos(angle)
+            y = vx * math.cos(angle) + vy * math.sin(angle)
+            return x, y, angle
+
+    elif hasattr(model, "get_distance"):
+
+        def _step(command, tm_diff):
+            return model.get_distance(*command, tm_diff)
+
+    else:
+        raise TypeError("Don't know how to rollout %r" % (model,))
+
+    return _step
+
+
+def rollout(
+    model,
+    commands: typing.Iterable[typing.Sequence],
+    tm_diff: float = 0.02,
+    x: float = 0,
+    y: float = 0,
+    angle: float = 0,
+) -> Trajectory:
+    """
+        Drives a drivetrain model with a sequence of motor commands and
+        records the resulting pose of the robot.
+
+        :param model:    A :class:`.TankModel`, :class:`.BatchTankModel`, one
+                         of the drivetrains in :mod:`pyfrc.physics.drivetrains`,
+                         or any object with a ``get_distance`` method that
+                         behaves like :meth:`.TankModel.get_distance`
+        :param commands: Motor values for each step
+        :param tm_diff:  Amount of time that each command is applied for
+        :param x:        Starting x position of the robot (in feet)
+        :param y:        Starting y position of the robot (in feet)
+        :param angle:    Starting angle of the robot (in radians)
+
+        :returns: The pose of the robot at each step
+    """
+
+    step = _get_step_fn(model)
+
+    if isinstance(model, BatchTankModel):
+        cos = np.cos
+        sin = np.sin
+        n = len(model)
+        x = np.full(n, x, dtype=float)
+        y = np.full(n, y, dtype=float)
+        angle = np.full(n, angle, dtype=float)
+    else:
+        cos = math.cos
+        sin = math.sin
+
+    times = [0.0]
+    xs = [x]
+    ys = [y]
+    angles = [angle]
+
+    now = 0.0
+
+    for command in commands:
+        dx, dy, dangle = step(command, tm_diff)
+
+        # same as PhysicsInterface.distance_drive
+        angle = angle + dangle
+        c = cos(angle)
+        s = sin(angle)
+        x = x + dx * c - dy * s
+        y = y + dx * s + dy * c
+
+        now += tm_diff
+
+        times.append(now)
+        xs.append(x)
+        ys.append(y)
+        angles.append(angle)
+
+    if isinstance(model, BatchTankModel):
+        return Trajectory(np.array(times), np.stack(xs), np.stack(ys), np.stack(angles))
+
+    return Trajectory(times, xs, ys, angles)
+
+
+def rollout_motion(
+    motion, commands: typing.Iterable[float], tm_diff: float = 0.02
+) -> typing.List[float]:
+    """
+        Drives a :class:`.LinearMotion` with a sequence of motor values
+
+        :param motion:   The motion to drive
+        :param commands: Motor value for each step
+        :param tm_diff:  Amount of time that each motor value is applied for
+
+        :returns: Position of the motion (in feet) after each step, starting
+                  with the initial position
+    """
+
+    positions = [motion.position_ft]
+    for motor_val in commands:
+        motion.compute(motor_val, tm_diff)
+        positions.append(motion.position_ft)
+
+    return positions
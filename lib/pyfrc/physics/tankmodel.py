@@ -20,6 +20,11 @@ from .units import units, Helpers
 
 import logging
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 logger = logging.getLogger("pyfrc.physics")
 
 # default parameters for a kitbot
@@ -32,6 +37,12 @@ _kitbot_length = 30.0 * units.inch + _bumper_length * 2
 _inertia_units = (units.foot ** 2) * units.pound
 _bm_units = units.foot * units.pound
 
+# Integration methods supported by the TankModel
+_integrators = ("heun", "exact")
+
+# Maximum number of distinct timesteps to cache discretizations for
+_max_discretizations = 256
+
 
 class MotorModel:
     """
@@ -74,6 +85,31 @@ class MotorModel:
         self._kv = kv
         self._ka = ka
 
+        # discretizations of the motor ODE, keyed by timestep (see compute_exact)
+        self._discretizations = {}
+
+    def _get_applied_voltage(self, motor_pct: float) -> float:
+        appliedVoltage = self._nominalVoltage * motor_pct
+        return math.copysign(
+            max(abs(appliedVoltage) - self._vintercept, 0), appliedVoltage
+        )
+
+    def _get_discretization(self, tm_diff: float) -> typing.Tuple[float, float]:
+        # The timestep is quantized to 10us, the same resolution that the
+        # TankModel uses to split time into steps
+        key = int(tm_diff * 100000)
+        d = self._discretizations.get(key)
+        if d is None:
+            if len(self._discretizations) >= _max_discretizations:
+                self._discretizations.clear()
+
+            tau = self._ka / self._kv
+            decay = math.exp(-(key / 100000.0) / tau)
+            d = (decay, (1.0 - decay) * tau)
+            self._discretizations[key] = d
+
+        return d
+
     def compute(self, motor_pct: float, tm_diff: float) -> float:
         """
             :param motor_pct: Percentage of power for motor in range [1..-1]
@@ -82,10 +118,7 @@ class MotorModel:
             :returns: velocity
         """
 
-        appliedVoltage = self._nominalVoltage * motor_pct
-        appliedVoltage = math.copysign(
-            max(abs(appliedVoltage) - self._vintercept, 0), appliedVoltage
-        )
+        appliedVoltage = self._get_applied_voltage(motor_pct)
 
         # Heun's method (taken from Ether's drivetrain calculator)
         # -> yn+1 = yn + (h/2) (f(xn, yn) + f(xn + h, yn +  h f(xn, yn)))
@@ -106,6 +139,38 @@ class MotorModel:
 
         return self.velocity
 
+    def compute_exact(self, motor_pct: float, tm_diff: float) -> float:
+        """
+            Same as :meth:`compute`, but solves the motor equation exactly
+            instead of approximating it, so ``tm_diff`` can be arbitrarily
+            large without losing accuracy.
+
+            Between calls the applied voltage is constant, so the motor equation
+            ``V = kv * v + ka * a`` is a linear ODE with the solution
+            ``v(t) = vss + (v0 - vss) * exp(-t * kv / ka)``, where ``vss`` is
+            the steady state velocity ``V / kv``.
+
+            :param motor_pct: Percentage of power for motor in range [1..-1]
+            :param tm_diff:   Time elapsed since this function was last called
+
+            :returns: velocity
+        """
+
+        appliedVoltage = self._get_applied_voltage(motor_pct)
+        decay, decay_integral = self._get_discretization(tm_diff)
+        tm_diff = int(tm_diff * 100000) / 100000.0
+
+        vss = appliedVoltage / self._kv
+        v0 = self.velocity
+
+        v1 = vss + (v0 - vss) * decay
+        self.position += vss * tm_diff + (v0 - vss) * decay_integral
+
+        self.velocity = v1
+        self.acceleration = (appliedVoltage - self._kv * v1) / self._ka
+
+        return self.velocity
+
 
 class TankModel:
     """
@@ -137,6 +202,12 @@ class TankModel:
                   Output units for velocity and acceleration are in ft/s and
                   ft/s^2
         
+        By default the model is integrated numerically using Heun's method in
+        small timesteps. If you pass ``integrator="exact"``, the motor equations
+        are instead solved analytically, which is faster and advances the model
+        by any amount of time in a single step. The exact integrator assumes
+        that the robot follows a circular arc between calls.
+
         Example usage for a 90lb robot with 2 CIM motors on each side with 6 inch
         wheels::
 
@@ -177,6 +248,7 @@ class TankModel:
         wheel_diameter: units.Quantity = 6 * units.inch,
         vintercept: units.volts = 1.3 * units.volts,
         timestep: int = 5 * units.ms,
+        integrator: str = "heun",
     ):
         r"""
             Use this to create the drivetrain model when you haven't measured
@@ -194,6 +266,7 @@ class TankModel:
                                     torque to overcome steady-state friction (see the
                                     paper for more details)
             :param timestep_ms:     Model computation timestep
+            :param integrator:      Integration method, either "heun" or "exact"
             
             Computation of ``kv`` and ``ka`` are done as follows:
             
@@ -267,6 +340,7 @@ class TankModel:
             ka,
             vintercept,
             timestep,
+            integrator,
         )
 
     def __init__(
@@ -283,6 +357,7 @@ class TankModel:
         r_ka: units.Quantity,
         r_vi: units.volts,
         timestep: units.Quantity = 5 * units.ms,
+        integrator: str = "heun",
     ):
         """
             Use the constructor if you have measured ``kv``, ``ka``, and
@@ -307,7 +382,9 @@ class TankModel:
             :param r_kv:         Right side ``kv``
             :param r_ka:         Right side ``ka``
             :param r_vi:         Right side ``Vintercept``
-            :param timestep:     Model computation timestep
+            :param timestep:     Model computation timestep (only used by the
+                                 "heun" integrator)
+            :param integrator:   Integration method, either "heun" or "exact"
         """
 
         # check input parameters
@@ -317,6 +394,12 @@ class TankModel:
         Helpers.ensure_length(robot_length)
         Helpers.ensure_time(timestep)
 
+        if integrator not in _integrators:
+            raise ValueError(
+                "integrator must be one of %s, not %r"
+                % (", ".join(_integrators), integrator)
+            )
+
         logger.info(
             "Robot base: %.1fx%.1f frame, %.1f wheelbase, %.1f mass",
             robot_width.m,
@@ -334,6 +417,7 @@ class TankModel:
         self._bm = _bm_units.m_from((x_wheelbase / 2.0) * robot_mass)
 
         self._timestep = units.milliseconds.m_from(timestep, name="timestep") * 100
+        self._integrator = integrator
 
     @property
     def l_velocity(self):
@@ -393,6 +477,9 @@ class TankModel:
                       pass in one of the values from each side
         """
 
+        if self._integrator == "exact":
+            return self._get_distance_exact(l_motor, r_motor, tm_diff)
+
         # This isn't quite right, the right way is to use matrix math. However,
         # this is Good Enough for now...
         x = 0
@@ -437,3 +524,248 @@ class TankModel:
             angle += turn
 
         return x, y, angle
+
+    def _get_distance_exact(
+        self, l_motor: float, r_motor: float, tm_diff: float
+    ) -> typing.Tuple[float, float, float]:
+
+        l_position = self._lmotor.position
+        r_position = self._rmotor.position
+
+        self._lmotor.compute_exact(-l_motor, tm_diff)
+        self._rmotor.compute_exact(r_motor, tm_diff)
+
+        # Velocity and rotation are linear in the wheel velocities, so the
+        # distance and angle travelled follow directly from the wheel travel
+        l = self._lmotor.position - l_position
+        r = self._rmotor.position - r_position
+
+        distance = (l + r) * 0.5
+        angle = self._bm * (l - r) / self._inertia
+
+        # assume the robot travelled along a circular arc
+        if abs(angle) < 1e-9:
+            return distance, 0.0, angle
+
+        radius = distance / angle
+        x = radius * math.sin(angle)
+        y = radius * (1.0 - math.cos(angle))
+
+        return x, y, angle
+
+
+class BatchTankModel:
+    """
+        Simulates many :class:`TankModel` drivetrains at once using NumPy,
+        which is useful for sweeping robot parameters such as gearing or mass.
+        The state of all drivetrains is stored as arrays, and every call to
+        :meth:`get_distance` advances all of them together using the same
+        Heun's method steps as :class:`TankModel`.
+
+        .. note:: This requires NumPy to be installed
+
+        Each drivetrain is described by a :class:`TankModel`, so the
+        parameters are derived in exactly the same way as the scalar model::
+
+            from pyfrc.physics import motor_cfgs, tankmodel
+            from pyfrc.physics.units import units
+
+            batch = tankmodel.BatchTankModel.theory(
+                motor_cfgs.MOTOR_CFG_CIM,
+                robot_mass=[90 * units.lbs, 110 * units.lbs, 130 * units.lbs],
+                gearing=10.71,
+                nmotors=2,
+            )
+
+            # x, y, angle are arrays with one element per drivetrain
+            x, y, angle = batch.get_distance(l_motors, r_motors, tm_diff)
+    """
+
+    @classmethod
+    def theory(cls, motor_config: MotorModelConfig, **kwargs):
+        """
+            Creates a batch of drivetrains via :func:`TankModel.theory`. Takes
+            the same arguments, but any argument may also be a list or tuple
+            with one value per drivetrain. All lists must be the same length.
+        """
+
+        n = None
+        for k, v in kwargs.items():
+            if isinstance(v, (list, tuple)):
+                if n is None:
+                    n = len(v)
+                elif len(v) != n:
+                    raise ValueError("%s must have %d elements" % (k, n))
+
+        if n is None:
+            n = 1
+
+        models = []
+        for i in range(n):
+            args = {
+                k: v[i] if isinstance(v, (list, tuple)) else v
+                for k, v in kwargs.items()
+            }
+            models.append(TankModel.theory(motor_config, **args))
+
+        return cls(models)
+
+    def __init__(self, models: typing.Sequence[TankModel]):
+        """
+            :param models: Drivetrain models to simulate. Only their parameters
+                           are used, the models themselves are not modified.
+                           All models must use the same timestep, and the
+                           "heun" integrator.
+        """
+
+        if np is None:
+            raise ImportError("BatchTankModel requires numpy to be installed")
+
+        models = list(models)
+        if not models:
+            raise ValueError("BatchTankModel requires at least one model")
+
+        # only Heun's method is implemented here, other integrators would
+        # give different results than the scalar models
+        for model in models:
+            if model._integrator != "heun":
+                raise ValueError(
+                    "BatchTankModel only supports the heun integrator, not %r"
+                    % model._integrator
+                )
+
+        timesteps = set(model._timestep for model in models)
+        if len(timesteps) != 1:
+            raise ValueError("All models must use the same timestep")
+
+        self._timestep = timesteps.pop()
+
+        # parameters and state of each side are stored as (2, N) arrays, where
+        # row 0 is the left side and row 1 is the right side
+        def _params(attr):
+            return np.array(
+                [
+                    [getattr(model._lmotor, attr) for model in models],
+                    [getattr(model._rmotor, attr) for model in models],
+                ],
+                dtype=float,
+            )
+
+        self._nominalVoltage = _params("_nominalVoltage")
+        self._vintercept = _params("_vintercept")
+        self._kv = _params("_kv")
+        self._ka = _params("_ka")
+
+        self._velocity = _params("velocity")
+        self._acceleration = _params("acceleration")
+        self._position = _params("position")
+
+        self._bm = np.array([model._bm for model in models], dtype=float)
+        self._inertia = np.array([model._inertia for model in models], dtype=float)
+
+    def __len__(self):
+        return len(self._bm)
+
+    @property
+    def l_velocity(self):
+        """The velocity of the left side of each drivetrain (in ft/s)"""
+        return self._velocity[0]
+
+    @property
+    def r_velocity(self):
+        """The velocity of the right side of each drivetrain (in ft/s)"""
+        return self._velocity[1]
+
+    @property
+    def l_position(self):
+        """The linear position of the left side wheel of each drivetrain (in feet)"""
+        return self._position[0]
+
+    @property
+    def r_position(self):
+        """The linear position of the right side wheel of each drivetrain (in feet)"""
+        return self._position[1]
+
+    def get_distance(self, l_motor, r_motor, tm_diff: float):
+        """
+            Same as :meth:`TankModel.get_distance`, but for all drivetrains
+            at once.
+
+            :param l_motor:    Left motor values (-1 to 1); -1 is forward. May
+                               be a single value or an array with one value
+                               per drivetrain
+            :param r_motor:    Right motor values (-1 to 1); 1 is forward. May
+                               be a single value or an array with one value
+                               per drivetrain
+            :param tm_diff:    Elapsed time since last call to this function
+
+            :returns: arrays of x travel, y travel, angle turned (radians)
+        """
+
+        n = len(self)
+        x = np.zeros(n)
+        y = np.zeros(n)
+        angle = np.zeros(n)
+
+        motor_pct = np.empty((2, n))
+        motor_pct[0] = np.negative(l_motor)
+        motor_pct[1] = r_motor
+
+        appliedVoltage = self._nominalVoltage * motor_pct
+        appliedVoltage = np.copysign(
+            np.maximum(np.abs(appliedVoltage) - self._vintercept, 0), appliedVoltage
+        )
+
+        kv = self._kv
+        ka = self._ka
+        velocity = self._velocity
+        acceleration = self._acceleration
+        position = self._position
+
+        # split the time difference into timestep_ms steps
+        total_time = int(tm_diff * 100000)
+        steps = total_time // self._timestep
+        remainder = total_time % self._timestep
+        step = self._timestep / 100000.0
+        if remainder:
+            last_step = remainder / 100000.0
+            steps += 1
+        else:
+            last_step = step
+
+        while steps != 0:
+            if steps == 1:
+                tm_diff = last_step
+            else:
+                tm_diff = step
+
+            steps -= 1
+
+            # Heun's method, see MotorModel.compute
+            a0 = acceleration
+            v0 = velocity
+
+            v1 = v0 + a0 * tm_diff
+            a1 = (appliedVoltage - kv * v1) / ka
+
+            v1 = v0 + (a0 + a1) * 0.5 * tm_diff
+            a1 = (appliedVoltage - kv * v1) / ka
+            position += (v0 + v1) * 0.5 * tm_diff
+
+            velocity = v1
+            acceleration = a1
+
+            l = velocity[0]
+            r = velocity[1]
+
+            distance = (l + r) * 0.5 * tm_diff
+            turn = self._bm * (l - r) / self._inertia * tm_diff
+
+            x += distance * np.cos(angle)
+            y += distance * np.sin(angle)
+            angle += turn
+
+        self._velocity = velocity
+        self._acceleration = acceleration
+
+        return x, y, angle
@@ -6,6 +6,11 @@
 import collections
 import math
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 inf = float("inf")
 twopi = math.pi * 2.0
 
@@ -120,6 +125,9 @@ class VisionSim:
 
     Target = VisionSimTarget
 
+    #: With fewer targets than this, checking them one at a time is faster
+    min_vectorized_targets = 32
+
     def __init__(
         self,
         targets,
@@ -154,6 +162,9 @@ class VisionSim:
         self.send_queue = collections.deque()
 
         self.targets = targets
+        self.view_dst_start = view_dst_start
+        self.view_dst_end = view_dst_end
+        self.fov2 = fov2
 
         assert view_dst_start < view_dst_end
         assert self.data_lag > 0.001
@@ -172,6 +183,20 @@ class VisionSim:
                 {"color": "red", "rect": [target.x - 0.1, target.y - 0.1, 0.4, 0.4]}
             )
 
+        # When numpy is available and there are enough targets to make it
+        # worthwhile, all of the targets are checked at once. The targets
+        # must not be moved after this.
+        self._target_arrays = None
+        if np is not None and len(targets) >= self.min_vectorized_targets:
+            start = np.array([t.view_angle_start for t in targets], dtype=float)
+            end = np.array([t.view_angle_end for t in targets], dtype=float)
+            self._target_arrays = (
+                np.array([t.x for t in targets], dtype=float),
+                np.array([t.y for t in targets], dtype=float),
+                start,
+                (end - start) % twopi,
+            )
+
     def dont_compute(self):
         """
             Call this when vision processing should be disabled
@@ -207,20 +232,17 @@ class VisionSim:
         """
 
         # Normalize angle to [-180,180]
-        output = []
         angle = ((angle + math.pi) % (math.pi * 2)) - math.pi
 
-        for target in self.targets:
-            proposed = target.compute(now, x, y, angle)
-            if proposed:
-                output.append(proposed)
+        if self._target_arrays is not None:
+            output = self._compute_targets(now, x, y, angle)
+        else:
+            output = self._compute_targets_scalar(now, x, y, angle)
 
         if not output:
             output.append((0, now, inf, 0))
             self.distance = None
         else:
-            # order by absolute offset
-            output.sort(key=lambda i: abs(i[2]))
             self.distance = output[-1][3]
 
         # Only store stuff every once in awhile
@@ -234,3 +256,50 @@ class VisionSim:
             output = self.send_queue[-1]
             if now - output[0][1] > self.data_lag:
                 return self.send_queue.pop()
+
+    def _compute_targets_scalar(self, now, x, y, angle):
+        # Returns the found targets ordered by absolute offset
+
+        output = []
+        for target in self.targets:
+            proposed = target.compute(now, x, y, angle)
+            if proposed:
+                output.append(proposed)
+
+        output.sort(key=lambda i: abs(i[2]))
+        return output
+
+    def _compute_targets(self, now, x, y, angle):
+        # Same as _compute_targets_scalar, but checks all of the targets
+        # at once
+
+        tx, ty, view_start, view_width = self._target_arrays
+
+        dx = tx - x
+        dy = ty - y
+        distance = np.hypot(dx, dy)
+        target_angle = np.arctan2(dy, dx)
+
+        # at the right distance, in the view range, and the robot is
+        # facing the target
+        a = angle - self.fov2 + math.pi
+        b = angle + self.fov2 + math.pi
+        found = (
+            (distance >= self.view_dst_start)
+            & (distance <= self.view_dst_end)
+            & ((target_angle + math.pi - view_start) % twopi <= view_width)
+            & ((target_angle + math.pi - a) % twopi <= (b - a) % twopi)
+        )
+
+        if not found.any():
+            return []
+
+        offset = np.degrees(
+            (((target_angle[found] - angle) + math.pi) % twopi) - math.pi
+        )
+        order = np.argsort(np.abs(offset), kind="stable")
+
+        return [
+            (1, now, o, d)
+            for o, d in zip(offset[order].tolist(), distance[found][order].tolist())
+        ]
@@ -3,8 +3,17 @@ from pyfrc.sim import sim_time
 from .sim_time import FakeRealTime
 from .sim_manager import SimManager
 from .robot_controller import RobotController
-from .ui import SimUI
+from .remote_robot import RemoteRobotController
+from .headless import HeadlessSim
 
-from .field.robot_element import RobotElement
+# The GUI requires tk, which may not be installed when running headless
+try:
+    from .ui import SimUI
 
-from .field.user_renderer import get_user_renderer
+    from .field.robot_element import RobotElement
+
+    from .field.user_renderer import get_user_renderer
+except ImportError as e:
+    # only ignore a missing tk, not errors in the UI code
+    if e.name not in ("tkinter", "_tkinter"):
+        raise
@@ -2,6 +2,8 @@
 
 import math
 
+from ...physics.collision import polygons_intersect
+
 
 class DrawableElement(object):
     """
@@ -15,6 +17,12 @@ class DrawableElement(object):
         self.center = center  # (x,y)
         self.angle = angle  # radians
 
+        # the original shape relative to its center, used by set_pose
+        if center is not None:
+            cx, cy = center
+            self._local_pts = tuple((x - cx, y - cy) for x, y in pts)
+            self._local_angle = angle or 0
+
     @property
     def flat_pts(self):
         """Converts points into a flat list"""
@@ -29,9 +37,12 @@ class DrawableElement(object):
         self.canvas = canvas
         self.id = self.canvas.create_polygon(*self.pts, fill=self.color)
 
-    def intersects(self):
-        # TODO:
-        pass
+    def intersects(self, other):
+        """
+            :param other: another :class:`DrawableElement`
+            :returns: True if the two elements overlap. Both must be convex.
+        """
+        return polygons_intersect(self.pts, other.pts)
 
     def move(self, v):
         """v is a tuple of x/y coordinates to move object"""
@@ -78,6 +89,23 @@ class DrawableElement(object):
         # calculate rotation for each point
         self.pts = [p for p in map(lambda x: _rotate_point(x), self.pts)]
 
+    def set_pose(self, x, y, angle):
+        """
+            Moves the object so its center is at x,y and it is rotated to
+            the given angle (in radians). Unlike move and rotate, the points
+            are always computed from the original shape, so errors don't
+            accumulate.
+        """
+        a = angle - self._local_angle
+        c = math.cos(a)
+        s = math.sin(a)
+
+        self.pts = [
+            (px * c - py * s + x, px * s + py * c + y) for px, py in self._local_pts
+        ]
+        self.center = (x, y)
+        self.angle = angle % (math.pi * 2.0)
+
     def set_color(self, color):
         self.color = color
         self.canvas.itemconfig(self.id, fill=color)
@@ -1,3 +1,4 @@
+import functools
 from os.path import exists
 from tkinter import PhotoImage
 
@@ -6,6 +7,33 @@ import tkinter as tk
 from .elements import DrawableElement
 
 
+@functools.lru_cache(maxsize=8)
+def _make_grid_ppm(cols, rows, cell_size):
+    """
+        Returns a PPM image of the field grid: white cells with a gray
+        border, one cell per square foot. `cell_size` may be a float, the
+        lines are drawn at the same pixels as field elements at whole feet.
+    """
+    line = b"\xcc\xcc\xcc"
+    white = b"\xff\xff\xff"
+
+    xs = [int(col * cell_size) for col in range(cols + 1)]
+    ys = set(int(row * cell_size) for row in range(rows + 1))
+
+    w = xs[-1] + 1
+    h = max(ys) + 1
+
+    grid_row = line * w
+    cell_row = bytearray(white * w)
+    for x in xs:
+        cell_row[x * 3 : x * 3 + 3] = line
+    cell_row = bytes(cell_row)
+
+    pixels = b"".join(grid_row if y in ys else cell_row for y in range(h))
+
+    return b"P6 %d %d 255\n" % (w, h) + pixels
+
+
 class RobotField(object):
     def __init__(self, root, manager, config_obj):
         """
@@ -122,21 +150,18 @@ class RobotField(object):
 
     def update_widgets(self):
 
-        # TODO: process collisions and such too
+        # collisions with field objects are handled by the physics (see
+        # pyfrc.physics.collision)
 
         for element in self.elements:
             element.perform_move()
 
     def draw_field(self):
-        for row in range(self.rows):
-            for col in range(self.cols):
-                self.draw_board_cell(row, col)
-
-    def draw_board_cell(self, row, col):
-        left = self.margin + col * self.cellSize
-        right = left + self.cellSize
-        top = self.margin + row * self.cellSize
-        bottom = top + self.cellSize
-        self.canvas.create_rectangle(
-            left, top, right, bottom, outline="#ccc", fill="#fff"
+        # The grid is drawn as a single image, a canvas item for each cell
+        # makes every redraw of the canvas much slower
+        self.grid_photo = PhotoImage(
+            data=_make_grid_ppm(self.cols, self.rows, self.cellSize), format="PPM"
+        )
+        self.canvas.create_image(
+            (self.margin, self.margin), image=self.grid_photo, anchor=tk.NW
         )
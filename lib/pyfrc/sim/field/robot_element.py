@@ -8,7 +8,7 @@ class RobotElement(CompositeElement):
         TODO: allow user customization
     """
 
-    def __init__(self, controller, config_obj):
+    def __init__(self, controller, config_obj, color="red"):
 
         super().__init__()
 
@@ -30,8 +30,8 @@ class RobotElement(CompositeElement):
         center_x *= px_per_ft
         center_y *= px_per_ft
 
-        # drawing hack
-        self._vector = (0, 0, angle)
+        # pose of the robot on the canvas, units: px
+        self._pose = (center_x, center_y, angle)
 
         # create a bunch of drawable objects that represent the robot
         center = (center_x, center_y)
@@ -42,7 +42,7 @@ class RobotElement(CompositeElement):
             (center_x - robot_w / 2, center_y + robot_l / 2),
         ]
 
-        robot = DrawableElement(pts, center, 0, "red")
+        robot = DrawableElement(pts, center, 0, color)
         self.elements.append(robot)
 
         pts = [
@@ -54,12 +54,12 @@ class RobotElement(CompositeElement):
         robot_pt = DrawableElement(pts, center, 0, "green")
         self.elements.append(robot_pt)
 
-        if angle != 0:
-            self.rotate(angle)
+        for element in self.elements:
+            element.set_pose(*self._pose)
 
     @property
     def angle(self):
-        return self._vector[2]
+        return self._pose[2]
 
     @property
     def front_center(self):
@@ -72,32 +72,31 @@ class RobotElement(CompositeElement):
 
     def perform_move(self):
 
-        if not self.controller.is_alive():
+        if not self.controller.is_alive() and self.elements[1].color != "gray":
             self.elements[1].set_color("gray")
 
-        # query the controller for move information
-        self.move_robot()
-
-        # finally, call the superclass to actually do the drawing
-        self.update_coordinates()
+        # query the controller for move information, and only redraw
+        # the robot if it moved
+        if self.move_robot():
+            self.update_coordinates()
 
     def move_robot(self):
+        """
+            Places the robot at its current position
 
-        px_per_ft = self.px_per_ft
-
-        x, y, a = self.controller._get_vector()  # units: ft
-        ox, oy, oa = self._vector  # units: px
+            :returns: True if the robot moved
+        """
 
-        x *= px_per_ft
-        y *= px_per_ft
+        px_per_ft = self.px_per_ft
 
-        dx = x - ox
-        dy = y - oy
-        da = a - oa
+        x, y, a = self.controller.get_position()  # units: ft
+        pose = (x * px_per_ft, y * px_per_ft, a)
 
-        if da != 0:
-            self.rotate(da)
+        if pose == self._pose:
+            return False
 
-        self.move((dx, dy))
+        for element in self.elements:
+            element.set_pose(*pose)
 
-        self._vector = x, y, a
+        self._pose = pose
+        return True
@@ -0,0 +1,378 @@
+"""
+    Runs the simulator without a GUI, so that it can be used on machines
+    that don't have tk installed (such as a CI server).
+
+    The robot mode can be changed by a script, or by sending commands to a
+    TCP socket that only listens on localhost. Each line of a script is the
+    simulation time (in seconds) followed by a command::
+
+        # time  command
+        0       disabled
+        1       gamedata LRL
+        1       autonomous
+        16      teleop
+        151     stop
+
+    The same commands (without the time) are accepted by the socket, one
+    per line, along with ``status`` which returns the current telemetry.
+    The following commands are supported:
+
+    * ``disabled``, ``autonomous``, ``teleop``, ``test``: change the mode
+    * ``gamedata MESSAGE``: set the game specific message sent to the robot
+      when it enters autonomous mode
+    * ``reset``: move the robot back to its starting position
+    * ``stop``: stop the simulation
+
+    With ``--lockstep``, script commands run on the robot thread at exactly
+    their time, and socket commands run the next time the robot code waits.
+"""
+
+import functools
+import json
+import logging
+import socketserver
+import threading
+
+from hal_impl.data import hal_data
+
+from .sim_manager import SimManager
+
+logger = logging.getLogger("pyfrc.sim.headless")
+
+_modes = {
+    "disabled": SimManager.MODE_DISABLED,
+    "autonomous": SimManager.MODE_AUTONOMOUS,
+    "teleop": SimManager.MODE_OPERATOR_CONTROL,
+    "test": SimManager.MODE_TEST,
+}
+
+_commands = set(_modes) | {"gamedata", "reset", "stop"}
+
+
+def parse_script(fp):
+    """
+        Reads a script of mode changes
+
+        :param fp: File object to read from
+        :returns: list of (time, command, argument) tuples, sorted by time
+    """
+    script = []
+    for lineno, line in enumerate(fp, 1):
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+
+        parts = line.split(None, 2)
+        try:
+            tm = float(parts[0])
+        except ValueError:
+            raise ValueError("line %d: invalid time '%s'" % (lineno, parts[0]))
+
+        if len(parts) < 2 or parts[1] not in _commands:
+            raise ValueError("line %d: invalid command '%s'" % (lineno, line))
+
+        arg = parts[2] if len(parts) > 2 else None
+        script.append((tm, parts[1], arg))
+
+    # stable sort: commands at the same time run in the order given
+    script.sort(key=lambda c: c[0])
+    return script
+
+
+def configure_starting_position(config_obj, name=None):
+    """
+        Selects one of the starting positions in the configuration without
+        asking the user
+
+        :param config_obj: Simulation configuration
+        :param name:       Name of the starting position, defaults to the
+                           first one
+    """
+    start_positions = config_obj["pyfrc"]["robot"]["start_positions"]
+    if not start_positions:
+        if name is not None:
+            raise ValueError("no starting positions are configured")
+        return
+
+    if name is None:
+        selected = start_positions[0]
+    else:
+        for selected in start_positions:
+            if selected["name"] == name:
+                break
+        else:
+            raise ValueError("unknown starting position '%s'" % name)
+
+    config_obj["pyfrc"]["robot"]["starting_x"] = selected["x"]
+    config_obj["pyfrc"]["robot"]["starting_y"] = selected["y"]
+    config_obj["pyfrc"]["robot"]["starting_angle"] = selected["angle"]
+
+
+def _get_hal_telemetry():
+    data = {}
+
+    data["pwm"] = {
+        str(i): ch["value"] for i, ch in enumerate(hal_data["pwm"]) if ch["initialized"]
+    }
+    data["dio"] = {
+        str(i): ch["value"] for i, ch in enumerate(hal_data["dio"]) if ch["initialized"]
+    }
+    data["analog_in"] = {
+        str(i): ch["voltage"]
+        for i, ch in enumerate(hal_data["analog_in"])
+        if ch["initialized"]
+    }
+    data["encoder"] = {
+        str(i): ch["count"]
+        for i, ch in enumerate(hal_data["encoder"])
+        if ch["initialized"]
+    }
+    data["solenoid"] = {
+        str(k): [ch["value"] if ch["initialized"] else None for ch in pcm]
+        for k, pcm in hal_data["pcm"].items()
+    }
+    data["robot"] = dict(hal_data["robot"])
+    data["custom"] = dict(hal_data.get("custom", {}))
+
+    return data
+
+
+class _CommandHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            line = line.decode("utf-8", "replace").strip()
+            if not line:
+                continue
+
+            parts = line.split(None, 1)
+            try:
+                if parts[0] == "status":
+                    reply = json.dumps(self.server.sim._remote_status(), default=str)
+                else:
+                    self.server.sim._remote_command(*parts)
+                    reply = "ok"
+            except Exception as e:
+                reply = "error: %s" % e
+
+            self.wfile.write(reply.encode("utf-8") + b"\n")
+
+
+class _CommandServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class HeadlessSim:
+    """
+        Drives the simulation instead of :class:`.SimUI` when running
+        ``robot.py sim --headless``
+    """
+
+    #: How often the main loop checks the script (in seconds of real time)
+    poll_period = 0.010
+
+    def __init__(
+        self,
+        manager,
+        fake_time,
+        script=None,
+        port=None,
+        telemetry=None,
+        telemetry_period=0.1,
+    ):
+        """
+            :param manager:     sim manager class instance
+            :param fake_time:   FakeRealTime instance
+            :param script:      List of (time, command, argument), see
+                                :func:`parse_script`
+            :param port:        If not None, listen for commands on this port
+            :param telemetry:   File object to write telemetry to as JSON lines
+            :param telemetry_period: Simulation time between telemetry records
+        """
+        self.manager = manager
+        self.fake_time = fake_time
+
+        self.script = list(script or [])
+        self.telemetry = telemetry
+        self.telemetry_period = telemetry_period
+        self._next_telemetry = 0
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+        # in lockstep mode the script and telemetry run on the robot thread
+        # at exact simulation times, so they must be scheduled before the
+        # robot code starts
+        if fake_time.lockstep:
+            for tm, command, arg in self.script:
+                fake_time.call_at(tm, functools.partial(self.execute, command, arg))
+            self.script = []
+
+            if telemetry is not None:
+                fake_time.call_at(0, self._lockstep_telemetry)
+
+        self.server = None
+        if port is not None:
+            self.server = _CommandServer(("127.0.0.1", port), _CommandHandler)
+            self.server.sim = self
+
+    def execute(self, command, arg=None):
+        """
+            Runs a single command
+
+            :param command: One of the commands listed in the module
+                            documentation
+            :param arg:     Argument to the command, if any
+        """
+        with self._lock:
+            if command in _modes:
+                logger.info("Changing mode to %s", command)
+                self.manager.set_mode(_modes[command])
+            elif command == "gamedata":
+                self.manager.game_specific_message = arg or ""
+            elif command == "reset":
+                for robot in self.manager.robots:
+                    robot.reset_position()
+            elif command == "stop":
+                self._stop.set()
+
+                # in lockstep mode this runs on the robot thread, so stop
+                # the robot exactly here instead of when run() notices
+                if self.fake_time.lockstep:
+                    self.fake_time.pause()
+            else:
+                raise ValueError("Invalid command '%s'" % command)
+
+    def _remote_command(self, command, arg=None):
+        # Commands from the socket. In lockstep mode they run on the robot
+        # thread like the script, as soon as the robot code waits.
+        if not self.fake_time.lockstep:
+            self.execute(command, arg)
+        elif command not in _commands:
+            raise ValueError("Invalid command '%s'" % command)
+        else:
+            self._call_on_robot_thread(functools.partial(self.execute, command, arg))
+
+    def _remote_status(self):
+        # In lockstep mode the robot thread is only looked at while it waits,
+        # so that a status never shows a half finished step
+        if not self.fake_time.lockstep:
+            return self.get_telemetry()
+
+        return self._call_on_robot_thread(self.get_telemetry)
+
+    def _call_on_robot_thread(self, fn):
+        # only used in lockstep mode, returns the result of fn
+        done = threading.Event()
+        result = []
+
+        def call():
+            try:
+                result.append((True, fn()))
+            except Exception as e:
+                # don't let it break the robot code
+                result.append((False, e))
+            done.set()
+
+        self.fake_time.call_at(self.fake_time.get(), call)
+
+        while not done.wait(self.poll_period):
+            # once stopped the robot thread doesn't run anything else, but
+            # nothing changes anymore either
+            if self._stop.is_set() or not self.manager.is_alive():
+                return fn()
+
+        ok, value = result[0]
+        if not ok:
+            raise value
+        return value
+
+    def get_telemetry(self):
+        """
+            :returns: a dictionary containing the time, mode, robot positions
+                      and interesting parts of ``hal_data``
+        """
+        robots = []
+        for robot in self.manager.robots:
+            if robot.has_physics():
+                x, y, angle = robot.get_position()
+                robots.append({"x": x, "y": y, "angle": angle})
+
+        return {
+            "time": self.fake_time.get(),
+            "mode": SimManager.mode_map[self.manager.get_mode()],
+            "robots": robots,
+            "hal": _get_hal_telemetry(),
+        }
+
+    def stop(self):
+        """Stops the simulation, can be called from any thread"""
+        self._stop.set()
+
+    def _write_telemetry(self, now):
+        if now < self._next_telemetry:
+            return
+
+        self.telemetry.write(json.dumps(self.get_telemetry(), default=str))
+        self.telemetry.write("\n")
+        self._next_telemetry = now + self.telemetry_period
+
+    def _lockstep_telemetry(self):
+        with self._lock:
+            if self._stop.is_set():
+                return
+
+            now = self.fake_time.get()
+            self._write_telemetry(now)
+
+        self.fake_time.call_at(self._next_telemetry, self._lockstep_telemetry)
+
+    def run(self):
+        """
+            Runs the simulation until it is stopped. This call BLOCKS
+
+            :returns: False if the robot code died, True otherwise
+        """
+
+        alive = True
+
+        if self.server is not None:
+            thread = threading.Thread(
+                target=self.server.serve_forever, name="Sim Command Thread"
+            )
+            thread.daemon = True
+            thread.start()
+            logger.info(
+                "Listening for commands on port %s", self.server.server_address[1]
+            )
+
+        try:
+            while not self._stop.is_set():
+                now = self.fake_time.get()
+
+                while self.script and self.script[0][0] <= now:
+                    _, command, arg = self.script.pop(0)
+                    self.execute(command, arg)
+
+                if self.telemetry is not None and not self.fake_time.lockstep:
+                    self._write_telemetry(now)
+
+                if not self.manager.is_alive():
+                    logger.error("Robot died!")
+                    alive = False
+                    break
+
+                self._stop.wait(self.poll_period)
+
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._stop.set()
+            if self.server is not None:
+                self.server.shutdown()
+                self.server.server_close()
+            if self.telemetry is not None:
+                with self._lock:
+                    self.telemetry.flush()
+
+        return alive
@@ -0,0 +1,246 @@
+"""
+    Support for simulating more than one robot at a time.
+
+    wpilib and the HAL keep their state in module globals, so each robot
+    needs its own HAL data and its own copy of wpilib. Additional robots are
+    therefore run in their own process using ``robot.py sim --headless``,
+    and are controlled over its command socket. Each process runs its robot
+    code, physics and DS thread concurrently with the others.
+
+    Each process also has its own simulation clock. The clocks only stay
+    together because they all follow the wall clock, so simulating more
+    than one robot requires running in real time: not faster, not paused,
+    and not in lockstep mode.
+"""
+
+import json
+import logging
+import math
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from os.path import abspath, dirname, join
+
+from .headless import configure_starting_position
+from .sim_manager import SimManager
+
+logger = logging.getLogger("pyfrc.sim.remote")
+
+_mode_commands = {
+    SimManager.MODE_DISABLED: "disabled",
+    SimManager.MODE_AUTONOMOUS: "autonomous",
+    SimManager.MODE_OPERATOR_CONTROL: "teleop",
+    SimManager.MODE_TEST: "test",
+}
+
+
+class RemoteRobotController:
+    """
+        Runs a robot in a separate headless simulator process, and provides
+        the same interface as :class:`.RobotController` so that it can be
+        added to the :class:`.SimManager` and drawn on the field
+    """
+
+    #: How often the position of the robot is retrieved (in seconds)
+    poll_period = 0.050
+
+    #: How long to wait for the process to start listening (in seconds)
+    connect_timeout = 30.0
+
+    def __init__(self, robot_file, start_position=None):
+        """
+            :param robot_file:     Path to the robot.py of the robot
+            :param start_position: Name of the starting position to use
+        """
+        from ..configloader import _load_config
+
+        self.robot_file = abspath(robot_file)
+        self.robot_path = dirname(self.robot_file)
+
+        # the robot element needs the dimensions and starting position
+        self.config_obj = _load_config(self.robot_path, {})
+        configure_starting_position(self.config_obj, start_position)
+
+        robot = self.config_obj["pyfrc"]["robot"]
+        self._position = (
+            robot["starting_x"],
+            robot["starting_y"],
+            math.radians(robot["starting_angle"]),
+        )
+        self._has_physics = False
+
+        self.mode = SimManager.MODE_DISABLED
+        self.mode_callback = None
+
+        self._lock = threading.RLock()
+        self._conn_lock = threading.Lock()
+        self._alive = False
+
+        self.port = None
+        self._stopping = False
+
+        # The process listens on any free port, and writes the port to this
+        # file once it is listening
+        self._tmp_dir = tempfile.mkdtemp()
+        self._port_file = join(self._tmp_dir, "port")
+
+        args = [
+            sys.executable,
+            self.robot_file,
+            "sim",
+            "--headless",
+            "--port",
+            "0",
+            "--port-file",
+            self._port_file,
+            "--nt-port",
+            "0",
+        ]
+        if start_position is not None:
+            args += ["--start-position", start_position]
+
+        self.process = subprocess.Popen(args, cwd=self.robot_path)
+
+        self.thread = threading.Thread(
+            target=self._status_thread, name="Remote Robot Thread (%s)" % robot_file
+        )
+        self.thread.daemon = True
+
+    def run(self):
+        self._conn = self._connect()
+        self._alive = True
+        self.thread.start()
+
+    def _connect(self):
+        end = time.monotonic() + self.connect_timeout
+        try:
+            while not os.path.exists(self._port_file):
+                if self.process.poll() is not None:
+                    raise OSError("robot process exited before it started listening")
+                if time.monotonic() > end:
+                    raise OSError("timed out waiting for the robot process to listen")
+                time.sleep(0.1)
+
+            with open(self._port_file) as fp:
+                self.port = int(fp.read())
+        finally:
+            shutil.rmtree(self._tmp_dir, ignore_errors=True)
+
+        sock = socket.create_connection(("127.0.0.1", self.port))
+        return sock.makefile("rwb")
+
+    def _command(self, command):
+        with self._conn_lock:
+            self._conn.write(command.encode("utf-8") + b"\n")
+            self._conn.flush()
+            reply = self._conn.readline().decode("utf-8").strip()
+
+        if not reply:
+            raise EOFError("robot process exited")
+        if reply.startswith("error:"):
+            raise ValueError(reply)
+        return reply
+
+    def _status_thread(self):
+        try:
+            while True:
+                status = json.loads(self._command("status"))
+                robots = status["robots"]
+                with self._lock:
+                    self._has_physics = bool(robots)
+                    if robots:
+                        self._position = (
+                            robots[0]["x"],
+                            robots[0]["y"],
+                            robots[0]["angle"],
+                        )
+                time.sleep(self.poll_period)
+        except (OSError, EOFError, ValueError):
+            pass
+
+        if not self._stopping:
+            logger.error("Robot %s died!", self.robot_file)
+
+        with self._lock:
+            self._alive = False
+            old_mode = self.mode
+            self.mode = SimManager.MODE_DISABLED
+            callback = self.mode_callback
+
+        if old_mode != SimManager.MODE_DISABLED and callback is not None:
+            callback(SimManager.MODE_DISABLED)
+
+    def wait_for_robotinit(self):
+        # the process listens before its robot starts, but doesn't answer
+        # commands until robotInit is done
+        try:
+            self._command("status")
+        except (OSError, EOFError, ValueError):
+            pass
+
+    def stop(self):
+        self._stopping = True
+        try:
+            self._command("stop")
+            self.process.wait(timeout=5.0)
+        except (OSError, EOFError, ValueError, subprocess.TimeoutExpired):
+            self.process.kill()
+        return True
+
+    #
+    # API used by the ui
+    #
+
+    def has_physics(self):
+        with self._lock:
+            return self._has_physics
+
+    def is_alive(self):
+        with self._lock:
+            return self._alive
+
+    def on_mode_change(self, callable):
+        """When the robot mode changes, call the function with the mode"""
+        with self._lock:
+            self.mode_callback = callable
+
+    def set_mode(self, mode, game_specific_message=None):
+
+        if mode not in _mode_commands:
+            raise ValueError("Invalid value for mode: %s" % mode)
+
+        with self._lock:
+            if not self._alive:
+                return
+
+            old_mode = self.mode
+            self.mode = mode
+            callback = self.mode_callback
+
+        if old_mode != mode:
+            try:
+                if game_specific_message:
+                    self._command("gamedata %s" % game_specific_message)
+                self._command(_mode_commands[mode])
+            except (OSError, EOFError, ValueError):
+                logger.exception("Error changing mode of %s", self.robot_file)
+
+            if callback is not None:
+                callback(mode)
+
+    def get_mode(self):
+        with self._lock:
+            return self.mode
+
+    def get_position(self):
+        """Returns x,y,angle"""
+        with self._lock:
+            return self._position
+
+    def reset_position(self):
+        self._command("reset")
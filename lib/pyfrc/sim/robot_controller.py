@@ -45,7 +45,10 @@ class RobotController:
     def run(self):
         self._run_code = True
         self.thread.start()
-        self.ds_thread.start()
+
+        # in lockstep mode the fake time sends the DS packets
+        if not self.fake_time.lockstep:
+            self.ds_thread.start()
 
     def wait_for_robotinit(self):
 
@@ -141,6 +144,10 @@ class RobotController:
         """Returns x,y,angle"""
         return self.physics_controller.get_position()
 
+    def reset_position(self):
+        """Moves the robot back to its starting position"""
+        self.physics_controller.reset_position()
+
     def _get_vector(self):
         return self.physics_controller._get_vector()
 
@@ -163,20 +170,37 @@ class RobotController:
 
     def _ds_thread(self):
 
-        # TODO: This needs to be fixed, breaks things when paused in IterativeRobot
+        # DS packets are sent every 20ms of simulation time, so they stop
+        # when paused and speed up with the simulation
+        tm = self.fake_time.get()
         while True:
-            time.sleep(0.020)
+            tm = self.fake_time.sleep_until(tm + 0.020)
             mode_helpers.notify_new_ds_data()
 
+    def _send_ds_packet(self):
+        # only used in lockstep mode, does the work of the DS thread
+        mode_helpers.notify_new_ds_data()
+        self.driver_station._getData()
+
     def _robot_thread(self):
 
         # Initialize physics time hook -- must be done on
         # robot thread, since it uses a threadlocal variable to work
         self.physics_controller.setup_main_thread()
+        self.fake_time.set_robot_thread(self._send_ds_packet)
+
+        if self.fake_time.lockstep:
+            # Like the test framework, replace the DS thread so that packets
+            # are handled on the robot thread at exact times
+            wpilib.DriverStation._run = lambda _: None
 
         # setup things for the robot
         self.driver_station = wpilib.DriverStation.getInstance()
 
+        if self.fake_time.lockstep:
+            # makes DriverStation.waitForData() move time forward
+            self.driver_station.waitForDataCond = self.fake_time.ds_cond
+
         try:
             wpilib.RobotBase.main(self.robot_class)
         finally:
@@ -4,8 +4,9 @@ import threading
 class SimManager(object):
     """
         This holds the current mode for all robots, and holds all robot controllers
-        
-        We use this so that in the future we can have multiple robots.
+
+        Each robot runs in its own thread (or process, see
+        :class:`.RemoteRobotController`), so they run concurrently.
     """
 
     MODE_DISABLED = 0
@@ -49,12 +50,21 @@ class SimManager(object):
 
     def _on_robot_mode_change(self, mode):
 
-        # TODO: With multiple robots, this isn't actually valid
+        # A robot can change mode on its own (such as when it dies). The
+        # mode of the manager only changes when all robots agree. When a
+        # robot dies the manager keeps its mode, and only notifies the UI so
+        # that it can show that a robot is dead
         with self._lock:
-            self.mode = mode
+            if all(robot.get_mode() == mode for robot in self.robots):
+                self.mode = mode
+            elif self.is_alive():
+                return
 
-        if self.mode_callback:
-            self.mode_callback(mode)
+            mode = self.mode
+            callback = self.mode_callback
+
+        if callback:
+            callback(mode)
 
     #
     # API used by the RobotField class
@@ -94,11 +104,14 @@ class SimManager(object):
             old_mode = self.mode
             self.mode = mode
             callback = self.mode_callback
+            robots = list(self.robots)
+            game_specific_message = self.game_specific_message
 
-            for robot in self.robots:
-                robot.set_mode(mode, self.game_specific_message)
+        # don't call from inside the lock, so robots can change modes
+        # while other robots are running
+        for robot in robots:
+            robot.set_mode(mode, game_specific_message)
 
-        # don't call from inside the lock
         if old_mode != mode and callback is not None:
             callback(mode)
 
@@ -1,7 +1,40 @@
+import heapq
+import itertools
 import time
 import threading
 
 
+class _LockstepCondition(threading.Condition):
+    """
+        Used for the DS data condition. In lockstep mode nothing else sends
+        DS packets, so a thread that waits for one advances time to the
+        next packet instead of blocking.
+    """
+
+    def __init__(self, fake_time):
+        super().__init__()
+        self.fake_time = fake_time
+
+    def wait(self, timeout=None):
+        fake_time = self.fake_time
+        if not fake_time._advances_time():
+            return super().wait(timeout)
+
+        # like a real wait, release the lock so other threads can change
+        # the mode while time is passing
+        saved = self._release_save()
+        try:
+            secs = (fake_time.ds_count + 1) * 0.020 - fake_time.get()
+            if timeout is not None and timeout < secs:
+                fake_time.increment_time_by(timeout)
+                return False
+
+            fake_time.increment_time_by(secs)
+            return True
+        finally:
+            self._acquire_restore(saved)
+
+
 class FakeRealTime:
     """
         This allows the robot to run in realtime, or we can pause and
@@ -10,22 +43,60 @@ class FakeRealTime:
         This implementation will break anything that is trying to measure
         time while paused.. but really, that shouldn't be expected to
         work anyways.
+
+        Time can also pass faster (or slower) than real time, see
+        :meth:`set_time_scale`.
+
+        In lockstep mode (see :meth:`set_lockstep`), time only passes when
+        the robot code waits, and DS packets, physics updates and scheduled
+        events all happen on the robot thread at exact simulation times:
+        when the robot waits, time stops at each one that is due and runs
+        it before moving on. Two runs of the same robot code then behave
+        the same.
         
         Currently, we assume all robot code runs in a single thread. This
         makes a lot of things easier. If that assumption was broken, then
         this would be a bit more complex.
     """
 
+    #: When running as fast as possible, if time doesn't move for this long
+    #: (in real seconds) then the robot code is assumed to be idle
+    idle_timeout = 0.001
+
     def __init__(self):
         self.lock = threading.Condition()
+        self.time_scale = 1.0
+        self.lockstep = False
+        self.ds_fn = None
+        self.robot_thread = None
         self.reset()
 
         self.local = threading.local()
-        self.ds_cond = threading.Condition()
+        self.ds_cond = _LockstepCondition(self)
 
     def set_physics_fn(self, fn):
         self.local.physics_fn = fn
 
+    def set_robot_thread(self, ds_fn):
+        """
+            Called on the thread that runs the robot code. In lockstep mode,
+            only this thread moves time forward.
+
+            :param ds_fn: In lockstep mode, function that sends a DS packet.
+                          It is called on the robot thread every 20ms of
+                          simulation time.
+        """
+        with self.lock:
+            self.robot_thread = threading.current_thread()
+            self.ds_fn = ds_fn
+
+    def _advances_time(self):
+        # in lockstep mode, other threads wait for the robot thread instead
+        return not self.lockstep or self.robot_thread in (
+            None,
+            threading.current_thread(),
+        )
+
     def get(self):
         with self.lock:
             self._increment_tm()
@@ -41,7 +112,12 @@ class FakeRealTime:
 
         # normal usage
         if secs is None or self.pause_at is None:
-            self.tm += now - self.last_tm
+            if self.time_scale is not None and not self.lockstep:
+                self.tm += (now - self.last_tm) * self.time_scale
+            elif secs is not None:
+                # as fast as possible or lockstep: time only passes when
+                # the robot waits
+                self.tm += secs
             self.last_tm = now
         else:
             # used by IncrementTimeBy to determine if a further
@@ -63,11 +139,22 @@ class FakeRealTime:
         """This is called when wpilib.Timer.delay() occurs"""
         self.slept = [True] * 3
 
+        if not self._advances_time():
+            self.sleep_until(self.get() + secs)
+            return
+
+        if self.lockstep:
+            self._lockstep_increment(secs)
+            return
+
         was_paused = False
 
         with self.lock:
 
             self._increment_tm(secs)
+            self.lock.notify_all()
+
+            time_scale = self.time_scale
 
             while self.paused and secs > 0:
 
@@ -89,14 +176,158 @@ class FakeRealTime:
                 # the paused flag so we don't escape the loop
                 self._increment_tm(secs)
 
-        if not was_paused:
-            time.sleep(secs)
+        if not was_paused and time_scale is not None:
+            time.sleep(secs / time_scale)
+
+    def _lockstep_increment(self, secs):
+        # Moves time forward on the robot thread. Time stops at each DS
+        # packet and event that is due, which runs at its own time before
+        # time moves on, so everything happens at exact simulation times.
+
+        with self.lock:
+            end = self.tm + secs
+            time_scale = self.time_scale
+
+        while True:
+            with self.lock:
+                while self.paused:
+                    self.lock.wait()
+
+                # when single stepping, stop at the end of the step
+                limit = end if self.pause_at is None else min(end, self.pause_at)
+
+                tm, fn = self._pop_event(limit)
+                self._advance_to(limit if fn is None else tm)
+                self.lock.notify_all()
+
+                done = fn is None and self.tm >= end
+
+            if fn is not None:
+                # run these outside of the lock, they may need it
+                fn()
+            elif done:
+                break
+
+        if time_scale is not None:
+            time.sleep(secs / time_scale)
+
+    def _advance_to(self, tm):
+        # internal fn, must hold lock to call this. Used in lockstep mode
+        # instead of _increment_tm
+
+        # single step support
+        if self.pause_at is not None and tm >= self.pause_at:
+            tm = self.pause_at
+            self.paused = True
+            self.pause_at = None
+            self.pause_secs = None
+
+        if tm > self.tm:
+            self.tm = tm
+
+        physics_fn = getattr(self.local, "physics_fn", None)
+        if physics_fn is not None:
+            physics_fn(self.tm)
+
+    def _pop_event(self, end):
+        # internal fn, must hold lock to call this. Returns the time and
+        # function of the next event or DS packet due by `end`, or
+        # (None, None) if there isn't one. Ties go to the scheduled events,
+        # so that a mode change is seen by the DS packet sent at the same
+        # time. Anything that is already late runs now.
+
+        ds_tm = None
+        if self.ds_fn is not None:
+            ds_tm = (self.ds_count + 1) * 0.020
+
+        if self.events:
+            ev_tm = self.events[0][0]
+            if ev_tm <= end and (ds_tm is None or ev_tm <= ds_tm):
+                _, _, fn = heapq.heappop(self.events)
+                return max(ev_tm, self.tm), fn
+
+        if ds_tm is not None and ds_tm <= end:
+            self.ds_count += 1
+            return max(ds_tm, self.tm), self.ds_fn
+
+        return None, None
+
+    def call_at(self, tm, fn):
+        """
+            In lockstep mode, calls `fn` on the robot thread once the
+            simulation time reaches `tm`. Functions scheduled for the same
+            time are called in the order they were scheduled.
+
+            :param tm: Simulation time to call the function at
+            :param fn: Function that takes no arguments
+        """
+        with self.lock:
+            heapq.heappush(self.events, (tm, next(self.event_seq), fn))
+
+    def set_lockstep(self):
+        """
+            Enables lockstep mode and restarts the clock at zero. Call this
+            before the robot code starts. DS packets are sent by the robot
+            thread (see :meth:`set_robot_thread`), so nothing else should
+            send them.
+        """
+        self.reset()
+
+        with self.lock:
+            self.lockstep = True
+            self.lock.notify_all()
+
+    def sleep_until(self, tm):
+        """
+            Blocks the calling thread until the simulation time reaches
+            `tm`. This is intended for threads other than the robot thread.
+
+            :returns: the current simulation time
+        """
+        with self.lock:
+            while True:
+                self._increment_tm()
+                if self.tm >= tm:
+                    return self.tm
+
+                if self.paused or self.lockstep:
+                    # woken up when the robot thread moves time forward
+                    self.lock.wait()
+                elif self.time_scale is not None:
+                    self.lock.wait((tm - self.tm) / self.time_scale)
+                else:
+                    last_tm = self.tm
+                    self.lock.wait(self.idle_timeout)
+
+                    # if the robot code is idle then nothing else is going
+                    # to move time forward, so skip ahead
+                    if self.tm == last_tm and not self.paused:
+                        self._increment_tm(tm - self.tm)
+
+    def set_time_scale(self, scale):
+        """
+            Changes how fast simulation time passes compared to real time.
+            This affects both the clock and the delays in the robot code.
+
+            :param scale: Multiplier, 2 runs the simulation twice as fast as
+                          real time. If None, the simulation runs as fast as
+                          possible: delays return immediately, and time only
+                          passes when the robot code waits.
+        """
+        if scale is not None and scale <= 0:
+            raise ValueError("time scale must be positive")
+
+        with self.lock:
+            # time passed so far is counted at the old scale
+            self._increment_tm()
+            self.time_scale = scale
+            self.lock.notify_all()
 
     def pause(self):
         with self.lock:
             self._increment_tm()
             self.paused = True
-            self.lock.notify()
+            self.lock.notify_all()
 
     def reset(self):
         self.slept = [True] * 3
@@ -106,11 +337,15 @@ class FakeRealTime:
             self.pause_secs = None
             self.paused = False
 
-            self.next_ds_time = 0.020
+            # number of DS packets sent in lockstep mode, the next one is
+            # sent at (ds_count + 1) * 20ms
+            self.ds_count = 0
+            self.events = []
+            self.event_seq = itertools.count()
             self.tm = 0
             self.last_tm = time.time()
 
-            self.lock.notify()
+            self.lock.notify_all()
 
         self.notifiers = []
 
@@ -131,4 +366,4 @@ class FakeRealTime:
                 self.pause_at = None
                 self.pause_secs = None
 
-            self.lock.notify()
+            self.lock.notify_all()
@@ -4,20 +4,24 @@
     it isn't. Be safe, don't call into the GUI from another thread.
 """
 
-try:
-    import tkinter as tk
-except ImportError:
-    print("pyfrc robot simulation requires python tkinter support to be installed")
-    raise
+import tkinter as tk
 
 import logging
 import queue
+import time
 
 from hal_impl.data import hal_data
 
 from .. import __version__
 from .field.field import RobotField
-from .ui_widgets import PanelIndicator, Tooltip, ValueWidget
+from .ui_widgets import (
+    CachedIntVar,
+    PanelIndicator,
+    Tooltip,
+    ValueWidget,
+    set_label_text,
+    tk_ops,
+)
 
 from pkg_resources import iter_entry_points
 
@@ -59,6 +63,40 @@ def configure_starting_position(config_obj):
     config_obj["pyfrc"]["robot"]["starting_angle"] = selected["angle"]
 
 
+class _RefreshRate:
+    """
+        Tracks how long a part of the UI takes to refresh, and how often it
+        should be refreshed
+    """
+
+    def __init__(self, period):
+        self.min_period = period
+        self.period = period
+        self.cost = None
+        self.next_tm = 0
+
+    def due(self, now):
+        return now >= self.next_tm
+
+    def record(self, start, end):
+        cost = end - start
+        if self.cost is None:
+            self.cost = cost
+        else:
+            # smooth it out, a single slow refresh shouldn't matter much
+            self.cost = 0.8 * self.cost + 0.2 * cost
+
+        self.next_tm = start + self.period
+
+    @staticmethod
+    def adjust(rates, cpu_budget):
+        """Slows down all of the refreshes if they use too much CPU"""
+        load = sum(r.cost / r.min_period for r in rates if r.cost is not None)
+        scale = max(1.0, load / cpu_budget)
+        for r in rates:
+            r.period = r.min_period * scale
+
+
 class SimUI(object):
     def __init__(self, manager, fake_time, config_obj: dict) -> None:
         """
@@ -107,6 +145,13 @@ class SimUI(object):
         self.mode_start_tm = 0
         self.text_id = None
 
+        # the field is refreshed more often than the panels, since the
+        # robot moving around is what people watch
+        ui_config = self.config_obj["pyfrc"]["ui"]
+        self.panel_refresh = _RefreshRate(ui_config["panel_period"])
+        self.field_refresh = _RefreshRate(ui_config["field_period"])
+        self.cpu_budget = ui_config["cpu_budget"]
+
         # connect to the controller
         self.manager.on_mode_change(
             lambda mode: self.idle_add(self.on_robot_mode_change, mode)
@@ -296,7 +341,7 @@ class SimUI(object):
             row += 1
 
             for j in range(1, 11):
-                var = tk.IntVar()
+                var = CachedIntVar()
                 ck = tk.Checkbutton(slot, text=str(j), variable=var)
                 ck.grid(column=col + 1 + (1 - j % 2), row=row + int((j - 1) / 2))
                 self.set_joy_tooltip(ck, i, "buttons", j)
@@ -333,14 +378,14 @@ class SimUI(object):
         )
         button.pack(fill=tk.X)
 
-        button = tk.Radiobutton(
+        pause_button = tk.Radiobutton(
             timing_control,
             text="Pause",
             variable=realtime_mode,
             value=1,
             command=_set_realtime,
         )
-        button.pack(fill=tk.X)
+        pause_button.pack(fill=tk.X)
 
         step_button = tk.Button(timing_control, text="Step", command=self.on_step_time)
         self.step_entry = tk.StringVar()
@@ -351,6 +396,25 @@ class SimUI(object):
         Tooltip.create(step_entry, "Time to step (in seconds)")
         realtime_mode.set(0)
 
+        self.time_scale = tk.StringVar()
+        self.time_scale.set(self._format_time_scale(self.fake_time.time_scale))
+
+        speeds = [self._format_time_scale(s) for s in (0.25, 0.5, 1, 2, 5, 20, None)]
+        if self.time_scale.get() not in speeds:
+            speeds.append(self.time_scale.get())
+
+        speed_menu = tk.OptionMenu(
+            timing_control, self.time_scale, *speeds, command=self.on_time_scale
+        )
+        speed_menu.pack(side=tk.BOTTOM, fill=tk.X)
+        Tooltip.create(speed_menu, "How fast the simulation runs")
+
+        # the other robots have their own clocks, which only follow this one
+        # in real time
+        if len(self.manager.robots) > 1:
+            pause_button.config(state=tk.DISABLED)
+            speed_menu.config(state=tk.DISABLED)
+
         timing_control.pack(side=tk.TOP, fill=tk.BOTH, expand=1)
 
         # simulation control
@@ -466,7 +530,7 @@ class SimUI(object):
 
         def _reset_robot():
             for robot in self.manager.robots:
-                robot.physics_controller.reset_position()
+                robot.reset_position()
 
         button = tk.Button(ctrl_frame, text="Reset Robot", command=_reset_robot)
         button.pack(side=tk.TOP)
@@ -512,7 +576,7 @@ class SimUI(object):
             gyro_label = self.values.get(k)
             if not gyro_label:
                 gyro_label = self._create_value(k, k, "Angle (Degrees)")
-            gyro_label["text"] = "%.3f" % v
+            set_label_text(gyro_label, "%.3f" % v)
 
         for i, gyro in enumerate(hal_data["analog_gyro"]):
             if not gyro["initialized"]:
@@ -521,7 +585,7 @@ class SimUI(object):
             gyro_label = self.values.get(k)
             if not gyro_label:
                 gyro_label = self._create_value(k, k, "Angle (Degrees)")
-            gyro_label["text"] = "%.3f" % gyro["angle"]
+            set_label_text(gyro_label, "%.3f" % gyro["angle"])
 
         for i, encoder in enumerate(hal_data["encoder"]):
             if not encoder["initialized"]:
@@ -534,9 +598,10 @@ class SimUI(object):
                     encoder["config"]["BSource_Channel"],
                 )
                 label = self._create_value(k, txt, "Count / Distance")
-            label["text"] = "%s / %.3f" % (
-                encoder["count"],
-                encoder["count"] * encoder["distance_per_pulse"],
+            set_label_text(
+                label,
+                "%s / %.3f"
+                % (encoder["count"], encoder["count"] * encoder["distance_per_pulse"]),
             )
 
         for k, v in hal_data.get("custom", {}).items():
@@ -544,9 +609,9 @@ class SimUI(object):
             if not label:
                 label = self._create_value(k, k, k)
             if isinstance(v, float):
-                label["text"] = "%.3f" % v
+                set_label_text(label, "%.3f" % v)
             else:
-                label["text"] = str(v)
+                set_label_text(label, str(v))
 
     def _create_value(self, key, text, tooltip):
         slot = tk.LabelFrame(self.csfm, text=text)
@@ -585,16 +650,38 @@ class SimUI(object):
 
         # grab the simulation lock, gather all of the
         # wpilib objects, and display them on the screen
-        self.update_widgets()
+        now = time.monotonic()
+        if self.panel_refresh.due(now):
+            self.update_panels()
+            self.panel_refresh.record(now, time.monotonic())
+
+        now = time.monotonic()
+        if self.field_refresh.due(now):
+            self.field.update_widgets()
+            self.field_refresh.record(now, time.monotonic())
+
+        rates = (self.panel_refresh, self.field_refresh)
+        _RefreshRate.adjust(rates, self.cpu_budget)
 
         # call next timer_fired (or we'll never call timer_fired again!)
-        delay = 100  # milliseconds
+        next_tm = min(r.next_tm for r in rates)
+        delay = max(1, int((next_tm - time.monotonic()) * 1000))  # milliseconds
         self.root.after(delay, self.timer_fired)  # pause, then call timer_fired again
 
     def update_widgets(self):
+        """Refreshes everything displayed by the UI"""
+        self.update_panels()
+        self.field.update_widgets()
+
+    def update_panels(self):
+        """Refreshes everything except the field"""
 
         # TODO: support multiple slots?
 
+        # widgets only call into Tk when their value changes, count how
+        # many calls were made to refresh the panels
+        tk_ops.reset()
+
         # joystick stuff
         if self.usb_joysticks is not None:
             self.usb_joysticks.update()
@@ -663,15 +750,18 @@ class SimUI(object):
             for j, pov in enumerate(povs):
                 jpovs[j] = int(pov.get_value())
 
-        for extension in self.extensions:
-            extension.update_tk_widgets(self)
-
-        self.field.update_widgets()
-
         tm = self.fake_time.get()
         mode_tm = tm - self.mode_start_tm
 
-        self.status.config(text="Time: %.03f mode, %.03f total" % (mode_tm, tm))
+        set_label_text(self.status, "Time: %.03f mode, %.03f total" % (mode_tm, tm))
+
+        # Number of Tk operations needed by the last refresh of the panels
+        # (not including extensions)
+        self.tk_op_count = tk_ops.reset()
+        logger.debug("Widget refresh: %d Tk operations", self.tk_op_count)
+
+        for extension in self.extensions:
+            extension.update_tk_widgets(self)
 
     def set_tooltip(self, widget, cat, idx):
 
@@ -734,6 +824,18 @@ class SimUI(object):
         else:
             self.fake_time.resume()
 
+    @staticmethod
+    def _format_time_scale(scale):
+        if scale is None:
+            return "Max"
+        return "%gx" % scale
+
+    def on_time_scale(self, value):
+        if value == "Max":
+            self.fake_time.set_time_scale(None)
+        else:
+            self.fake_time.set_time_scale(float(value[:-1]))
+
     def on_step_time(self):
         val = self.step_entry.get()
         try:
@@ -1,6 +1,60 @@
 import tkinter as tk
 
 
+class TkOpCounter:
+    """
+        Counts the calls into Tk made when updating widgets, so that the
+        cost of refreshing the UI can be measured. The widgets in this
+        module only call into Tk when the value they display changes.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def add(self, n=1):
+        self.count += n
+
+    def reset(self):
+        """Returns the current count, and sets it to zero"""
+        count = self.count
+        self.count = 0
+        return count
+
+
+tk_ops = TkOpCounter()
+
+
+def set_label_text(label, text):
+    """Sets the text of a label, if it changed since the last call"""
+    if getattr(label, "_last_text", None) != text:
+        label["text"] = text
+        label._last_text = text
+        tk_ops.add()
+
+
+class CachedIntVar(tk.IntVar):
+    """
+        IntVar that remembers its value, so that reading it doesn't call
+        into Tk. Writes from Tk (such as when a Checkbutton is clicked) are
+        picked up via a trace.
+    """
+
+    def __init__(self, master=None, value=None):
+        super().__init__(master, value)
+        self.value = super().get()
+
+        if hasattr(self, "trace_add"):
+            self.trace_add("write", self._on_write)
+        else:
+            self.trace_variable("w", self._on_write)
+
+    def _on_write(self, *args):
+        self.value = super().get()
+
+    def get(self):
+        return self.value
+
+
 # user drawable widget for tk
 class ValueWidget(tk.Frame):
     def __init__(
@@ -30,6 +84,10 @@ class ValueWidget(tk.Frame):
             (self.w - 3, self.h / 2), anchor=tk.E, text="--"
         )
 
+        # what is currently displayed, to avoid redundant calls into Tk
+        self._shown_text = "--"
+        self._shown_box = None
+
         if clickable:
             self.canvas.bind("<Button 1>", self._on_mouse)
             self.canvas.bind("<B1-Motion>", self._on_mouse)
@@ -105,6 +163,9 @@ class ValueWidget(tk.Frame):
         if disabled:
             self.canvas.itemconfig(self.text, text="--")
             self.canvas.itemconfig(self.box, state=tk.HIDDEN)
+            self._shown_text = "--"
+            self._shown_box = None
+            tk_ops.add(2)
         else:
             self.set_value(self.value)
 
@@ -141,9 +202,18 @@ class ValueWidget(tk.Frame):
             x1 = int(self.w / 2)
             x2 = x1 + (abs(value)) * x1 / vrange
 
-        self.canvas.itemconfig(self.text, text="%.2f" % value)
-        self.canvas.itemconfig(self.box, state=tk.NORMAL, fill=color)
-        self.canvas.coords(self.box, x1, 1, x2, self.h)
+        text = "%.2f" % value
+        if text != self._shown_text:
+            self.canvas.itemconfig(self.text, text=text)
+            self._shown_text = text
+            tk_ops.add()
+
+        box = (color, round(x1), round(x2))
+        if box != self._shown_box:
+            self.canvas.itemconfig(self.box, state=tk.NORMAL, fill=color)
+            self.canvas.coords(self.box, box[1], 1, box[2], self.h)
+            self._shown_box = box
+            tk_ops.add(2)
 
         self.value = value
 
@@ -161,6 +231,7 @@ class PanelIndicator(tk.Frame):
 
         self.canvas = tk.Canvas(self, width=width, height=height)
         self.light = self.canvas.create_oval(2, 2, 18, 18, fill="#aaaaaa")
+        self._shown_fill = "#aaaaaa"
 
         self.canvas.pack(fill=tk.BOTH)
 
@@ -186,20 +257,26 @@ class PanelIndicator(tk.Frame):
         else:
             self.set_off()
 
+    def _set_fill(self, fill):
+        if fill != self._shown_fill:
+            self.canvas.itemconfig(self.light, fill=fill)
+            self._shown_fill = fill
+            tk_ops.add()
+
     def set_on(self):
-        self.canvas.itemconfig(self.light, fill="#00FF00")
+        self._set_fill("#00FF00")
         self.value = True
 
     def set_off(self):
-        self.canvas.itemconfig(self.light, fill="#008800")
+        self._set_fill("#008800")
         self.value = False
 
     def set_back(self):
-        self.canvas.itemconfig(self.light, fill="#FF0000")
+        self._set_fill("#FF0000")
         self.value = -1
 
     def set_disabled(self):
-        self.canvas.itemconfig(self.light, fill="#aaaaaa")
+        self._set_fill("#aaaaaa")
         self.value = None
 
 
@@ -211,7 +288,7 @@ class CheckButtonWrapper(tk.Checkbutton):
 
     def __init__(self, master, text):
 
-        self.intval = tk.IntVar()
+        self.intval = CachedIntVar()
 
         super().__init__(
             master, text=text, variable=self.intval, command=self._on_command
@@ -226,7 +303,10 @@ class CheckButtonWrapper(tk.Checkbutton):
         return self.intval.get() == 1
 
     def set_value(self, value):
-        self.intval.set(1 if value else 0)
+        value = 1 if value else 0
+        if self.intval.get() != value:
+            self.intval.set(value)
+            tk_ops.add()
 
     def sync_value(self, value):
         if self.updated:
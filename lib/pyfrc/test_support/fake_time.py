@@ -1,3 +1,5 @@
+import heapq
+import itertools
 import threading
 import weakref
 
@@ -52,10 +54,20 @@ class FakeTime:
         # Note: when iterating this list, make copies or you'll run into errors
         self._child_threads = weakref.WeakKeyDictionary()
         self._children_free_run = False
-        self._children_not_running = threading.Event()
         self._freeze_detect_threshold = 250
         self.lock = threading.RLock()
 
+        # Child threads that are sleeping are stored in a min-heap of
+        # (wake time, sequence, thread) entries. Child threads that have been
+        # woken up are in the running set until they go back to sleep, and
+        # they notify the condition when they do.
+        self._children_cond = threading.Condition()
+        self._children_heap = []
+        self._children_running = set()
+        self._children_seq = itertools.count()
+
+        self._fast_forward = False
+
     def initialize(self):
         """
             Initializes fake time
@@ -89,36 +101,42 @@ class FakeTime:
         if self.time_limit is not None and self.time_limit <= self.time:
             raise TestRanTooLong()
 
-    def _wake_children(self, timestep):
-        # Subtract the timestep from the last requested times of the threads.
-        # Wake them up if the requested time is in the past, and they haven't
-        # already been stopped.
-        waiting_on = []
-        with self.lock:
-            child_threads = list(self._child_threads.items())
-        for thread, thread_info in child_threads:
-            thread_info["time"] -= timestep
-            if thread_info["time"] <= 0 and thread.is_alive():
-                self._children_not_running.clear()
-                thread_info["event"].set()  # Wake it up
-                waiting_on.append(thread)
-
-        # Wait for everything we woke up to sleep again.
-        # Check that we did wake something up.
-        if waiting_on:
+    def _next_child_wake_time(self):
+        with self._children_cond:
+            if self._children_heap:
+                return self._children_heap[0][0]
+        return None
+
+    def _wake_children(self):
+        # Wake up the threads whose requested time has been reached, and
+        # wait for them to go back to sleep (or die) before returning
+        with self._children_cond:
+            heap = self._children_heap
+            running = self._children_running
+            now = self.time
+
+            while heap and heap[0][0] <= now:
+                _, _, thread = heapq.heappop(heap)
+                child_info = self._child_threads.get(thread)
+                if child_info is not None and thread.is_alive():
+                    running.add(thread)
+                    child_info["event"].set()  # Wake it up
+
+            # Children signal when they go back to sleep. The timeout is only
+            # used to detect children that died or are stuck somewhere else.
             i = 0
-            while not self._children_not_running.wait(0.020):
+            while running:
+                if self._children_cond.wait(0.020):
+                    continue
+
                 i += 1
                 if i == self._freeze_detect_threshold:
-                    raise TestFroze("Waiting on %s" % waiting_on)
+                    raise TestFroze("Waiting on %s" % list(running))
 
-                # if this timed out, check to see if that particular
-                # child died...
-                for thread in waiting_on:
-                    if thread.is_alive():
-                        break  # out of the for loop, at least one child is active
-                else:
-                    break  # out of the while loop, everyone is dead
+                # if this timed out, check to see if any children died
+                for thread in list(running):
+                    if not thread.is_alive():
+                        running.discard(thread)
 
     def children_stopped(self):
         with self.lock:
@@ -129,9 +147,11 @@ class FakeTime:
         return True
 
     def teardown(self):
-        self._children_free_run = True  # Stop any threads being blocked
-        self._children_not_running.set()  # Main thread needs to be running
-        with self.lock:
+        with self._children_cond:
+            self._children_free_run = True  # Stop any threads being blocked
+            self._children_heap = []
+            self._children_running = set()  # Main thread needs to be running
+            self._children_cond.notify_all()
             thread_infos = list(self._child_threads.values())
         for thread_info in thread_infos:
             thread_info["event"].set()
@@ -145,11 +165,14 @@ class FakeTime:
         self.in_increment = False
 
         # Drop references to any child threads
-        self._child_threads = weakref.WeakKeyDictionary()
-        self._children_not_running.set()
-        self._children_free_run = False
+        with self._children_cond:
+            self._child_threads = weakref.WeakKeyDictionary()
+            self._children_heap = []
+            self._children_running = set()
+            self._children_free_run = False
 
         self.next_ds_time = 0.020
+        self.skipped_packets = 0
 
     def get(self):
         """
@@ -167,31 +190,32 @@ class FakeTime:
         # If it is a thread calling us, we intercept the call and insert
         # a blocking call to a threading.Event.wait() to force it to sleep
         # in the "real world", otherwise it keeps looping indeterminately.
-        # Store the requested time, and at each DS step wake up those that
-        # should have fired in the previous timestep.
+        # Store the requested wake time, and wake it up when the main thread
+        # advances time past that point.
         current_thread = threading.current_thread()
         if current_thread.ident != self.thread_id:
-            with self.lock:
+            with self._children_cond:
                 child_info = self._child_threads.get(current_thread)
                 if child_info is None:
-                    child_info = {"event": threading.Event(), "time": time}
+                    child_info = {"event": threading.Event()}
                     self._child_threads[current_thread] = child_info
 
-            if time > 0 and not self._children_free_run:
-                # Daughter thread needs to fire in the next DS time step,
-                # so make it wait
+                if time <= 0 or self._children_free_run:
+                    return
+
+                # Daughter thread needs to fire when the requested time is
+                # reached, so make it wait
                 child_info["event"].clear()
-                child_info["time"] = time
-                # Check to see if the other threads have finished
-                running = False
-                with self.lock:
-                    child_threads = list(self._child_threads.values())
-                for v in child_threads:
-                    if v["event"].is_set():
-                        running = True
-                if not running:
-                    self._children_not_running.set()
-                child_info["event"].wait()
+                heapq.heappush(
+                    self._children_heap,
+                    (self.time + time, next(self._children_seq), current_thread),
+                )
+
+                # Tell the main thread that this child is asleep again
+                self._children_running.discard(current_thread)
+                self._children_cond.notify_all()
+
+            child_info["event"].wait()
             # We don't need to do anything else for children
             return
 
@@ -210,18 +234,37 @@ class FakeTime:
         # because some tasks need to get the time themselves
         # eg feeding motor watchdogs
 
-        # This is terrible, but it works
+        # Time jumps directly to the next event: a child thread needs to be
+        # woken up, a DS packet arrives, or the requested time is reached
         while time > 0:
 
+            # A child thread needs to be woken up first
+            next_child = self._next_child_wake_time()
+            if next_child is not None:
+                next_child -= self.time
+                if next_child < time and next_child < next_ds:
+                    next_child = max(next_child, 0)
+                    with self.lock:
+                        self.time += next_child
+                        self.__time_test__()
+                        next_ds = self.next_ds_time - self.time
+                    time -= next_child
+                    self._wake_children()
+                    continue
+
             # Short wait, just get it done and exit
             if time < next_ds:
                 with self.lock:
                     self.time += time
                     self.__time_test__()
-                self._wake_children(time)
+                self._wake_children()
                 break
 
             with self.lock:
+                if self._fast_forward and not self.ds_cond._needs_packets():
+                    self._skip_packets(time, next_child)
+                    next_ds = self.next_ds_time - self.time
+
                 self.time += next_ds
 
                 if current_thread.ident == self.thread_id:
@@ -239,7 +282,44 @@ class FakeTime:
                 self.next_ds_time += next_ds
 
                 self.__time_test__()
-            self._wake_children(next_ds)
+            self._wake_children()
+
+    def _skip_packets(self, time, next_child):
+        # Skips over the DS packets that nothing would notice, leaving
+        # next_ds_time at the last packet that needs to be delivered
+        limit = self.time + time
+        if next_child is not None:
+            limit = min(limit, self.time + next_child)
+        if self.time_limit is not None:
+            limit = min(limit, self.time_limit)
+
+        next_ds_time = self.next_ds_time
+        following = next_ds_time + 0.020
+        skipped = 0
+
+        while following < limit:
+            next_ds_time = following
+            following += 0.020
+            skipped += 1
+
+        self.next_ds_time = next_ds_time
+        self.skipped_packets += skipped
+
+    def set_fast_forward(self, enabled=True):
+        """
+            When fast forward is enabled and nothing is waiting for DS
+            packets (there is no ``on_step`` controller, and no threads are
+            waiting on new DS data), incrementing time by a large amount
+            delivers only the last packet instead of every packet. Child
+            threads are still woken up at the correct time.
+
+            The number of packets that were skipped is stored in the
+            ``skipped_packets`` attribute.
+
+            :param enabled: True to enable fast forward
+            :type enabled: bool
+        """
+        self._fast_forward = enabled
 
     def increment_new_packet(self):
         """
@@ -269,6 +349,10 @@ class FakeTime:
             return self.next_ds_time - self.time
 
 
+def _default_on_step(tm):
+    return True
+
+
 class _DSCondition(threading.Condition):
     """
         Condition variable replacement to allow fake time to be used to hook
@@ -280,7 +364,11 @@ class _DSCondition(threading.Condition):
 
         self.thread_id = threading.current_thread().ident
         self.fake_time_inst = fake_time_inst
-        self._on_step = lambda tm: True
+        self._on_step = _default_on_step
+        self._waiting = 0
+
+    def _needs_packets(self):
+        return self._on_step is not _default_on_step or self._waiting > 0
 
     def on_step(self, tm):
 
@@ -301,7 +389,11 @@ class _DSCondition(threading.Condition):
             else:
                 # Not on main thread? wait for notify
                 # -> TODO: this could never return if a notify doesn't occur
-                super().wait()
+                self._waiting += 1
+                try:
+                    super().wait()
+                finally:
+                    self._waiting -= 1
 
             return True
 
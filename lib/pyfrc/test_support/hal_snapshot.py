@@ -0,0 +1,143 @@
+import hal_impl.data
+
+
+def _copy_cbs(cbs):
+    return {k: list(v) for k, v in cbs.items()}
+
+
+def _copy(value):
+    # Copies the dict/list structure of hal_data, and the lists of callbacks
+    # registered on any NotifyDict (but not the callbacks themselves)
+    if isinstance(value, dict):
+        c = type(value)()
+        for k, v in value.items():
+            dict.__setitem__(c, k, _copy(v))
+        if isinstance(value, hal_impl.data.NotifyDict):
+            c.cbs = _copy_cbs(value.cbs)
+        return c
+    elif isinstance(value, list):
+        return [_copy(v) for v in value]
+    return value
+
+
+def _restore_dict(live, saved, callbacks=False):
+    changed = 0
+
+    # callbacks registered since the snapshot are removed first, so that
+    # they aren't called by the restore
+    if (
+        callbacks
+        and isinstance(live, hal_impl.data.NotifyDict)
+        and isinstance(saved, hal_impl.data.NotifyDict)
+        and live.cbs != saved.cbs
+    ):
+        live.cbs = _copy_cbs(saved.cbs)
+
+    for k in [k for k in live if k not in saved]:
+        del live[k]
+        changed += 1
+
+    for k, sv in saved.items():
+        if k not in live:
+            live[k] = _copy(sv)
+            changed += 1
+        else:
+            lv = live[k]
+            c = _restore_value(lv, sv, callbacks)
+            if c is None:
+                live[k] = _copy(sv)
+                changed += 1
+            else:
+                changed += c
+
+    return changed
+
+
+def _restore_list(live, saved, callbacks=False):
+    changed = 0
+
+    if len(live) > len(saved):
+        changed += len(live) - len(saved)
+        del live[len(saved) :]
+
+    for i, sv in enumerate(saved):
+        if i >= len(live):
+            live.append(_copy(sv))
+            changed += 1
+        else:
+            c = _restore_value(live[i], sv, callbacks)
+            if c is None:
+                live[i] = _copy(sv)
+                changed += 1
+            else:
+                changed += c
+
+    return changed
+
+
+def _restore_value(live, saved, callbacks):
+    # Returns the number of values that were restored, or None if the
+    # live value must be replaced by the caller
+    if isinstance(live, dict) and isinstance(saved, dict):
+        return _restore_dict(live, saved, callbacks)
+    elif isinstance(live, list) and isinstance(saved, list):
+        return _restore_list(live, saved, callbacks)
+    elif type(live) is type(saved) and live == saved:
+        return 0
+    return None
+
+
+class HalSnapshot:
+    """
+        A copy of the contents of ``hal_data``, which can be restored later.
+        Restoring only modifies the values that changed since the snapshot
+        was taken, so any references to parts of ``hal_data`` stay valid.
+
+        .. note:: Only the HAL data is restored. Your robot object and any
+                  other state are not modified.
+
+        Use the ``hal_snapshot`` fixture to take a snapshot in your tests::
+
+            def test_scenarios(control, hal_data, hal_snapshot):
+
+                # ... run the robot to some interesting state
+
+                snapshot = hal_snapshot()
+
+                # ... try one thing
+
+                snapshot.restore()
+
+                # ... try something else from the same state
+    """
+
+    def __init__(self, data=None, in_data=None):
+        """
+            :param data:    The dictionary to snapshot, defaults to ``hal_data``
+            :param in_data: The input dictionary to snapshot, defaults to
+                            ``hal_in_data``
+        """
+        if data is None:
+            data = hal_impl.data.hal_data
+        if in_data is None:
+            in_data = hal_impl.data.hal_in_data
+
+        self._data = data
+        self._in_data = in_data
+
+        self._saved_data = _copy(data)
+        self._saved_in_data = _copy(in_data)
+
+    def restore(self, callbacks=False):
+        """
+            Restores the data to the way it was when the snapshot was taken
+
+            :param callbacks: Also remove the callbacks that were registered
+                              on ``hal_data`` since the snapshot was taken.
+                              Don't use this while the robot is running, as
+                              the devices it creates register callbacks.
+            :returns: The number of values that were changed
+        """
+        changed = _restore_dict(self._data, self._saved_data, callbacks)
+        changed += _restore_dict(self._in_data, self._saved_in_data, callbacks)
+        return changed
@@ -0,0 +1,30 @@
+"""
+    Hooks that can be implemented in the ``conftest.py`` of your tests to
+    customize how pyfrc sets up your robot.
+
+    When tests are ran with ``--fork``, the robot is created and robotInit
+    is ran once, and each test runs in a forked copy of that robot. A test
+    can then no longer set things up before robotInit runs, so anything
+    that robotInit depends on must be set up in
+    :func:`pytest_pyfrc_before_robotinit` instead::
+
+        # conftest.py
+
+        def pytest_pyfrc_before_robotinit(robot):
+            robot.use_fake_camera = True
+"""
+
+import pluggy
+
+hookspec = pluggy.HookspecMarker("pytest")
+
+
+@hookspec
+def pytest_pyfrc_before_robotinit(robot):
+    """
+        Called after your robot object is created, before robotInit runs.
+        With ``--fork``, it is only called once, for the robot that each
+        test is forked from.
+
+        :param robot: Your robot instance
+    """
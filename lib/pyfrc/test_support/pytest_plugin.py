@@ -1,15 +1,45 @@
+import json
+import logging
+import os
+import threading
+
 import pytest
 
 import hal_impl
-from . import fake_time, pyfrc_fake_hooks
+from . import fake_time, hooks, pyfrc_fake_hooks
 
 from .controller import TestController
+from .hal_snapshot import HalSnapshot
+
+logger = logging.getLogger("pyfrc.test")
 
 
 class ThreadStillRunningError(Exception):
     pass
 
 
+def _reset_wpilib_classes():
+    # The same as wpilib._impl.utils.reset_wpilib, without rebuilding the
+    # HAL data at the end
+    import inspect
+    import sys
+
+    for modname in (
+        "wpilib",
+        "wpilib.buttons",
+        "wpilib.command",
+        "wpilib.interfaces",
+        "wpilib.shuffleboard",
+    ):
+        module = sys.modules.get(modname)
+        if module is None:
+            continue
+
+        for _, cls in inspect.getmembers(module, inspect.isclass):
+            if hasattr(cls, "_reset"):
+                cls._reset()
+
+
 class PyFrcPlugin:
     """
         Pytest plugin. Each documented member function name can be an argument
@@ -17,7 +47,7 @@ class PyFrcPlugin:
         be passed to your test function.
     """
 
-    def __init__(self, robot_class, robot_file, robot_path):
+    def __init__(self, robot_class, robot_file, robot_path, fork=False):
         self.robot_class = robot_class
 
         self._robot_file = robot_file
@@ -30,12 +60,31 @@ class PyFrcPlugin:
         self._control = None
 
         self._started = False
+        self._config = None
+
+        # After the first test, hal_data is restored from this snapshot
+        # instead of being rebuilt
+        self._hal_snapshot = None
+        self._hal_reset = False
+
+        # When fork is enabled, the robot is initialized once in this process
+        # and each test is ran in a forked copy of it
+        self._fork = fork
+        self._template_ready = False
+        self._forked_child = False
 
         # Setup the hal hooks so we can control time
         # -> The hook doesn't have any state, so we initialize it only once
         hal_impl.functions.hooks = pyfrc_fake_hooks.PyFrcFakeHooks(self._fake_time)
 
     def pytest_runtest_setup(self):
+        # The forked child inherits an initialized robot from the template
+        if self._forked_child:
+            return
+
+        self._setup_robot()
+
+    def _setup_robot(self):
         # This function needs to do the same things that RobotBase.main does,
         # plus some extra things needed for testing
 
@@ -63,7 +112,20 @@ class PyFrcPlugin:
         self._fake_time.initialize()
         self._test_controller = TestController(self._fake_time)
 
-        hal_impl.functions.reset_hal()
+        if self._hal_snapshot is None or not self._hal_reset:
+            hal_impl.functions.reset_hal()
+            self._hal_snapshot = HalSnapshot()
+        else:
+            # Same as reset_hal, but restores hal_data instead of rebuilding
+            # it. The snapshot was taken after the HAL was initialized, so
+            # initializing it again leaves hal_data the same.
+            self._hal_snapshot.restore(callbacks=True)
+            hal_impl.data.hooks = hal_impl.functions.hooks
+            hal_impl.functions.hooks.reset()
+            hal_impl.functions._initialized = False
+            hal_impl.functions.initialize()
+
+        self._hal_reset = False
 
         import wpilib
 
@@ -80,8 +142,178 @@ class PyFrcPlugin:
             self._test_controller._robot, "_RobotBase__initialized"
         ), "If your robot class has an __init__ function, it must call super().__init__()!"
 
+        if self._config is not None:
+            self._config.hook.pytest_pyfrc_before_robotinit(
+                robot=self._test_controller._robot
+            )
+
         self._started = True
 
+    def pytest_addhooks(self, pluginmanager):
+        pluginmanager.add_hookspecs(hooks)
+
+    #
+    # Forked test support
+    #
+
+    def pytest_configure(self, config):
+        self._config = config
+
+        if not self._fork:
+            return
+
+        if not hasattr(os, "fork"):
+            logger.warning("fork is not supported on this platform, ignoring it")
+            self._fork = False
+        elif not hasattr(config.hook, "pytest_report_to_serializable"):
+            logger.warning("fork requires a newer version of pytest, ignoring it")
+            self._fork = False
+        else:
+            # pytest has no public API to run the test protocol without
+            # logging the reports, so make sure the internal one still exists
+            try:
+                from _pytest.runner import runtestprotocol
+            except ImportError:
+                logger.warning("fork isn't supported by this version of pytest")
+                self._fork = False
+            else:
+                self._runtestprotocol = runtestprotocol
+
+            # TestReport is public since pytest 7
+            self._TestReport = getattr(pytest, "TestReport", None)
+            if self._TestReport is None:
+                from _pytest.reports import TestReport
+
+                self._TestReport = TestReport
+
+    def _setup_template(self):
+        # Initializes the robot that each test is forked from, including
+        # running robotInit, so that each test starts from the same
+        # initialized robot. Tests that need to set things up before
+        # robotInit use the pytest_pyfrc_before_robotinit hook. Returns False if
+        # forking isn't safe.
+        import wpilib
+
+        threads = set(threading.enumerate())
+
+        self._setup_robot()
+        robot = self._test_controller._robot
+
+        try:
+            robot.robotInit()
+        except Exception:
+            # let the robotInit failure happen inside of each test instead
+            logger.warning("robotInit failed, not initializing it before forking")
+            self.pytest_runtest_teardown(None)
+            self._setup_robot()
+        else:
+            # Don't call it again when the test calls startCompetition
+            robot.robotInit = lambda: None
+
+        # Threads do not survive a fork. The watchdog thread is restarted in
+        # each child, but other threads cannot be
+        new_threads = [
+            t
+            for t in threading.enumerate()
+            if t not in threads and t is not getattr(wpilib.Watchdog, "_thread", None)
+        ]
+        if new_threads:
+            logger.warning(
+                "Robot initialization started threads %s, disabling fork", new_threads
+            )
+            self.pytest_runtest_teardown(None)
+            return False
+
+        return True
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_protocol(self, item, nextitem):
+        if not self._fork:
+            return
+
+        if not self._template_ready:
+            if not self._setup_template():
+                self._fork = False
+                return
+
+            self._template_ready = True
+
+        item.ihook.pytest_runtest_logstart(nodeid=item.nodeid, location=item.location)
+
+        rfd, wfd = os.pipe()
+        pid = os.fork()
+
+        if pid == 0:
+            # child: run the test and send the reports to the parent
+            os.close(rfd)
+            status = 0
+            try:
+                self._run_forked_child(item, wfd)
+            except BaseException:
+                status = 1
+            finally:
+                os._exit(status)
+
+        os.close(wfd)
+        with os.fdopen(rfd, "rb") as fp:
+            data = fp.read()
+
+        _, status = os.waitpid(pid, 0)
+
+        config = item.config
+        reports = []
+        for line in data.splitlines():
+            reports.append(
+                config.hook.pytest_report_from_serializable(
+                    config=config, data=json.loads(line.decode("utf-8"))
+                )
+            )
+
+        if not reports:
+            reports.append(
+                self._TestReport(
+                    item.nodeid,
+                    item.location,
+                    {},
+                    "failed",
+                    "test process crashed (exit status %s)" % status,
+                    "call",
+                )
+            )
+
+        for report in reports:
+            item.ihook.pytest_runtest_logreport(report=report)
+
+        item.ihook.pytest_runtest_logfinish(nodeid=item.nodeid, location=item.location)
+        return True
+
+    def _run_forked_child(self, item, wfd):
+        import wpilib
+
+        self._forked_child = True
+
+        # restart the watchdog thread if the robot had started it
+        if getattr(wpilib.Watchdog, "_thread", None) is not None:
+            wpilib.Watchdog._thread = threading.Thread(
+                target=wpilib.Watchdog._schedulerFunc, daemon=True
+            )
+            wpilib.Watchdog._thread.start()
+
+        config = item.config
+        reports = self._runtestprotocol(item, log=False, nextitem=None)
+
+        with os.fdopen(wfd, "wb") as fp:
+            for report in reports:
+                data = config.hook.pytest_report_to_serializable(
+                    config=config, report=report
+                )
+                fp.write(json.dumps(data).encode("utf-8") + b"\n")
+
+    def pytest_sessionfinish(self, session):
+        if self._template_ready:
+            self._template_ready = False
+            self.pytest_runtest_teardown(None)
+
     def pytest_runtest_teardown(self, nextitem):
 
         started = self._started
@@ -97,9 +329,15 @@ class PyFrcPlugin:
         if not started:
             return
 
-        import wpilib._impl.utils
+        if self._hal_snapshot is not None:
+            # hal_data is restored from the snapshot when the next test is
+            # setup, so only the wpilib classes need to be reset here
+            _reset_wpilib_classes()
+        else:
+            import wpilib._impl.utils
 
-        wpilib._impl.utils.reset_wpilib()
+            wpilib._impl.utils.reset_wpilib()
+        self._hal_reset = True
 
         import networktables
 
@@ -151,6 +389,17 @@ class PyFrcPlugin:
         """
         return hal_impl.data.hal_data
 
+    @pytest.fixture()
+    def hal_snapshot(self):
+        """
+            A fixture that takes snapshots of ``hal_data``. Call it to take
+            a snapshot, and call ``restore`` on the snapshot to go back to
+            that state.
+
+            :rtype: :class:`.HalSnapshot`
+        """
+        return HalSnapshot
+
     @pytest.fixture()
     def robot(self):
         """Your robot instance"""
@@ -67,7 +67,7 @@ setup(
     install_requires=install_requires
     if not os.environ.get("ROBOTPY_NO_DEPS")
     else None,
-    extras_require={"coverage": ["coverage"]},
+    extras_require={"coverage": ["coverage"], "numpy": ["numpy"]},
     requires_python=">=3.5",
     classifiers=[
         "Development Status :: 5 - Production/Stable",
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+#
+# Measures the cost of checking the robot for collisions with a varying
+# number of field objects, using the grid and by checking every object
+#
+
+import random
+import timeit
+
+from pyfrc.physics.collision import CollisionGrid, polygons_intersect, robot_polygon
+
+
+def _make_objects(n, rng):
+    objects = []
+    for _ in range(n):
+        x = rng.uniform(0, 54)
+        y = rng.uniform(0, 27)
+        objects.append([(x, y), (x + 0.5, y), (x + 0.5, y + 0.5), (x, y + 0.5)])
+    return objects
+
+
+def main():
+    rng = random.Random(0)
+    poses = [
+        robot_polygon(rng.uniform(0, 54), rng.uniform(0, 27), rng.uniform(0, 6), 2, 3)
+        for _ in range(100)
+    ]
+
+    print("%8s %14s %14s" % ("objects", "grid (us)", "all (us)"))
+
+    for n in (10, 100, 1000, 10000):
+        objects = _make_objects(n, rng)
+        grid = CollisionGrid(objects)
+
+        def _grid():
+            for pts in poses:
+                grid.collisions(pts)
+
+        def _all():
+            for pts in poses:
+                [o for o in objects if polygons_intersect(pts, o)]
+
+        number = 10
+        t_grid = min(timeit.repeat(_grid, number=number, repeat=3))
+        t_all = min(timeit.repeat(_all, number=1, repeat=1))
+
+        step_grid = t_grid / (number * len(poses)) * 1e6
+        step_all = t_all / len(poses) * 1e6
+        print("%8d %14.1f %14.1f" % (n, step_grid, step_all))
+
+
+if __name__ == "__main__":
+    main()
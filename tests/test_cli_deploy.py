@@ -0,0 +1,164 @@
+import argparse
+import subprocess
+
+import pytest
+
+from pyfrc.deploy import manifest
+from pyfrc.mains.cli_deploy import (
+    PyFrcDeploy,
+    _echo_value,
+    _housekeeping_redirect,
+    _incremental_replace_cmd,
+    _load_remote_manifest,
+)
+
+
+def _bash(cmd, cwd):
+    return subprocess.run(
+        ["bash", "-ce", cmd],
+        cwd=str(cwd),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+
+
+def test_housekeeping_output(tmpdir):
+    tmpdir.mkdir("py").join(manifest.manifest_name).write('{"robot.py": "1"}')
+
+    result = _bash(
+        "; ".join(
+            [
+                _housekeeping_redirect,
+                'echo "WPILib version on robot is 2019.0.0"',
+                _echo_value("MANIFEST", "cat py/%s" % manifest.manifest_name),
+                _echo_value("CACHE_TAG", "cat missing 2>/dev/null || true"),
+            ]
+        ),
+        tmpdir,
+    )
+
+    # messages aren't captured, so they are shown as the command runs
+    assert result.stderr == "WPILib version on robot is 2019.0.0\n"
+
+    deploy = PyFrcDeploy(argparse.ArgumentParser())
+    values = deploy._parse_housekeeping(result.stdout)
+    assert values == {"MANIFEST": '{"robot.py": "1"}', "CACHE_TAG": ""}
+    assert manifest.loads(values["MANIFEST"]) == {"robot.py": "1"}
+
+
+def test_incremental_replace(tmpdir):
+    py = tmpdir.mkdir("py")
+    py.join("robot.py").write("old")
+    py.join("auto.py").write("removed")
+    py.join("stale_from_inplace.py").write("not in the manifest")
+    components = py.mkdir("components")
+    components.join("drive.py").write("unchanged")
+    components.mkdir("__pycache__").join("drive.cpython-37.opt-1.pyc").write("pyc")
+    py.mkdir("__pycache__").join("robot.cpython-37.opt-1.pyc").write("old pyc")
+
+    # only the changed files were uploaded
+    py_new = tmpdir.mkdir("py_new")
+    py_new.join("robot.py").write("new")
+    py_new.join(manifest.unchanged_name).write("components/drive.py\n")
+
+    replace_cmd = "rm -rf py.old; mv py py.old; mv py_new py"
+    _bash(_incremental_replace_cmd("py", "py_new", replace_cmd), tmpdir)
+
+    py_old = tmpdir.join("py.old")
+
+    assert not py_new.check()
+    assert py.join("robot.py").read() == "new"
+    assert py.join("components", "drive.py").read() == "unchanged"
+    assert not py.join("auto.py").check()
+    assert not py.join("stale_from_inplace.py").check()
+    assert not py.join(manifest.unchanged_name).check()
+
+    # bytecode is kept for the unchanged files only
+    pyc = py.join("components", "__pycache__", "drive.cpython-37.opt-1.pyc")
+    assert pyc.read() == "pyc"
+    assert not py.join("__pycache__").check()
+
+    # the unchanged files are linked instead of copied
+    old_drive = py_old.join("components", "drive.py")
+    assert py.join("components", "drive.py").stat().ino == old_drive.stat().ino
+
+
+def test_load_remote_manifest():
+    deployed = {"robot.py": "1", manifest.optimize_key: "1"}
+    housekeeping = {"MANIFEST": manifest.dumps(deployed)}
+
+    assert _load_remote_manifest(housekeeping, 1) == {"robot.py": "1"}
+
+    # the unchanged files would keep bytecode for the wrong optimization level
+    assert _load_remote_manifest(housekeeping, 0) is None
+
+    # deployed before the optimization level was recorded
+    old = {"MANIFEST": manifest.dumps({"robot.py": "1"})}
+    assert _load_remote_manifest(old, 1) is None
+
+    assert _load_remote_manifest({"MANIFEST": ""}, 1) is None
+    assert _load_remote_manifest({}, 1) is None
+
+
+class _Controller:
+    # fails the first housekeeping command because of StartupDLLs
+    def __init__(self, installer):
+        self.installer = installer
+        self.username = "lvuser"
+        self.commands = []
+
+    def ssh(self, cmd, get_output=False):
+        self.commands.append((self.username, cmd))
+        if len(self.commands) == 1:
+            raise self.installer.SshExecError("exit 91", 91)
+        return "CACHE_TAG:cpython-37\n" if get_output else None
+
+
+def test_housekeeping_startup_dlls():
+    installer = pytest.importorskip("robotpy_installer.installer")
+
+    controller = _Controller(installer)
+    deploy = PyFrcDeploy(argparse.ArgumentParser())
+
+    # the values are reported by running the command again after the fix
+    assert deploy._housekeeping(controller, "housekeeping") == {
+        "CACHE_TAG": "cpython-37"
+    }
+    assert [c[0] for c in controller.commands] == ["lvuser", "admin", "lvuser"]
+    assert controller.commands[2][1] == "housekeeping"
+    assert controller.username == "lvuser"
+
+
+def test_watch(monkeypatch, capsys):
+    pytest.importorskip("robotpy_installer")
+    from pyfrc.mains import cli_deploy
+
+    # the files on each poll
+    polls = iter(["a", "b", "b", "b", "b", "c", "c"])
+
+    def stat_files(robot_path, files):
+        return next(polls)
+
+    monkeypatch.setattr(cli_deploy.manifest, "stat_files", stat_files)
+    monkeypatch.setattr(cli_deploy.manifest, "deploy_files", lambda robot_path: [])
+
+    deploys = []
+
+    def _deploy(controller, options, robot_path, commands):
+        deploys.append(len(deploys))
+        if len(deploys) == 1:
+            raise FileNotFoundError("robot.py")
+        if len(deploys) == 3:
+            raise KeyboardInterrupt
+
+    deploy = PyFrcDeploy(argparse.ArgumentParser())
+    deploy.watch_period = 0
+    deploy._deploy = _deploy
+
+    assert deploy._watch(None, None, "robot", None) == 0
+
+    # the files were replaced while deploying, so it was tried again
+    assert deploys == [0, 1, 2]
+    assert "robot.py, trying again" in capsys.readouterr().err
@@ -0,0 +1,128 @@
+import math
+
+import hal_impl.functions
+
+from pyfrc.physics.collision import CollisionGrid, polygons_intersect, robot_polygon
+from pyfrc.physics.core import PhysicsInterface
+
+
+def _rect(x, y, w, h):
+    return [(x, y), (x + w, y), (x + w, y + h), (x, y + h)]
+
+
+def test_polygons_intersect():
+    assert polygons_intersect(_rect(0, 0, 2, 2), _rect(1, 1, 2, 2))
+    assert polygons_intersect(_rect(0, 0, 2, 2), _rect(0, 1, 2, 2))
+
+    # one inside the other
+    assert polygons_intersect(_rect(0, 0, 4, 4), _rect(1, 1, 1, 1))
+
+    # touching is not a collision
+    assert not polygons_intersect(_rect(0, 0, 2, 2), _rect(2, 0, 2, 2))
+    assert not polygons_intersect(_rect(0, 0, 2, 2), _rect(3, 3, 1, 1))
+
+    # bounding boxes overlap, but the rotated square doesn't
+    diamond = robot_polygon(3.5, 3.5, math.pi / 4, 1, 1)
+    assert not polygons_intersect(_rect(0, 0, 3, 3), diamond)
+
+
+def test_collision_grid():
+    polygons = [_rect(i * 3, 0, 1, 1) for i in range(10)] + [_rect(0, 5, 30, 1)]
+    grid = CollisionGrid(polygons, cell_size=2.0)
+
+    robot = _rect(6.5, 0.5, 1, 1)
+    assert grid.candidates(robot) <= {1, 2, 3}
+    assert grid.collisions(robot) == [2]
+    assert grid.collides(robot)
+
+    assert grid.collisions(_rect(14, 4.5, 1, 1)) == [10]
+    assert not grid.collides(_rect(14, 2, 1, 1))
+
+
+def test_distance_drive_collision(tmpdir):
+    hal_impl.functions.reset_hal()
+
+    config_obj = {
+        "pyfrc": {
+            "robot": {
+                "w": 2,
+                "l": 2,
+                "starting_x": 2,
+                "starting_y": 2,
+                "starting_angle": 0,
+            },
+            "field": {
+                "collisions": True,
+                "objects": [{"color": "grey", "rect": [5, 0, 1, 10]}],
+            },
+        }
+    }
+
+    physics = PhysicsInterface(str(tmpdir), None, config_obj)
+
+    for _ in range(10):
+        physics.distance_drive(0.5, 0, 0)
+
+    # the robot stopped at the wall
+    x, y, angle = physics.get_position()
+    assert x == 4
+    assert y == 2
+
+
+def test_penetration():
+    from pyfrc.physics.collision import penetration
+
+    assert penetration(_rect(0, 0, 2, 2), _rect(1.5, 0, 2, 2)) == 0.5
+    assert penetration(_rect(0, 0, 2, 2), _rect(2, 0, 2, 2)) == 0
+    assert penetration(_rect(0, 0, 2, 2), _rect(3, 3, 1, 1)) == 0
+
+
+def test_distance_drive_start_in_contact(tmpdir):
+    hal_impl.functions.reset_hal()
+
+    config_obj = {
+        "pyfrc": {
+            "robot": {
+                "w": 2,
+                "l": 2,
+                "starting_x": 4.5,
+                "starting_y": 2,
+                "starting_angle": 10,
+            },
+            "field": {
+                "collisions": True,
+                "objects": [{"color": "grey", "rect": [5, 0, 1, 10]}],
+            },
+        }
+    }
+
+    # the robot starts turned, with a corner in the wall
+    physics = PhysicsInterface(str(tmpdir), None, config_obj)
+    start_angle = math.radians(10)
+
+    # it can't go further in, or turn further in
+    physics.distance_drive(0.25, 0, 0)
+    physics.distance_drive(0, 0, 0.1)
+    assert physics.get_position() == (4.5, 2, start_angle)
+
+    # it can turn out of the wall, even while trying to drive into it
+    physics.distance_drive(0.25, 0, -0.1)
+    x, y, angle = physics.get_position()
+    assert (x, y) == (4.5, 2)
+    assert angle == start_angle - 0.1
+
+    # and back away from it
+    physics.distance_drive(-1, 0, 0)
+    x, y, angle = physics.get_position()
+    assert x < 4
+
+
+def test_drawable_element_intersects():
+    from pyfrc.sim.field.elements import DrawableElement
+
+    a = DrawableElement(_rect(0, 0, 2, 2), (1, 1), 0, "red")
+    b = DrawableElement(_rect(1, 1, 2, 2), (2, 2), 0, "blue")
+    c = DrawableElement(_rect(2, 0, 2, 2), (3, 1), 0, "blue")
+
+    assert a.intersects(b)
+    assert not a.intersects(c)
@@ -0,0 +1,21 @@
+import io
+import tarfile
+
+from pyfrc.deploy.archive import build_archive, files_size
+
+
+def test_build_archive(tmpdir):
+    tmpdir.join("robot.py").write("import wpilib\n" * 100)
+    tmpdir.mkdir("components").join("drive.py").write("pass\n")
+
+    files = ["robot.py", "components/drive.py"]
+    data = build_archive(str(tmpdir), files, {".deploy_manifest": "{}"})
+
+    # compressed
+    assert len(data) < files_size(str(tmpdir), files)
+
+    with tarfile.open(fileobj=io.BytesIO(data), mode="r:gz") as tar:
+        assert tar.getnames() == files + [".deploy_manifest"]
+        assert tar.extractfile("components/drive.py").read() == b"pass\n"
+        assert tar.extractfile(".deploy_manifest").read() == b"{}"
+        assert tar.getmember("robot.py").uname == ""
@@ -0,0 +1,62 @@
+import importlib.util
+import sys
+
+import pytest
+
+from pyfrc.deploy.bytecode import BytecodeCache, cache_dir, can_precompile
+
+
+def test_precompile(tmpdir):
+    if not can_precompile(sys.implementation.cache_tag):
+        pytest.skip("requires python 3.7+")
+
+    robot_path = tmpdir.mkdir("robot")
+    robot_path.mkdir("components").join("drive.py").write("speed = 1\n")
+
+    cache = BytecodeCache(str(tmpdir.join("cache")), 1)
+    assert cache.pyc_path("components/drive.py") == importlib.util.cache_from_source(
+        "components/drive.py", optimization=1
+    ).replace("\\", "/")
+
+    data = cache.compile(
+        str(robot_path), "components/drive.py", "h1", "/home/lvuser/py/drive.py"
+    )
+
+    # hash based pyc (PEP 552), so it doesn't depend on the source mtime
+    assert int.from_bytes(data[4:8], "little") == 0b11
+
+    # cached by source hash
+    robot_path.join("components", "drive.py").write("speed = 2\n")
+    assert (
+        cache.compile(
+            str(robot_path), "components/drive.py", "h1", "/home/lvuser/py/drive.py"
+        )
+        == data
+    )
+    assert (
+        cache.compile(
+            str(robot_path), "components/drive.py", "h2", "/home/lvuser/py/drive.py"
+        )
+        != data
+    )
+    assert len(tmpdir.join("cache").listdir()) == 2
+
+    cache.prune({"components/drive.py": "h2"})
+    assert len(tmpdir.join("cache").listdir()) == 1
+
+    assert not can_precompile("cpython-00")
+
+
+def test_cache_dir(tmpdir, monkeypatch):
+    monkeypatch.setattr(sys, "platform", "linux")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmpdir.join("cache")))
+
+    robot1 = str(tmpdir.join("robot1"))
+    robot2 = str(tmpdir.join("robot2"))
+
+    # outside of the project, and separate for each project
+    path = cache_dir(robot1, 1)
+    assert path.startswith(str(tmpdir.join("cache", "pyfrc")))
+    assert path == cache_dir(robot1, 1)
+    assert path != cache_dir(robot1, 0)
+    assert path != cache_dir(robot2, 1)
@@ -0,0 +1,62 @@
+from pyfrc.deploy import manifest
+
+
+def test_deploy_files(tmpdir):
+    tmpdir.join("robot.py").write("")
+    tmpdir.join(".deploy_cfg").write("")
+    tmpdir.join("old.pyc").write("")
+    tmpdir.mkdir("components").join("drive.py").write("")
+    tmpdir.mkdir("__pycache__").join("robot.cpython-36.pyc").write("")
+    tmpdir.mkdir(".git").join("HEAD").write("")
+
+    assert manifest.deploy_files(str(tmpdir)) == ["robot.py", "components/drive.py"]
+
+
+def test_diff(tmpdir):
+    tmpdir.join("robot.py").write("print('hi')")
+    tmpdir.mkdir("components").join("drive.py").write("")
+
+    files = manifest.deploy_files(str(tmpdir))
+    local = manifest.hash_files(str(tmpdir), files)
+    assert manifest.loads(manifest.dumps(local)) == local
+
+    assert manifest.diff(local, local) == ([], [])
+    assert manifest.diff(local, {}) == (["components/drive.py", "robot.py"], [])
+
+    remote = dict(local, **{"robot.py": "0", "auto.py": "1"})
+    assert manifest.diff(local, remote) == (["robot.py"], ["auto.py"])
+
+    assert manifest.loads("") is None
+    assert manifest.loads("[1, 2]") is None
+
+
+def test_deployignore(tmpdir):
+    tmpdir.join("robot.py").write("")
+    tmpdir.join("notes.txt").write("")
+    tmpdir.mkdir("assets").join("field.png").write("")
+    tmpdir.join("assets").join("paths.json").write("")
+    tmpdir.mkdir("build").join("out.py").write("")
+    tmpdir.mkdir("components").mkdir("build").join("drive.py").write("")
+
+    tmpdir.join(".deployignore").write(
+        "# comments and blank lines are skipped\n\n*.txt\nassets/*.png\n/build/\n"
+    )
+
+    assert manifest.deploy_files(str(tmpdir)) == [
+        "robot.py",
+        "assets/paths.json",
+        "components/build/drive.py",
+    ]
+
+    assert manifest.is_ignored("build", True, ["build/"])
+    assert not manifest.is_ignored("build", False, ["build/"])
+
+
+def test_stat_files(tmpdir):
+    tmpdir.join("robot.py").write("")
+
+    stats = manifest.stat_files(str(tmpdir), ["robot.py", "deleted.py"])
+    assert list(stats) == ["robot.py"]
+
+    tmpdir.join("robot.py").write("import wpilib\n")
+    assert manifest.stat_files(str(tmpdir), ["robot.py"]) != stats
@@ -0,0 +1,235 @@
+import os
+import signal
+import subprocess
+import threading
+import time
+
+import pytest
+
+from pyfrc.deploy.session import sftp_batch, sftp_files_batch
+
+
+def test_sftp_batch(tmpdir):
+    py_new = tmpdir.mkdir("py_new")
+    py_new.join("robot.py").write("")
+    py_new.mkdir("components").join("drive.py").write("")
+
+    local = str(py_new)
+    assert sftp_batch(local, "/home/lvuser") == [
+        'mkdir "/home/lvuser/py_new"',
+        'put "%s" "/home/lvuser/py_new/robot.py"' % os.path.join(local, "robot.py"),
+        '-mkdir "/home/lvuser/py_new/components"',
+        'put "%s" "/home/lvuser/py_new/components/drive.py"'
+        % os.path.join(local, "components", "drive.py"),
+    ]
+
+    archive = str(tmpdir.join("py_new.tar.gz"))
+    assert sftp_batch(archive, "/home/lvuser", mkdir=False) == [
+        'put "%s" "/home/lvuser/py_new.tar.gz"' % archive
+    ]
+
+
+def test_sftp_files_batch():
+    sources = [
+        ("/robot/robot.py", "robot.py"),
+        ("/robot/components/drive.py", "components/drive.py"),
+        ("/robot/components/auto/left.py", "components/auto/left.py"),
+        ("/tmp/extra/__pycache__/robot.pyc", "__pycache__/robot.pyc"),
+    ]
+    assert sftp_files_batch(sources, "/home/lvuser/py_new") == [
+        'mkdir "/home/lvuser/py_new"',
+        'put "/robot/robot.py" "/home/lvuser/py_new/robot.py"',
+        '-mkdir "/home/lvuser/py_new/components"',
+        'put "/robot/components/drive.py" "/home/lvuser/py_new/components/drive.py"',
+        '-mkdir "/home/lvuser/py_new/components/auto"',
+        'put "/robot/components/auto/left.py" '
+        + '"/home/lvuser/py_new/components/auto/left.py"',
+        '-mkdir "/home/lvuser/py_new/__pycache__"',
+        'put "/tmp/extra/__pycache__/robot.pyc" '
+        + '"/home/lvuser/py_new/__pycache__/robot.pyc"',
+    ]
+
+    assert sftp_files_batch([], "/home/lvuser/py", mkdir=False) == []
+
+
+class _Controller:
+    hostname = "roborio-1234-frc.local"
+    password = ""
+
+    def __init__(self):
+        self.username = "lvuser"
+        self.commands = []
+
+    def ssh(self, *args, get_output=False):
+        self.commands.append((self.username,) + args)
+        return "unshared"
+
+    def sftp(self, src, dst, mkdir=True):
+        staged = sorted(
+            os.path.relpath(os.path.join(d, f), src)
+            for d, _, files in os.walk(src)
+            for f in files
+        )
+        self.commands.append(("sftp", os.path.basename(src), dst, mkdir, staged))
+
+
+def _option(args, prefix):
+    return next(arg for arg in args if arg.startswith(prefix))[len(prefix) :]
+
+
+class _Ssh:
+    # stands in for ssh_exec_pass, the master runs until it is told to exit
+
+    def __init__(self):
+        self.commands = []
+        self.batches = []
+        self.masters = 0
+        self.exit = threading.Event()
+
+    def __call__(
+        self, password, args, capture_output=False, suppress_known_hosts=False
+    ):
+        self.commands.append(args)
+        if "-oControlMaster=yes" in args:
+            self.masters += 1
+            self.exit.clear()
+            control_path = _option(args, "-oControlPath=")
+            open(control_path, "w").close()
+            self.exit.wait(10)
+        elif "-O" in args:
+            self.exit.set()
+        elif "-b" in args:
+            with open(args[args.index("-b") + 1]) as fp:
+                self.batches.append(fp.read().splitlines())
+        return 0, b"output"
+
+
+def test_deploy_session(monkeypatch):
+    installer = pytest.importorskip("robotpy_installer.installer")
+    from pyfrc.deploy import session
+
+    ssh = _Ssh()
+    monkeypatch.setattr(installer, "ssh_exec_pass", ssh)
+    monkeypatch.setattr(installer, "is_windows", False)
+    monkeypatch.setattr(session.shutil, "which", lambda name: "/usr/bin/" + name)
+
+    controller = _Controller()
+
+    with session.DeploySession(controller) as s:
+        assert s._is_shared()
+        assert ssh.masters == 1
+        control_path = s.control_path
+
+        # commands use the shared connection
+        assert s.ssh("echo hi", get_output=True) == "output"
+        assert ssh.commands[-1] == [
+            "/usr/bin/ssh",
+            "-oControlMaster=no",
+            "-oControlPath=" + control_path,
+            "lvuser@roborio-1234-frc.local",
+            "echo hi",
+        ]
+
+        # other users connect on their own
+        s.username = "admin"
+        assert s.ssh("true") == "unshared"
+        assert controller.commands == [("admin", "true")]
+        s.username = "lvuser"
+
+        # the robot rebooted
+        ssh.exit.set()
+        s._master.join(5)
+        assert not s._is_shared()
+
+        assert s.ssh("true") == "output"
+        assert ssh.masters == 2
+        assert s._is_shared()
+        control_path = s.control_path
+
+    assert s._master is None
+    assert not os.path.exists(control_path)
+    assert ssh.commands[-1][1:3] == ["-O", "exit"]
+    assert len(controller.commands) == 1
+
+
+def test_deploy_session_timeout(monkeypatch):
+    installer = pytest.importorskip("robotpy_installer.installer")
+    from pyfrc.deploy import session
+
+    masters = []
+
+    def ssh_exec_pass(password, args, capture_output=False, suppress_known_hosts=False):
+        # the robot never lets the master log in, so it runs until killed
+        ssh_index = args.index("/usr/bin/ssh")
+        masters.append(subprocess.Popen(args[:ssh_index] + ["sleep", "30"]))
+        return masters[-1].wait(), b""
+
+    monkeypatch.setattr(installer, "ssh_exec_pass", ssh_exec_pass)
+    monkeypatch.setattr(installer, "is_windows", False)
+    monkeypatch.setattr(session.shutil, "which", lambda name: "/usr/bin/" + name)
+
+    controller = _Controller()
+    s = session.DeploySession(controller)
+    s.connect_timeout = 0
+    s.login_timeout = 0.5
+
+    start = time.monotonic()
+    with s:
+        assert time.monotonic() - start < 5
+        assert not s._is_shared()
+
+        # the master was killed, and each step connects on its own
+        assert masters[0].returncode == -signal.SIGTERM
+        assert s.ssh("true") == "unshared"
+
+    assert len(masters) == 1
+
+
+def test_sftp_files(monkeypatch, tmpdir):
+    installer = pytest.importorskip("robotpy_installer.installer")
+    from pyfrc.deploy import session
+
+    ssh = _Ssh()
+    monkeypatch.setattr(installer, "ssh_exec_pass", ssh)
+    monkeypatch.setattr(installer, "is_windows", False)
+    monkeypatch.setattr(session.shutil, "which", lambda name: "/usr/bin/" + name)
+
+    robot_path = tmpdir.mkdir("robot")
+    robot_path.join("robot.py").write("")
+    robot_path.mkdir("components").join("drive.py").write("")
+    files = ["robot.py", "components/drive.py"]
+    extra = {".deploy_manifest": "{}"}
+
+    controller = _Controller()
+    with session.DeploySession(controller) as s:
+        assert s.sftp_files(str(robot_path), files, "/home/lvuser/py_new", extra) == 0
+
+        # the files are uploaded from the source tree, without staging them
+        batch = ssh.batches[-1]
+        assert batch[:4] == [
+            'mkdir "/home/lvuser/py_new"',
+            'put "%s" "/home/lvuser/py_new/robot.py"' % robot_path.join("robot.py"),
+            '-mkdir "/home/lvuser/py_new/components"',
+            'put "%s" "/home/lvuser/py_new/components/drive.py"'
+            % robot_path.join("components", "drive.py"),
+        ]
+        assert batch[4].endswith(
+            '.deploy_manifest" "/home/lvuser/py_new/.deploy_manifest"'
+        )
+        assert not robot_path.join(".deploy_cache").check()
+
+        # without the shared connection, they are staged for the installer
+        s.username = "admin"
+        s.sftp_files(str(robot_path), files, "/home/lvuser/py_new", extra, mkdir=False)
+        assert controller.commands[-1] == (
+            "sftp",
+            "py_new",
+            "/home/lvuser",
+            False,
+            sorted(
+                [".deploy_manifest", "robot.py", os.path.join("components", "drive.py")]
+            ),
+        )
+        s.username = "lvuser"
+
+    assert len(ssh.batches) == 1
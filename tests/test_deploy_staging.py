@@ -0,0 +1,32 @@
+import os
+
+from pyfrc.deploy.staging import make_staging_dir, stage_files
+
+
+def test_stage_files(tmpdir):
+    tmpdir.join("robot.py").write("import wpilib\n")
+    tmpdir.mkdir("components").join("drive.py").write("pass\n")
+
+    parent = make_staging_dir(str(tmpdir))
+    assert os.path.dirname(parent) == str(tmpdir.join(".deploy_cache"))
+    assert tmpdir.join(".deploy_cache", ".gitignore").read().endswith("\n*\n")
+
+    staging_dir = os.path.join(parent, "py_new")
+    copied = stage_files(
+        staging_dir,
+        str(tmpdir),
+        ["robot.py", "components/drive.py"],
+        {".deploy_manifest": "{}", "__pycache__/robot.pyc": b"\0"},
+    )
+    assert copied == 0
+
+    # linked, not copied
+    assert os.path.samefile(
+        os.path.join(staging_dir, "components", "drive.py"),
+        str(tmpdir.join("components", "drive.py")),
+    )
+
+    with open(os.path.join(staging_dir, ".deploy_manifest")) as fp:
+        assert fp.read() == "{}"
+    with open(os.path.join(staging_dir, "__pycache__", "robot.pyc"), "rb") as fp:
+        assert fp.read() == b"\0"
@@ -77,6 +77,45 @@ def test_faketime_3():
     assert_float(sc.expected, 0.16)
 
 
+def test_faketime_fast_forward():
+    """Test that packets are skipped when nothing needs them"""
+
+    wpilib.DriverStation._reset()
+
+    ft = FakeTime()
+    ft.initialize()
+    ft.set_fast_forward()
+
+    packets = []
+    get_data = ft._ds._getData
+
+    def _getData():
+        packets.append(ft.get())
+        get_data()
+
+    ft._ds._getData = _getData
+
+    ft.increment_time_by(10.005)
+    assert_float(ft.get(), 10.005)
+    assert len(packets) == 1
+    assert_float(packets[0], 10.0)
+    assert ft.skipped_packets == 499
+
+    # next packet arrives at the right time
+    ft.increment_new_packet()
+    assert_float(ft.get(), 10.02)
+    assert len(packets) == 2
+
+    # when a controller is present, packets are not skipped
+    sc = StepChecker()
+    sc.expected = 10.04
+    ft.ds_cond._on_step = sc.on_step
+
+    ft.increment_time_by(1.01)
+    assert len(packets) == 52
+    assert ft.skipped_packets == 499
+
+
 class IncrementingThread(threading.Thread):
     def __init__(self, period, fake_time):
         super().__init__(daemon=True)
@@ -130,6 +169,80 @@ def test_faketime_threading():
     assert ft.children_stopped()
 
 
+class RecordingThread(IncrementingThread):
+    def __init__(self, period, fake_time):
+        super().__init__(period, fake_time)
+        self.times = []
+
+    def run(self):
+        period = self.period
+        wait_til = self._ft.get() + period
+
+        while not self.stopped:
+            now = self._ft.get()
+            self._ft.increment_time_by(wait_til - now)
+
+            if self.stopped:
+                break
+
+            self.times.append(self._ft.get())
+            wait_til += period
+
+
+def test_faketime_threading_wake_time():
+    """Test that threads are woken up at the time they requested"""
+
+    wpilib.DriverStation._reset()
+
+    ft = FakeTime()
+    ft.initialize()
+
+    threads = [RecordingThread(period, ft) for period in (0.003, 0.007, 0.011)]
+    for thread in threads:
+        thread.start()
+
+    for _ in range(3):
+        ft.increment_new_packet()
+
+    ft.increment_time_by(0.005)
+    assert_float(ft.get(), 0.065)
+
+    for thread in threads:
+        assert len(thread.times) == int(0.065 / thread.period)
+        for i, tm in enumerate(thread.times):
+            assert_float(tm, (i + 1) * thread.period)
+
+    ft.teardown()
+    for thread in threads:
+        thread.cancel()
+
+    assert ft.children_stopped()
+
+
+def test_faketime_fast_forward_threading():
+    """Test that threads are woken up correctly when packets are skipped"""
+
+    wpilib.DriverStation._reset()
+
+    ft = FakeTime()
+    ft.initialize()
+    ft.set_fast_forward()
+
+    incr_thread = IncrementingThread(0.1, ft)
+    incr_thread.start()
+
+    ft.increment_time_by(1.01)
+
+    # at least one packet is delivered before each wakeup
+    assert incr_thread.counter == 10
+    assert 30 <= ft.skipped_packets <= 40
+
+    ft.teardown()
+    incr_thread.cancel()
+
+    assert ft.children_stopped()
+
+
 class DyingThread(threading.Thread):
     """
         Tests a bug that occured when a child thread is woken and the
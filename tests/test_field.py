@@ -0,0 +1,108 @@
+import math
+
+import pytest
+
+pytest.importorskip("tkinter")
+
+from pyfrc.sim.field.field import _make_grid_ppm
+
+
+def test_grid_ppm():
+    cols, rows, cell_size = 3, 2, 4
+    data = _make_grid_ppm(cols, rows, cell_size)
+
+    header, pixels = data.split(b"\n", 1)
+    w, h = cols * cell_size + 1, rows * cell_size + 1
+    assert header == b"P6 %d %d 255" % (w, h)
+    assert len(pixels) == w * h * 3
+
+    def pixel(x, y):
+        i = (y * w + x) * 3
+        return pixels[i : i + 3]
+
+    line = b"\xcc\xcc\xcc"
+    white = b"\xff\xff\xff"
+
+    for x in range(w):
+        for y in range(h):
+            on_line = x % cell_size == 0 or y % cell_size == 0
+            assert pixel(x, y) == (line if on_line else white)
+
+
+def test_drawable_element_set_pose():
+    from pyfrc.sim.field.elements import DrawableElement
+
+    element = DrawableElement([(0, 0), (2, 0), (2, 1)], (1, 0), 0, "red")
+
+    # many small moves don't accumulate errors
+    for i in range(1000):
+        element.set_pose(i, 0, i * 0.1)
+
+    element.set_pose(5, 5, math.pi / 2)
+    assert element.center == (5, 5)
+    for (x, y), (ex, ey) in zip(element.pts, [(5, 4), (5, 6), (4, 6)]):
+        assert x == pytest.approx(ex)
+        assert y == pytest.approx(ey)
+
+
+class _Controller:
+    def __init__(self):
+        self.position = (1, 2, 0)
+
+    def is_alive(self):
+        return True
+
+    def get_position(self):
+        return self.position
+
+
+def test_robot_element_pose():
+    from pyfrc.sim.field.robot_element import RobotElement
+
+    config_obj = {
+        "pyfrc": {
+            "field": {"px_per_ft": 10},
+            "robot": {
+                "w": 2,
+                "l": 3,
+                "starting_x": 1,
+                "starting_y": 2,
+                "starting_angle": 0,
+            },
+        }
+    }
+
+    controller = _Controller()
+    robot = RobotElement(controller, config_obj)
+    assert robot.center == (10, 20)
+
+    assert not robot.move_robot()
+
+    controller.position = (3, 2, math.pi)
+    assert robot.move_robot()
+    assert robot.center == (30, 20)
+    assert robot.angle == math.pi
+    assert robot.front_center[0] == pytest.approx(20)
+
+
+def test_grid_ppm_float():
+    cols, rows, cell_size = 3, 2, 2.5
+    data = _make_grid_ppm(cols, rows, cell_size)
+
+    header, pixels = data.split(b"\n", 1)
+    # lines at 0, 2, 5, 7 horizontally and 0, 2, 5 vertically
+    w, h = 8, 6
+    assert header == b"P6 %d %d 255" % (w, h)
+    assert len(pixels) == w * h * 3
+
+    def pixel(x, y):
+        i = (y * w + x) * 3
+        return pixels[i : i + 3]
+
+    line = b"\xcc\xcc\xcc"
+    white = b"\xff\xff\xff"
+
+    for x in range(w):
+        for y in range(h):
+            on_line = x in (0, 2, 5, 7) or y in (0, 2, 5)
+            assert pixel(x, y) == (line if on_line else white)
@@ -0,0 +1,103 @@
+import os
+
+import pytest
+import wpilib
+
+from pyfrc.test_support.pytest_plugin import PyFrcPlugin
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork")
+
+
+class ForkedRobot(wpilib.TimedRobot):
+
+    # each call to robotInit is recorded in this file
+    init_log = None
+
+    def robotInit(self):
+        self.did_robot_init = True
+        self.configured_before_init = getattr(self, "configured", False)
+        with open(self.init_log, "a") as fp:
+            fp.write("robotInit\n")
+
+
+_conftest = """
+def pytest_pyfrc_before_robotinit(robot):
+    robot.configured = True
+"""
+
+
+_tests = """
+import os
+import wpilib
+
+
+def test_pass(control, robot):
+    # robotInit already ran in the robot that the test was forked from,
+    # after the conftest hook set it up
+    assert robot.did_robot_init
+    assert robot.configured_before_init
+    robot.value = 1
+
+    control.set_operator_control(enabled=True)
+    control.run_test(lambda tm: tm < 1)
+
+    assert wpilib.Watchdog._thread.is_alive()
+
+
+def test_run_again(control, robot):
+    control.set_autonomous(enabled=True)
+    control.run_test(lambda tm: tm < 1)
+
+
+def test_isolated(robot):
+    # changes made by other tests don't leak into this one
+    assert not hasattr(robot, "value")
+
+
+def test_fail():
+    assert False
+
+
+def test_crash():
+    os._exit(3)
+"""
+
+
+class _Recorder:
+    def __init__(self):
+        self.outcomes = {}
+
+    def pytest_runtest_logreport(self, report):
+        if report.when == "call" or report.outcome != "passed":
+            self.outcomes[report.nodeid.split("::")[-1]] = (
+                report.outcome,
+                str(report.longrepr),
+            )
+
+
+def test_fork(tmpdir):
+    tests = tmpdir.join("test_forked.py")
+    tests.write(_tests)
+    tmpdir.join("conftest.py").write(_conftest)
+    ForkedRobot.init_log = str(tmpdir.join("init.log"))
+
+    plugin = PyFrcPlugin(ForkedRobot, None, None, fork=True)
+    recorder = _Recorder()
+
+    retv = pytest.main(
+        [str(tests), "-q", "-p", "no:cacheprovider"], plugins=[plugin, recorder]
+    )
+    assert retv == 1
+
+    outcomes = recorder.outcomes
+    assert outcomes["test_pass"][0] == "passed"
+    assert outcomes["test_run_again"][0] == "passed"
+    assert outcomes["test_isolated"][0] == "passed"
+    assert outcomes["test_fail"][0] == "failed"
+    assert outcomes["test_crash"] == (
+        "failed",
+        "test process crashed (exit status %s)" % (3 << 8),
+    )
+
+    # robotInit only ran once, in the template
+    assert tmpdir.join("init.log").read() == "robotInit\n"
@@ -0,0 +1,80 @@
+from hal_impl.data import NotifyDict
+
+from pyfrc.test_support.hal_snapshot import HalSnapshot
+
+
+def _make_data():
+    solenoid = [NotifyDict({"initialized": False, "value": None}) for _ in range(2)]
+    data = {
+        "time": {"program_start": 0},
+        "pwm": [{"initialized": False, "value": 0} for _ in range(3)],
+        "solenoid": solenoid,
+        "pcm": NotifyDict({0: solenoid}),
+    }
+    in_data = {"joysticks": [{"axes": [0, 0, 0]}]}
+    return data, in_data
+
+
+def test_hal_snapshot_restore():
+    data, in_data = _make_data()
+    pwm0 = data["pwm"][0]
+
+    snapshot = HalSnapshot(data, in_data)
+    assert snapshot.restore() == 0
+
+    data["pwm"][0]["value"] = 0.5
+    data["pwm"][1]["initialized"] = True
+    data["custom"] = {"Motion": 1.0}
+    data["pcm"][1] = []
+    in_data["joysticks"][0]["axes"][2] = 1
+    del data["time"]["program_start"]
+
+    assert snapshot.restore() == 6
+    assert data == _make_data()[0]
+    assert in_data == _make_data()[1]
+
+    # references to existing parts of the data are still valid
+    assert data["pwm"][0] is pwm0
+    assert data["pcm"][0] is data["solenoid"]
+
+
+def test_hal_snapshot_notify():
+    data, in_data = _make_data()
+    snapshot = HalSnapshot(data, in_data)
+
+    changes = []
+    data["solenoid"][1].register("value", lambda k, v: changes.append(v))
+
+    data["solenoid"][1]["value"] = True
+    assert changes == [True]
+
+    # restoring a value calls the callback, but unchanged values don't
+    snapshot.restore()
+    assert changes == [True, None]
+    assert data["solenoid"][1]["value"] is None
+
+
+def test_hal_snapshot_type_change():
+    data, in_data = _make_data()
+    snapshot = HalSnapshot(data, in_data)
+
+    data["pwm"][2]["value"] = False
+    data["time"] = []
+
+    assert snapshot.restore() == 2
+    assert data == _make_data()[0]
+
+
+def test_hal_snapshot_callbacks():
+    data, in_data = _make_data()
+    snapshot = HalSnapshot(data, in_data)
+
+    changes = []
+    data["solenoid"][1].register("value", lambda k, v: changes.append(v))
+    data["solenoid"][1]["value"] = True
+
+    # the callback is removed before the value is restored
+    snapshot.restore(callbacks=True)
+    assert changes == [True]
+    assert data["solenoid"][1].cbs == {}
+    assert data["solenoid"][1]["value"] is None
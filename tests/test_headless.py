@@ -0,0 +1,190 @@
+import io
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import hal_impl.functions
+
+from pyfrc.sim.headless import HeadlessSim, configure_starting_position, parse_script
+from pyfrc.sim.sim_manager import SimManager
+from pyfrc.sim.sim_time import FakeRealTime
+
+
+def test_parse_script():
+    script = parse_script(
+        io.StringIO(
+            """
+            # comment
+            2.5 teleop
+            0   gamedata LRL  # trailing comment
+            0   autonomous
+            """
+        )
+    )
+
+    assert script == [
+        (0.0, "gamedata", "LRL"),
+        (0.0, "autonomous", None),
+        (2.5, "teleop", None),
+    ]
+
+    with pytest.raises(ValueError):
+        parse_script(io.StringIO("soon teleop"))
+
+    with pytest.raises(ValueError):
+        parse_script(io.StringIO("1 dance"))
+
+
+def test_configure_starting_position():
+    config_obj = {
+        "pyfrc": {
+            "robot": {
+                "start_positions": [
+                    {"name": "Left", "x": 1, "y": 2, "angle": 3},
+                    {"name": "Right", "x": 4, "y": 5, "angle": 6},
+                ]
+            }
+        }
+    }
+
+    configure_starting_position(config_obj)
+    assert config_obj["pyfrc"]["robot"]["starting_x"] == 1
+
+    configure_starting_position(config_obj, "Right")
+    assert config_obj["pyfrc"]["robot"]["starting_y"] == 5
+
+    with pytest.raises(ValueError):
+        configure_starting_position(config_obj, "Middle")
+
+
+def test_headless_script():
+    hal_impl.functions.reset_hal()
+
+    manager = SimManager()
+    fake_time = FakeRealTime()
+    telemetry = io.StringIO()
+
+    script = [(0, "gamedata", "RLR"), (0, "test", None), (0.05, "stop", None)]
+    sim = HeadlessSim(
+        manager, fake_time, script=script, telemetry=telemetry, telemetry_period=0
+    )
+    assert sim.run()
+
+    assert manager.get_mode() == SimManager.MODE_TEST
+    assert manager.game_specific_message == "RLR"
+
+    records = [json.loads(line) for line in telemetry.getvalue().splitlines()]
+    assert records
+    assert records[-1]["mode"] == "Test"
+    assert "pwm" in records[-1]["hal"]
+
+    with pytest.raises(ValueError):
+        sim.execute("dance")
+
+
+def test_remote_robot(tmpdir, monkeypatch):
+    import pyfrc
+    from pyfrc.sim.remote_robot import RemoteRobotController
+
+    # the process runs in the robot's directory
+    lib_path = os.path.dirname(os.path.dirname(os.path.abspath(pyfrc.__file__)))
+    monkeypatch.setenv("PYTHONPATH", lib_path)
+
+    robot_file = tmpdir.join("robot.py")
+    robot_file.write(
+        "import wpilib\n"
+        "class Robot(wpilib.TimedRobot):\n"
+        "    def robotInit(self):\n"
+        "        pass\n"
+        "if __name__ == '__main__':\n"
+        "    wpilib.run(Robot)\n"
+    )
+
+    remote = RemoteRobotController(str(robot_file))
+    try:
+        remote.run()
+        remote.wait_for_robotinit()
+
+        # the process chose its own port, and reported it
+        assert remote.port
+        assert remote.is_alive()
+
+        remote.set_mode(SimManager.MODE_AUTONOMOUS)
+        assert remote.get_mode() == SimManager.MODE_AUTONOMOUS
+    finally:
+        assert remote.stop()
+
+    assert remote.process.returncode == 0
+
+
+def test_lockstep_reproducible(tmpdir):
+    import pyfrc
+
+    robot_path = tmpdir.join("robot.py")
+    robot_path.write(
+        "import wpilib\n"
+        "class Robot(wpilib.TimedRobot):\n"
+        "    def robotInit(self):\n"
+        "        self.l = wpilib.Talon(1)\n"
+        "        self.r = wpilib.Talon(2)\n"
+        "        self.timer = wpilib.Timer()\n"
+        "    def autonomousInit(self):\n"
+        "        self.timer.reset()\n"
+        "        self.timer.start()\n"
+        "    def autonomousPeriodic(self):\n"
+        "        self.l.set(0.5 + 0.2 * self.timer.get())\n"
+        "        self.r.set(-0.4)\n"
+        "    def teleopPeriodic(self):\n"
+        "        self.l.set(0.3)\n"
+        "        self.r.set(-0.6)\n"
+        "if __name__ == '__main__':\n"
+        "    wpilib.run(Robot)\n"
+    )
+    tmpdir.join("physics.py").write(
+        "from pyfrc.physics import drivetrains\n"
+        "class PhysicsEngine:\n"
+        "    def __init__(self, pc):\n"
+        "        self.pc = pc\n"
+        "        self.drivetrain = drivetrains.TwoMotorDrivetrain(\n"
+        "            deadzone=drivetrains.linear_deadzone(0.2)\n"
+        "        )\n"
+        "    def update_sim(self, hal_data, now, tm_diff):\n"
+        "        l = hal_data['pwm'][1]['value']\n"
+        "        r = hal_data['pwm'][2]['value']\n"
+        "        speed, rotation = self.drivetrain.get_vector(l, r)\n"
+        "        self.pc.drive(speed, rotation, tm_diff)\n"
+    )
+    tmpdir.join("script.txt").write("0 autonomous\n1 teleop\n2 stop\n")
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.path.dirname(
+        os.path.dirname(os.path.abspath(pyfrc.__file__))
+    )
+
+    results = []
+    for i in range(2):
+        telemetry = tmpdir.join("telemetry%d.jsonl" % i)
+        subprocess.check_call(
+            [
+                sys.executable,
+                str(robot_path),
+                "sim",
+                "--headless",
+                "--lockstep",
+                "--speed",
+                "max",
+                "--script",
+                "script.txt",
+                "--telemetry",
+                str(telemetry),
+            ],
+            cwd=str(tmpdir),
+            env=env,
+        )
+        results.append(telemetry.read())
+
+    assert results[0]
+    assert results[0] == results[1]
@@ -0,0 +1,23 @@
+import pytest
+
+from pyfrc.physics.histogram import TimingHistogram
+
+
+def test_percentiles():
+    histogram = TimingHistogram()
+    assert histogram.percentile(50) is None
+
+    for i in range(1, 1001):
+        histogram.add(i * 1e-6)
+    histogram.add(0)
+
+    assert histogram.count == 1001
+    assert histogram.max == 1e-3
+
+    # within a bucket of the exact value
+    assert 500e-6 <= histogram.percentile(50) <= 500e-6 * 1.125
+    assert 990e-6 <= histogram.percentile(99) <= 1e-3
+    assert histogram.percentile(100) == 1e-3
+    assert histogram.percentile(0) == 0.0
+
+    assert "p99" in histogram.summary()
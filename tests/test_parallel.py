@@ -0,0 +1,75 @@
+import sys
+import time
+
+import pytest
+
+from pyfrc.mains.cli_test import PyFrcTest, _merge_retvals, _ShardPlugin
+
+
+class _Recorder:
+    def __init__(self):
+        self.nodeids = []
+
+    def pytest_collection_finish(self, session):
+        self.nodeids = [item.name for item in session.items]
+
+
+def test_shards(tmpdir):
+    tests = tmpdir.join("test_many.py")
+    tests.write(
+        "import pytest\n"
+        "@pytest.mark.parametrize('i', range(10))\n"
+        "def test_it(i):\n"
+        "    pass\n"
+    )
+
+    selected = []
+    for i in range(3):
+        recorder = _Recorder()
+        retv = pytest.main(
+            [str(tests), "-q", "-p", "no:cacheprovider", "--collect-only"],
+            plugins=[_ShardPlugin("%d/3" % i), recorder],
+        )
+        assert retv == 0
+        selected.append(recorder.nodeids)
+
+    # each test is in exactly one shard
+    assert sorted(sum(selected, [])) == sorted("test_it[%d]" % i for i in range(10))
+    assert [len(s) for s in selected] == [4, 3, 3]
+
+
+def test_merge_retvals():
+    assert _merge_retvals([0, 0]) == 0
+    # a shard with no tests is fine
+    assert _merge_retvals([0, 5]) == 0
+    assert _merge_retvals([5, 5]) == 5
+    assert _merge_retvals([1, 5]) == 1
+    # stopped jobs don't hide the failure
+    assert _merge_retvals([-15, 1, 0]) == 1
+    # a job that crashed fails the run with a valid exit code
+    assert _merge_retvals([-11, 0, 5]) == 1
+    assert _merge_retvals([-11, 2]) == 2
+
+
+def test_run_parallel(tmpdir, capsys):
+    # stands in for robot.py: the first shard fails, the second would hang
+    robot = tmpdir.join("robot.py")
+    robot.write(
+        "import sys, time\n"
+        "shard = sys.argv[sys.argv.index('--shard') + 1]\n"
+        "print('running', shard, flush=True)\n"
+        "if shard.startswith('0/'):\n"
+        "    time.sleep(1)\n"
+        "    sys.exit(1)\n"
+        "time.sleep(60)\n"
+    )
+
+    start = time.monotonic()
+    retv = PyFrcTest()._run_parallel(2, [], str(robot), False, str(tmpdir))
+    assert time.monotonic() - start < 30
+    assert retv == 1
+
+    out = capsys.readouterr().out
+    assert "[job 1] running 0/2" in out
+    assert "[job 2] running 1/2" in out
+    assert "Job 1 failed" in out
@@ -0,0 +1,112 @@
+import time
+
+import pytest
+
+import hal_impl.functions
+
+from pyfrc.physics.core import PhysicsInitException, PhysicsInterface
+
+
+class Engine:
+    def __init__(self):
+        self.calls = []
+
+    def update_sim(self, hal_data, now, tm_diff):
+        self.calls.append((now, tm_diff))
+
+
+def _physics(tmpdir, **physics_config):
+    hal_impl.functions.reset_hal()
+
+    config_obj = {
+        "pyfrc": {
+            "robot": {
+                "w": 2,
+                "l": 2,
+                "starting_x": 0,
+                "starting_y": 0,
+                "starting_angle": 0,
+            },
+            "field": {},
+            "physics": physics_config,
+        }
+    }
+
+    physics = PhysicsInterface(str(tmpdir), None, config_obj)
+    physics.engine = Engine()
+    return physics
+
+
+def test_fixed_rate(tmpdir):
+    physics = _physics(tmpdir, rate=200)
+
+    # irregular robot loops
+    for now in (0, 0.003, 0.020, 0.021, 0.047):
+        physics._on_increment_time(now)
+
+    calls = physics.engine.calls
+    assert len(calls) == 9
+    assert [tm for tm, _ in calls] == pytest.approx([0.005 * i for i in range(1, 10)])
+    assert all(tm_diff == pytest.approx(0.005) for _, tm_diff in calls)
+
+
+def test_fixed_rate_batch(tmpdir):
+    physics = _physics(tmpdir, rate=1000, batch=True)
+
+    for now in (0, 0.020, 0.040, 0.0405):
+        physics._on_increment_time(now)
+
+    assert physics.engine.calls == [
+        (pytest.approx(0.020), pytest.approx(0.020)),
+        (pytest.approx(0.040), pytest.approx(0.020)),
+    ]
+
+
+def test_invalid_rate(tmpdir):
+    with pytest.raises(PhysicsInitException):
+        _physics(tmpdir, rate=0)
+
+
+def test_update_timing(tmpdir):
+    physics = _physics(tmpdir, rate=1000, cost_warning=0.5)
+
+    physics._on_increment_time(0)
+    physics._on_increment_time(0.002)
+    assert physics.update_timing.count == 2
+    assert physics.slow_updates == 0
+
+    # takes longer than the 1ms it simulates
+    physics.engine.update_sim = lambda hal_data, now, tm_diff: time.sleep(0.002)
+    physics._on_increment_time(0.004)
+    assert physics.update_timing.count == 4
+    assert physics.update_timing.max >= 0.002
+    assert physics.slow_updates == 2
+
+
+def test_max_catchup(tmpdir):
+    physics = _physics(tmpdir, rate=100, max_catchup=0.05)
+
+    physics._on_increment_time(0)
+    physics._on_increment_time(0.02)
+    assert len(physics.engine.calls) == 2
+
+    # the robot stalled for a second: only the last 5 steps are run
+    physics._on_increment_time(1.02)
+    calls = physics.engine.calls[2:]
+    assert [tm for tm, _ in calls] == pytest.approx([0.98, 0.99, 1.0, 1.01, 1.02])
+    assert all(tm_diff == pytest.approx(0.01) for _, tm_diff in calls)
+    assert physics.dropped_steps == 95
+
+    # and it continues from there
+    physics._on_increment_time(1.03)
+    assert physics.engine.calls[-1][0] == pytest.approx(1.03)
+    assert len(physics.engine.calls) == 8
+
+
+def test_max_catchup_batch(tmpdir):
+    physics = _physics(tmpdir, rate=1000, batch=True, max_catchup=None)
+
+    physics._on_increment_time(0)
+    physics._on_increment_time(2)
+    assert physics.engine.calls == [(pytest.approx(2), pytest.approx(2))]
+    assert physics.dropped_steps == 0
@@ -0,0 +1,85 @@
+import math
+
+import pytest
+
+from pyfrc.physics import drivetrains, motion, motor_cfgs, rollout, tankmodel
+from pyfrc.physics.units import units
+
+
+def _make_tank():
+    return tankmodel.TankModel.theory(
+        motor_cfgs.MOTOR_CFG_CIM,
+        robot_mass=90 * units.lbs,
+        gearing=10.71,
+        nmotors=2,
+        x_wheelbase=2.0 * units.feet,
+    )
+
+
+def test_rollout_two_motor_straight():
+    dt = drivetrains.TwoMotorDrivetrain(speed=5)
+
+    trajectory = rollout.rollout(dt, [(-1, 1)] * 50, tm_diff=0.02, x=1, y=2)
+
+    assert len(trajectory.time) == 51
+    assert trajectory.x[0] == 1
+    assert math.isclose(trajectory.time[-1], 1.0)
+    assert math.isclose(trajectory.x[-1], 6.0)
+    assert math.isclose(trajectory.y[-1], 2.0)
+    assert trajectory.angle[-1] == 0
+
+
+def test_rollout_tankmodel_generator():
+    tank1 = _make_tank()
+    tank2 = _make_tank()
+
+    def commands():
+        for i in range(100):
+            yield -1.0, 0.8 if i > 50 else 1.0
+
+    trajectory = rollout.rollout(tank1, commands())
+
+    # should be equivalent to driving the model by hand
+    x = y = angle = 0
+    for l_motor, r_motor in commands():
+        dx, dy, dangle = tank2.get_distance(l_motor, r_motor, 0.02)
+        angle += dangle
+        x += dx * math.cos(angle) - dy * math.sin(angle)
+        y += dx * math.sin(angle) + dy * math.cos(angle)
+
+    assert math.isclose(trajectory.x[-1], x)
+    assert math.isclose(trajectory.y[-1], y)
+    assert math.isclose(trajectory.angle[-1], angle)
+    assert trajectory.angle[-1] > 0
+
+
+def test_rollout_batch():
+    np = pytest.importorskip("numpy")
+
+    batch = tankmodel.BatchTankModel([_make_tank(), _make_tank()])
+    tank = _make_tank()
+
+    commands = np.array([[-1.0, 0.9]] * 100)
+    trajectory = rollout.rollout(batch, commands)
+    expected = rollout.rollout(tank, commands)
+
+    assert trajectory.x.shape == (101, 2)
+    for i in range(2):
+        assert np.allclose(trajectory.x[:, i], expected.x)
+        assert np.allclose(trajectory.y[:, i], expected.y)
+        assert np.allclose(trajectory.angle[:, i], expected.angle)
+
+
+def test_rollout_invalid_model():
+    with pytest.raises(TypeError):
+        rollout.rollout(object(), [])
+
+
+def test_rollout_motion():
+    m = motion.LinearMotion("Rollout", 2, 360, 6)
+
+    positions = rollout.rollout_motion(m, [1] * 200, tm_diff=0.02)
+
+    assert positions[0] == 0
+    assert math.isclose(positions[50], 2)
+    assert positions[-1] == 6
@@ -0,0 +1,53 @@
+from pyfrc.sim.sim_manager import SimManager
+
+
+class _Robot:
+    def __init__(self):
+        self.mode = SimManager.MODE_DISABLED
+        self.mode_callback = None
+        self.alive = True
+
+    def on_mode_change(self, callable):
+        self.mode_callback = callable
+
+    def set_mode(self, mode, game_specific_message=None):
+        self.mode = mode
+        self.game_specific_message = game_specific_message
+        self.mode_callback(mode)
+
+    def get_mode(self):
+        return self.mode
+
+    def is_alive(self):
+        return self.alive
+
+
+def test_multiple_robots():
+    manager = SimManager()
+    robots = [_Robot() for _ in range(3)]
+    for robot in robots:
+        manager.add_robot(robot)
+
+    modes = []
+    manager.on_mode_change(modes.append)
+
+    manager.game_specific_message = "LRL"
+    manager.set_mode(SimManager.MODE_AUTONOMOUS)
+
+    for robot in robots:
+        assert robot.mode == SimManager.MODE_AUTONOMOUS
+        assert robot.game_specific_message == "LRL"
+    assert modes[-1] == SimManager.MODE_AUTONOMOUS
+
+    # one robot changing mode doesn't change the mode of the others
+    del modes[:]
+    robots[0].set_mode(SimManager.MODE_DISABLED)
+    assert manager.get_mode() == SimManager.MODE_AUTONOMOUS
+    assert modes == []
+
+    # a robot dying doesn't change the mode either, but the UI is notified
+    robots[1].alive = False
+    robots[1].set_mode(SimManager.MODE_DISABLED)
+    assert manager.get_mode() == SimManager.MODE_AUTONOMOUS
+    assert modes == [SimManager.MODE_AUTONOMOUS]
+    assert not manager.is_alive()
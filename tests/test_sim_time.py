@@ -0,0 +1,67 @@
+import time
+
+import pytest
+
+from pyfrc.sim.sim_time import FakeRealTime
+
+
+def test_time_scale_max():
+    fake_time = FakeRealTime()
+    fake_time.set_time_scale(None)
+
+    start = time.time()
+    for _ in range(500):
+        fake_time.increment_time_by(0.020)
+
+    # 10 seconds of delays, no real sleeping
+    assert fake_time.get() == pytest.approx(10.0, abs=0.01)
+    assert time.time() - start < 1.0
+
+    # nothing else is moving time forward
+    assert fake_time.sleep_until(11.0) == pytest.approx(11.0)
+
+
+def test_time_scale():
+    fake_time = FakeRealTime()
+    fake_time.set_time_scale(20)
+
+    start = time.time()
+    fake_time.increment_time_by(0.5)
+    elapsed = time.time() - start
+
+    assert elapsed < 0.25
+    assert fake_time.get() >= 0.5
+
+    with pytest.raises(ValueError):
+        fake_time.set_time_scale(0)
+
+
+def test_lockstep():
+    fake_time = FakeRealTime()
+    fake_time.set_time_scale(None)
+    fake_time.set_lockstep()
+
+    calls = []
+
+    def record(name):
+        calls.append((name, round(fake_time.get(), 6)))
+
+    fake_time.set_robot_thread(lambda: record("ds"))
+    fake_time.call_at(0.040, lambda: record("event"))
+
+    for _ in range(3):
+        fake_time.increment_time_by(0.015)
+
+    # time doesn't pass unless the robot waits
+    assert fake_time.get() == pytest.approx(0.045)
+
+    # each one runs at its own time instead of at the end of the wait, and
+    # events at the same time as a DS packet go first
+    assert calls == [("ds", 0.02), ("event", 0.04), ("ds", 0.04)]
+
+    # waiting for DS data moves time to the next packet
+    with fake_time.ds_cond:
+        assert fake_time.ds_cond.wait()
+
+    assert fake_time.get() == pytest.approx(0.060)
+    assert calls[-1] == ("ds", 0.06)
@@ -1,4 +1,4 @@
-# import pytest
+import pytest
 from pyfrc.physics import tankmodel, motor_cfgs
 from pyfrc.physics.units import units
 import math
@@ -48,3 +48,142 @@ def test_tankdrive_get_distance():
         result[0], result[1], rel_tol=0.01
     ), "For 90deg turn, x and y should be the same"
     return
+
+
+def _make_tank(integrator):
+    return tankmodel.TankModel.theory(
+        motor_cfgs.MOTOR_CFG_CIM,
+        robot_mass=90 * units.lbs,
+        gearing=10.71,
+        nmotors=2,
+        x_wheelbase=2.0 * units.feet,
+        wheel_diameter=6 * units.inch,
+        integrator=integrator,
+    )
+
+
+def test_tankdrive_invalid_integrator():
+    with pytest.raises(ValueError):
+        _make_tank("euler")
+
+
+def _drive(pose, result):
+    # same as PhysicsInterface.distance_drive
+    x, y, angle = pose
+    angle += result[2]
+    c = math.cos(angle)
+    s = math.sin(angle)
+    return x + result[0] * c - result[1] * s, y + result[0] * s + result[1] * c, angle
+
+
+def test_tankdrive_exact_matches_heun():
+    """The exact integrator should closely track the Heun integrator"""
+
+    heun = _make_tank("heun")
+    exact = _make_tank("exact")
+
+    h = (0, 0, 0)
+    e = (0, 0, 0)
+
+    commands = [(-1.0, 1.0), (-1.0, 0.5), (0.3, 0.3), (0.0, 0.0), (0.6, -0.8)]
+
+    for l_motor, r_motor in commands:
+        for _ in range(50):
+            h = _drive(h, heun.get_distance(l_motor, r_motor, 0.02))
+            e = _drive(e, exact.get_distance(l_motor, r_motor, 0.02))
+
+        assert math.isclose(h[0], e[0], abs_tol=0.1)
+        assert math.isclose(h[1], e[1], abs_tol=0.1)
+        assert math.isclose(h[2], e[2], abs_tol=0.01)
+
+        assert math.isclose(heun.l_velocity, exact.l_velocity, abs_tol=1e-2)
+        assert math.isclose(heun.r_velocity, exact.r_velocity, abs_tol=1e-2)
+        assert math.isclose(heun.l_position, exact.l_position, rel_tol=0.01)
+        assert math.isclose(heun.r_position, exact.r_position, rel_tol=0.01)
+
+
+def test_tankdrive_exact_single_step():
+    """A single large step should be equivalent to many small steps"""
+
+    small = _make_tank("exact")
+    large = _make_tank("exact")
+
+    angle = 0
+    for _ in range(100):
+        angle += small.get_distance(-1.0, 0.9, 0.01)[2]
+
+    result = large.get_distance(-1.0, 0.9, 1.0)
+
+    assert math.isclose(result[2], angle, rel_tol=1e-9)
+    assert math.isclose(small.l_position, large.l_position, rel_tol=1e-9)
+    assert math.isclose(small.r_position, large.r_position, rel_tol=1e-9)
+    assert math.isclose(small.l_velocity, large.l_velocity, rel_tol=1e-9)
+
+
+def test_batch_tankmodel_matches_scalar():
+    """Each drivetrain in a batch should behave exactly like a TankModel"""
+
+    np = pytest.importorskip("numpy")
+
+    masses = [90 * units.lbs, 110 * units.lbs, 130 * units.lbs]
+    gearing = [10.71, 8.45, 12.75]
+
+    batch = tankmodel.BatchTankModel.theory(
+        motor_cfgs.MOTOR_CFG_CIM,
+        robot_mass=masses,
+        gearing=gearing,
+        nmotors=2,
+        x_wheelbase=2.0 * units.feet,
+    )
+    assert len(batch) == 3
+
+    tanks = [
+        tankmodel.TankModel.theory(
+            motor_cfgs.MOTOR_CFG_CIM,
+            robot_mass=m,
+            gearing=g,
+            nmotors=2,
+            x_wheelbase=2.0 * units.feet,
+        )
+        for m, g in zip(masses, gearing)
+    ]
+
+    l_motors = np.array([-1.0, -0.5, 0.25])
+    r_motors = np.array([0.9, 0.5, 0.75])
+
+    for tm_diff in [0.02, 0.013, 0.02, 0.5]:
+        x, y, angle = batch.get_distance(l_motors, r_motors, tm_diff)
+
+        for i, tank in enumerate(tanks):
+            result = tank.get_distance(l_motors[i], r_motors[i], tm_diff)
+            assert math.isclose(x[i], result[0], rel_tol=1e-9, abs_tol=1e-12)
+            assert math.isclose(y[i], result[1], rel_tol=1e-9, abs_tol=1e-12)
+            assert math.isclose(angle[i], result[2], rel_tol=1e-9, abs_tol=1e-12)
+
+            assert math.isclose(batch.l_position[i], tank.l_position, rel_tol=1e-9)
+            assert math.isclose(batch.r_position[i], tank.r_position, rel_tol=1e-9)
+            assert math.isclose(batch.l_velocity[i], tank.l_velocity, rel_tol=1e-9)
+            assert math.isclose(batch.r_velocity[i], tank.r_velocity, rel_tol=1e-9)
+
+
+def test_batch_tankmodel_mismatched_lengths():
+    pytest.importorskip("numpy")
+
+    with pytest.raises(ValueError):
+        tankmodel.BatchTankModel.theory(
+            motor_cfgs.MOTOR_CFG_CIM,
+            robot_mass=[90 * units.lbs, 110 * units.lbs],
+            gearing=[10.71, 8.45, 12.75],
+        )
+
+
+def test_batch_tankmodel_exact_integrator():
+    pytest.importorskip("numpy")
+
+    with pytest.raises(ValueError):
+        tankmodel.BatchTankModel.theory(
+            motor_cfgs.MOTOR_CFG_CIM,
+            robot_mass=[90 * units.lbs, 110 * units.lbs],
+            gearing=10.71,
+            integrator="exact",
+        )
@@ -1,6 +1,8 @@
 import contextlib
 
 import hal
+import hal_impl.data
+import hal_impl.functions
 import wpilib
 
 import pytest
@@ -14,11 +16,12 @@ from pyfrc.tests.basic import test_practice as _test_practice
 
 
 @contextlib.contextmanager
-def get_plugin(cls):
+def get_plugin(cls, plugin=None):
 
     wpilib.DriverStation._reset()
 
-    plugin = PyFrcPlugin(cls, None, None)
+    if plugin is None:
+        plugin = PyFrcPlugin(cls, None, None)
     plugin.pytest_runtest_setup()
 
     try:
@@ -165,3 +168,39 @@ def test_sample():
         assert robot.did_robot_disabled == True
         assert robot.did_autonomous == True
         assert robot.did_operator == True
+
+
+def test_hal_data_restored():
+    """Ensure that hal_data is restored between tests"""
+    plugin = PyFrcPlugin(Iterative, None, None)
+    calls = []
+
+    # the first test takes the snapshot
+    with get_plugin(Iterative, plugin) as (plugin, control):
+        snapshot = plugin._hal_snapshot
+        pwm = hal_impl.data.hal_data["pwm"][0]
+
+        hal_impl.data.hal_data["custom"] = {"Value": 1}
+        pwm["value"] = 1
+        pwm.register("value", lambda k, v: calls.append(v))
+
+        control.set_operator_control(enabled=True)
+        control.run_test(lambda tm: tm < 1)
+        assert hal_impl.functions.hooks.ds_packets > 0
+
+    # the second test restores it
+    with get_plugin(Iterative, plugin) as (plugin, control):
+        assert plugin._hal_snapshot is snapshot
+
+        # the same objects, with the values and callbacks from the snapshot
+        assert hal_impl.data.hal_data["pwm"][0] is pwm
+        assert "custom" not in hal_impl.data.hal_data
+        assert pwm["value"] == 0
+        assert "value" not in pwm.cbs
+
+        # the hooks were reset and the HAL initialized again
+        assert hal_impl.data.hooks is hal_impl.functions.hooks
+        assert hal_impl.functions.hooks.ds_packets == 0
+
+        pwm["value"] = 1
+        assert calls == []
@@ -0,0 +1,60 @@
+import pytest
+
+tk = pytest.importorskip("tkinter")
+
+from pyfrc.sim.ui_widgets import CachedIntVar, set_label_text, tk_ops
+
+
+class Label(dict):
+    pass
+
+
+def test_set_label_text():
+    label = Label()
+    tk_ops.reset()
+
+    set_label_text(label, "1.000")
+    set_label_text(label, "1.000")
+    assert label["text"] == "1.000"
+    assert tk_ops.reset() == 1
+
+    set_label_text(label, "2.000")
+    assert label["text"] == "2.000"
+    assert tk_ops.reset() == 1
+
+
+def test_cached_int_var():
+    interp = tk.Tcl()
+    var = CachedIntVar(interp)
+    assert var.get() == 0
+
+    # writes made by Tk are seen
+    interp.setvar(str(var), 1)
+    assert var.get() == 1
+
+    var.set(0)
+    assert var.get() == 0
+
+
+def test_refresh_rate_budget():
+    from pyfrc.sim.ui import _RefreshRate
+
+    panels = _RefreshRate(0.1)
+    field = _RefreshRate(0.05)
+
+    # cheap refreshes run at the configured rate
+    panels.record(0, 0.001)
+    field.record(0, 0.001)
+    _RefreshRate.adjust((panels, field), 0.1)
+    assert panels.period == 0.1
+    assert field.period == 0.05
+
+    # expensive ones are slowed down to stay in the budget
+    panels.cost = 0.02
+    field.cost = 0.01
+    _RefreshRate.adjust((panels, field), 0.1)
+    assert panels.cost / panels.period + field.cost / field.period == pytest.approx(0.1)
+    assert panels.period / field.period == pytest.approx(2)
+
+    panels.record(1.0, 1.02)
+    assert panels.next_tm == pytest.approx(1.0 + panels.period)
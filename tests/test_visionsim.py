@@ -1,6 +1,9 @@
 from math import radians as rad, pi
+import random
 
-from pyfrc.physics.visionsim import VisionSimTarget
+import pytest
+
+from pyfrc.physics.visionsim import VisionSim, VisionSimTarget
 
 
 def test_visionsim_target1():
@@ -90,3 +93,34 @@ def test_visionsim_target2():
     assert target.compute(0, 20.22, 17.56, _norm(-506.52)) is not None
 
     assert target.compute(0, 12.48, 13.79, _norm(24.61)) is None
+
+
+def test_visionsim_vectorized():
+    pytest.importorskip("numpy")
+
+    views = [(315, 45), (45, 135), (135, 225), (225, 315), (0, 360)]
+    rng = random.Random(1)
+    targets = [
+        VisionSimTarget(rng.uniform(0, 27), rng.uniform(0, 54), *rng.choice(views))
+        for _ in range(200)
+    ]
+
+    vision_sim = VisionSim(targets, 61, 1.5, 15)
+    assert vision_sim._target_arrays is not None
+
+    found = 0
+    for _ in range(200):
+        x = rng.uniform(0, 27)
+        y = rng.uniform(0, 54)
+        angle = rng.uniform(-pi, pi)
+
+        expected = vision_sim._compute_targets_scalar(0, x, y, angle)
+        output = vision_sim._compute_targets(0, x, y, angle)
+
+        assert len(output) == len(expected)
+        for result, expected_result in zip(output, expected):
+            assert result == pytest.approx(expected_result)
+
+        found += len(expected)
+
+    assert found